@@ -0,0 +1,73 @@
+"""
+Compare sklearn Pipeline.predict with the compiled NumPy tree evaluator (lib/compiled.py).
+
+Usage (from the classification folder, after python export_model.py):
+    python benchmarks/bench_compiled.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import warnings
+warnings.filterwarnings("ignore")
+import argparse
+import time
+import joblib
+import numpy as np
+import pandas as pd
+
+from lib.compiled import CompiledModel
+from lib.model import DEFAULT_MODEL_PATH, compiled_path_for
+
+
+def make_features(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'distance_to_goal': rng.uniform(0, 60, n_rows),
+        'angle_to_goal_degrees': rng.uniform(0, 90, n_rows),
+        'distance_to_goalkeeper': rng.uniform(0, 60, n_rows),
+        'goalkeeper_angle_to_goal_degrees': rng.uniform(0, 180, n_rows),
+        'distance_to_center_goal': rng.uniform(0, 30, n_rows),
+        'num_defenders_nearby': rng.integers(0, 5, n_rows),
+        'defenders_in_box': rng.integers(0, 10, n_rows),
+        'defenders_in_cone': rng.integers(0, 5, n_rows),
+        'poss_start_x': rng.uniform(0, 105, n_rows),
+        'poss_duration': rng.uniform(0, 60, n_rows),
+        'attackers_in_cone': rng.integers(0, 4, n_rows),
+        'distance_category': rng.choice(['very_close', 'close', 'medium', 'far'], n_rows),
+        'angle_category': rng.choice(['narrow', 'medium', 'wide'], n_rows),
+        'goalkeeper_in_shot_path': rng.random(n_rows) < 0.5,
+        'goalkeeper_in_cone': rng.random(n_rows) < 0.5,
+    })
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline vs compiled tree inference.")
+    parser.add_argument("--model", default=str(DEFAULT_MODEL_PATH), help="Path to the trained pipeline (.pkl).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000], help="Batch sizes.")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions (best is reported).")
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.model)
+    compiled = CompiledModel.load(compiled_path_for(args.model))
+
+    print(f"{'batch':>8} {'pipeline ms':>12} {'compiled ms':>12} {'speedup':>8} {'max abs diff':>13}")
+    for size in args.sizes:
+        X = make_features(size)
+        diff = np.abs(pipeline.predict(X) - compiled.predict(X)).max()
+        pipeline_time = best_time(lambda: pipeline.predict(X), args.repeat)
+        compiled_time = best_time(lambda: compiled.predict(X), args.repeat)
+        print(f"{size:>8} {pipeline_time * 1000:>12.3f} {compiled_time * 1000:>12.3f} "
+              f"{pipeline_time / compiled_time:>7.1f}x {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare the per-shot scalar feature code with the batch geometry in lib/geometry.py.
+
+Usage (from the classification folder):
+    python benchmarks/bench_geometry.py --shots 10000
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import math
+import time
+import numpy as np
+
+from lib.enrichment import count_defenders_in_cone, is_goalkeeper_in_path
+from lib.geometry import shot_features, GOAL_LEFT_Y, GOAL_RIGHT_Y
+
+
+def make_shots(n_shots, n_players=22, seed=0):
+    rng = np.random.default_rng(seed)
+    half = n_players // 2
+    return {
+        "ball_x": rng.uniform(0, 105, n_shots),
+        "ball_y": rng.uniform(0, 68, n_shots),
+        "gk_x": rng.uniform(0, 105, n_shots),
+        "gk_y": rng.uniform(20, 50, n_shots),
+        "players_x": rng.uniform(0, 105, (n_shots, n_players)),
+        "players_y": rng.uniform(0, 68, (n_shots, n_players)),
+        "opponents": np.tile(np.arange(n_players) < half, (n_shots, 1)),
+        "defenders": np.tile((np.arange(n_players) < half) & (np.arange(n_players) > 0), (n_shots, 1)),
+        "attackers": np.tile(np.arange(n_players) >= half, (n_shots, 1)),
+    }
+
+
+def scalar_features(shots):
+    """The per-shot code path that process_all_matches used before lib/geometry.py."""
+    out = []
+    for i in range(len(shots["ball_x"])):
+        ball_x, ball_y = float(shots["ball_x"][i]), float(shots["ball_y"][i])
+        gk_x, gk_y = float(shots["gk_x"][i]), float(shots["gk_y"][i])
+        players = [{"x": float(x), "y": float(y)} for x, y in zip(shots["players_x"][i], shots["players_y"][i])]
+        opponents = [p for p, m in zip(players, shots["opponents"][i]) if m]
+        defenders = [p for p, m in zip(players, shots["defenders"][i]) if m]
+        attackers = [p for p, m in zip(players, shots["attackers"][i]) if m]
+
+        x_goal = 105 if ball_x > 50 else 0
+        if x_goal == 105:
+            goal_left, goal_right = (105, GOAL_LEFT_Y), (105, GOAL_RIGHT_Y)
+        else:
+            goal_left, goal_right = (0, GOAL_RIGHT_Y), (0, GOAL_LEFT_Y)
+
+        distance_to_goalkeeper = ((ball_x - gk_x)**2 + (ball_y - gk_y)**2)**0.5
+        distance_to_goal = ((x_goal - ball_x)**2 + (50 - ball_y)**2)**0.5
+        a = math.hypot(x_goal - ball_x, GOAL_LEFT_Y - ball_y)
+        b = math.hypot(x_goal - ball_x, GOAL_RIGHT_Y - ball_y)
+        c = GOAL_RIGHT_Y - GOAL_LEFT_Y
+        angle = math.degrees(math.acos((a**2 + b**2 - c**2) / (2 * a * b)))
+        in_path = is_goalkeeper_in_path(ball_x, ball_y, gk_x, gk_y, x_goal, 34, tolerance=5)
+        nearby = sum(1 for p in opponents if math.hypot(ball_x - p["x"], ball_y - p["y"]) <= 5)
+        in_cone = count_defenders_in_cone(ball_x, ball_y, defenders, goal_left, goal_right)
+        gk_in_cone = count_defenders_in_cone(ball_x, ball_y, [{"x": gk_x, "y": gk_y}], goal_left, goal_right) > 0
+        attackers_in_cone = count_defenders_in_cone(ball_x, ball_y, attackers, goal_left, goal_right)
+        if x_goal == 105:
+            in_box = sum(1 for p in defenders if p["x"] > 83.5 and 18 <= p["y"] <= 82)
+        else:
+            in_box = sum(1 for p in defenders if p["x"] < 16.5 and 18 <= p["y"] <= 82)
+        center = math.hypot(x_goal - gk_x, 34 - gk_y)
+        a_gk = math.hypot(x_goal - gk_x, GOAL_LEFT_Y - gk_y)
+        b_gk = math.hypot(x_goal - gk_x, GOAL_RIGHT_Y - gk_y)
+        gk_angle = math.degrees(math.acos((a_gk**2 + b_gk**2 - c**2) / (2 * a_gk * b_gk)))
+        out.append((distance_to_goalkeeper, distance_to_goal, angle, in_path, nearby, in_cone,
+                    gk_in_cone, attackers_in_cone, in_box, center, gk_angle))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scalar vs batch shot geometry.")
+    parser.add_argument("--shots", type=int, default=10000, help="Number of synthetic shots.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported).")
+    args = parser.parse_args()
+
+    shots = make_shots(args.shots)
+
+    scalar_times, batch_times = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        scalar = scalar_features(shots)
+        scalar_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batch = shot_features(**shots)
+        batch_times.append(time.perf_counter() - start)
+
+    # Sanity check: same counts/flags and continuous values to float precision
+    counts = np.array([[s[4], s[5], s[7], s[8]] for s in scalar])
+    assert (counts[:, 0] == batch["num_defenders_nearby"]).all()
+    assert (counts[:, 1] == batch["defenders_in_cone"]).all()
+    assert (counts[:, 2] == batch["attackers_in_cone"]).all()
+    assert (counts[:, 3] == batch["defenders_in_box"]).all()
+    assert (np.array([s[3] for s in scalar]) == batch["goalkeeper_in_shot_path"]).all()
+    assert (np.array([s[6] for s in scalar]) == batch["goalkeeper_in_cone"]).all()
+    assert np.allclose([s[1] for s in scalar], batch["distance_to_goal"], rtol=1e-12)
+    assert np.allclose([s[2] for s in scalar], batch["angle_to_goal_degrees"], rtol=1e-9)
+
+    scalar_best, batch_best = min(scalar_times), min(batch_times)
+    print(f"shots: {args.shots}")
+    print(f"scalar: {scalar_best * 1000:.1f} ms")
+    print(f"batch:  {batch_best * 1000:.1f} ms")
+    print(f"speedup: {scalar_best / batch_best:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
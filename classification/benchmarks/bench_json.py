@@ -0,0 +1,68 @@
+"""
+Compare the JSON backends of lib/jsonio.py on a full-match tracking file.
+
+Usage (from the classification folder):
+    python benchmarks/bench_json.py                                # synthetic 90 minute match
+    python benchmarks/bench_json.py --tracking 123_tracking_data.jsonl
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import tempfile
+import time
+import numpy as np
+
+from synthetic import FPS, write_tracking
+from lib.jsonio import available_backends, get_backend, CHUNK_LINES
+from lib.tracking import scan_frames
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON backends on a tracking file.")
+    parser.add_argument("--tracking", help="Tracking JSONL file (default: generate a synthetic match).")
+    parser.add_argument("--frames", type=int, default=135000, help="Frames of the synthetic match.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported).")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    path = args.tracking
+    if path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, "bench_tracking_data.jsonl")
+        write_tracking(path, 0, minutes=args.frames / (60 * FPS))
+
+    with open(path, "rb") as f:
+        lines = [line for line in f.read().splitlines()[1:] if line.strip()]
+    chunks = [lines[i:i + CHUNK_LINES] for i in range(0, len(lines), CHUNK_LINES)]
+    print(f"{path}: {len(lines)} frames, {os.path.getsize(path) / 2**20:.0f} MB")
+    print(f"{'backend':10s} {'per line':>10s} {'bulk':>10s} {'index scan':>11s}")
+
+    reference = None
+    for name in available_backends():
+        backend = get_backend(name)
+        per_line = best_time(lambda: [backend.loads(line) for line in lines], args.repeat)
+        bulk = best_time(lambda: [backend.loads_lines(chunk) for chunk in chunks], args.repeat)
+        scan = best_time(lambda: scan_frames(path, backend), args.repeat)
+
+        timestamps, offsets = scan_frames(path, backend)
+        if reference is None:
+            reference = (timestamps, offsets)
+        assert np.array_equal(timestamps, reference[0]) and np.array_equal(offsets, reference[1])
+        print(f"{name:10s} {per_line:9.2f}s {bulk:9.2f}s {scan:10.2f}s")
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Time each stage of the enrichment and scoring path on synthetic matches (benchmarks/synthetic.py)
+and store the results as JSON, to compare versions.
+
+Stages, timed separately for every match count:
+  load      - shots JSON plus a cold scan of the tracking file (frame index built from scratch)
+  align     - closest frame for every shot (read_tracking with the index already built)
+  features  - enrich_shots on the loaded shots and aligned frames
+  enrich    - process_all_matches end to end from cold files (no index, store or cache)
+  prepare   - prepare_data_for_prediction
+  run_model - run_model with the default model (loaded before timing)
+
+Usage (from the classification folder):
+    python benchmarks/bench_pipeline.py --output bench_results.json
+    python benchmarks/bench_pipeline.py --matches 1 10 --minutes 10 --compare bench_results.json
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import warnings
+warnings.filterwarnings("ignore")
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import pandas as pd
+
+from synthetic import generate
+from lib.enrichment import match_input_files, process_all_matches, enrich_shots
+from lib.jsonio import load as load_json
+from lib.lookup import MatchLookup
+from lib.model import DEFAULT_MODEL_PATH, prepare_data_for_prediction, run_model, get_scorer
+from lib.store import store_path_for
+from lib.tracking import index_path_for, build_frame_index, read_tracking
+from lib.utils import load_mappings
+
+STAGES = ["load", "align", "features", "enrich", "prepare", "run_model"]
+
+
+def remove_sidecars(matched):
+    """Delete frame indexes and converted stores so the next read starts from the JSONL."""
+    for files in matched.values():
+        for path in (index_path_for(files['tracking']), store_path_for(files['tracking'])):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def best_time(fn, repeat, setup=None):
+    """Best wall time of fn over repeat runs (setup runs untimed before each) and fn's last result."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def bench_matches(matched, player_map, team_map, repeat):
+    """Timings of every stage, in seconds, for a set of matches."""
+    timings, counts = {}, {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        def load():
+            loaded = {}
+            for match_id, files in matched.items():
+                shots = load_json(files['shots'])
+                build_frame_index(files['tracking'])
+                loaded[match_id] = shots
+            return loaded
+        timings["load"], shots = best_time(load, repeat, setup=lambda: remove_sidecars(matched))
+
+        def align():
+            return {
+                match_id: read_tracking(files['tracking'], [float(s["videoTimestamp"]) for s in shots[match_id]])
+                for match_id, files in matched.items()
+            }
+        timings["align"], aligned = best_time(align, repeat)
+
+        def features():
+            rows = []
+            for match_id, (metadata, frames, errors, offsets) in aligned.items():
+                times = [float(s["videoTimestamp"]) for s in shots[match_id]]
+                rows += enrich_shots(shots[match_id], times, frames, errors, metadata, player_map, team_map,
+                                     frame_offsets=offsets, lookup=MatchLookup(metadata, player_map, team_map))
+            return rows
+        timings["features"], rows = best_time(features, repeat)
+
+        timings["enrich"], df = best_time(
+            lambda: process_all_matches(matched, player_map, team_map), repeat, setup=lambda: remove_sidecars(matched)
+        )
+        timings["prepare"], X_pred = best_time(lambda: prepare_data_for_prediction(df), repeat)
+        get_scorer(DEFAULT_MODEL_PATH)
+        timings["run_model"], results = best_time(lambda: run_model(DEFAULT_MODEL_PATH, X_pred), repeat)
+    counts["shots"] = len(rows)
+    counts["predictions"] = len(results)
+    return timings, counts
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print the time ratio of every stage against an earlier results file; returns the regressions."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    print(f"\nCompared with {baseline_path} ({baseline.get('commit') or 'unknown commit'}):")
+    for n, timings in results["results"].items():
+        old = baseline.get("results", {}).get(n)
+        if old is None:
+            continue
+        for stage in STAGES:
+            if stage not in old or not old[stage]:
+                continue
+            ratio = timings[stage] / old[stage]
+            # Ignore sub-10ms differences, which are timer noise on the small stages
+            regressed = ratio > threshold and timings[stage] - old[stage] > 0.01
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {n:>4s} matches {stage:10s} {old[stage]:8.3f}s -> {timings[stage]:8.3f}s  x{ratio:.2f}{flag}")
+            if flag:
+                regressions.append((n, stage, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the enrichment and scoring stages on synthetic matches.")
+    parser.add_argument("--matches", type=int, nargs="+", default=[1, 10, 100], help="Match counts to time.")
+    parser.add_argument("--minutes", type=float, default=90, help="Length of each synthetic match.")
+    parser.add_argument("--shots", type=int, default=25, help="Shots per match.")
+    parser.add_argument("--distinct", type=int, default=1,
+                        help="Distinct tracking files; other matches link to them (default: 1).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported).")
+    parser.add_argument("--data-dir", help="Keep the synthetic data here (default: a temporary directory).")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Earlier results JSON file to compare with.")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Time ratio above which --compare reports a regression (exit status 1).")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    data_dir = args.data_dir
+    if data_dir is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        data_dir = tmp_dir.name
+
+    print(f"Generating {max(args.matches)} synthetic matches ({args.minutes:g} minutes) in {data_dir}")
+    files, player_map_path, team_map_path = generate(
+        data_dir, max(args.matches), args.minutes, args.shots, args.distinct
+    )
+    player_map = load_mappings(player_map_path)
+    team_map = load_mappings(team_map_path)
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "params": {"minutes": args.minutes, "shots": args.shots, "distinct": args.distinct, "repeat": args.repeat},
+        "results": {},
+        "counts": {},
+    }
+    print(f"{'matches':>7s} " + " ".join(f"{stage:>10s}" for stage in STAGES))
+    for n in args.matches:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            matched = match_input_files(files[:2 * n])
+        timings, counts = bench_matches(matched, player_map, team_map, args.repeat)
+        results["results"][str(n)] = timings
+        results["counts"][str(n)] = counts
+        print(f"{n:7d} " + " ".join(f"{timings[stage]:9.3f}s" for stage in STAGES))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
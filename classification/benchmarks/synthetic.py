@@ -0,0 +1,155 @@
+"""
+Synthetic, schema-valid match data for the benchmarks: shots JSON, 25 Hz tracking JSONL
+with 22 players and the player/team maps that link them.
+
+Usage (from the classification folder):
+    python benchmarks/synthetic.py --out /tmp/synthetic --matches 10 --minutes 90
+"""
+import argparse
+import json
+import os
+import numpy as np
+
+FPS = 25
+TEAM_SIZE = 11
+POSITIONS = ["GK", "DF", "DF", "DF", "DF", "MF", "MF", "MF", "FW", "FW", "FW"]
+BODY_PARTS = ["right_foot", "left_foot", "head_or_other"]
+
+
+def match_ids(match_index):
+    """Tracking team/player ids of a match and the event ids they are mapped from."""
+    teams = [1000 + 2 * match_index, 1001 + 2 * match_index]
+    players = {team: [team * 100 + i for i in range(TEAM_SIZE)] for team in teams}
+    return teams, players
+
+
+def write_tracking(path, match_index, minutes=90, seed=0):
+    """Tracking JSONL: metadata line, then one frame per 1/25 s with all 22 players (random walks)."""
+    rng = np.random.default_rng(seed + match_index)
+    teams, players = match_ids(match_index)
+    n_frames = int(minutes * 60 * FPS)
+    metadata = {
+        "players_data": {str(t): {str(p): {"position": pos} for p, pos in zip(players[t], POSITIONS)} for t in teams},
+        "teams_data": {str(t): {"name": f"Team {t}"} for t in teams},
+    }
+    # Random walks around a base position per player; goalkeepers stay near their goal but
+    # never exactly on the goal line, where the goal angle features are undefined
+    base = np.column_stack([rng.uniform(20, 85, 2 * TEAM_SIZE), rng.uniform(5, 63, 2 * TEAM_SIZE)])
+    base[0], base[TEAM_SIZE] = (3, 34), (102, 34)
+    steps = rng.normal(0, 0.15, (n_frames, 2 * TEAM_SIZE, 2)).cumsum(axis=0)
+    positions = np.clip(base + np.clip(steps, -15, 15), [0.5, 0.5], [104.5, 67.5]).round(2)
+
+    with open(path, "w") as f:
+        f.write(json.dumps(metadata) + "\n")
+        for i in range(n_frames):
+            xy = positions[i].tolist()
+            data = {
+                str(t): [{"id": p, "x": xy[k * TEAM_SIZE + j][0], "y": xy[k * TEAM_SIZE + j][1]}
+                         for j, p in enumerate(players[t])]
+                for k, t in enumerate(teams)
+            }
+            f.write(json.dumps({
+                "frame": i,
+                "period": 1 if i < n_frames // 2 else 2,
+                "Videotimestamp": round(i / FPS, 2),
+                "data": data,
+            }) + "\n")
+    return n_frames
+
+
+def write_shots(path, match_index, minutes=90, n_shots=25, seed=0, tracking_index=None):
+    """
+    Shots JSON (a list of shot events) spread over the match. Players and teams are
+    those of the tracking file generated for tracking_index (default: match_index).
+    """
+    rng = np.random.default_rng(seed + 1000 + match_index)
+    teams, players = match_ids(match_index if tracking_index is None else tracking_index)
+    shots = []
+    for s, ts in enumerate(np.sort(rng.uniform(1, minutes * 60 - 1, n_shots))):
+        side = int(rng.integers(2))
+        team, opponent = teams[side], teams[1 - side]
+        shooter = int(rng.choice(players[team][1:]))
+        shots.append({
+            "id": match_index * 1000 + s,
+            "matchPeriod": "1H" if ts < minutes * 30 else "2H",
+            "minute": int(ts // 60),
+            "second": int(ts % 60),
+            "videoTimestamp": str(round(float(ts), 3)),
+            "player": {"id": shooter + 900000, "position": "FW"},
+            "team": {"id": team + 50000},
+            "opponentTeam": {"id": opponent + 50000},
+            "shot": {
+                "bodyPart": str(rng.choice(BODY_PARTS)),
+                "isGoal": bool(rng.random() < 0.1),
+                "onTarget": bool(rng.random() < 0.35),
+                "xg": round(float(rng.uniform(0.01, 0.6)), 3),
+                "xg2": round(float(rng.uniform(0.01, 0.6)), 3),
+            },
+            "possession": {
+                "duration": round(float(rng.uniform(1, 40)), 1),
+                "startLocation": {"x": int(rng.integers(0, 100)), "y": int(rng.integers(0, 100))},
+            },
+        })
+    with open(path, "w") as f:
+        json.dump(shots, f)
+    return n_shots
+
+
+def write_maps(out_dir, n_matches):
+    """player_map.json and team_map.json for matches 0..n_matches-1 (event id -> tracking id)."""
+    player_map, team_map = {}, {}
+    for m in range(n_matches):
+        teams, players = match_ids(m)
+        for team in teams:
+            team_map[str(team + 50000)] = team
+            for player in players[team]:
+                player_map[str(player + 900000)] = player
+    paths = os.path.join(out_dir, "player_map.json"), os.path.join(out_dir, "team_map.json")
+    for path, mapping in zip(paths, (player_map, team_map)):
+        with open(path, "w") as f:
+            json.dump(mapping, f)
+    return paths
+
+
+def generate(out_dir, n_matches, minutes=90, n_shots=25, distinct=1, seed=0):
+    """
+    Write n_matches shots/tracking pairs plus the maps to out_dir and return the input file paths.
+    Only `distinct` tracking files are generated; further matches hard-link (or copy) them,
+    with their own shots and ids, to keep generation time and disk use low.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    files = []
+    for m in range(n_matches):
+        shots_path = os.path.join(out_dir, f"match{m:04d}.json")
+        tracking_path = os.path.join(out_dir, f"match{m:04d}_tracking_data.jsonl")
+        source = m % distinct
+        if not os.path.exists(tracking_path):
+            if source == m:
+                write_tracking(tracking_path, m, minutes, seed)
+            else:
+                source_path = os.path.join(out_dir, f"match{source:04d}_tracking_data.jsonl")
+                try:
+                    os.link(source_path, tracking_path)
+                except OSError:
+                    import shutil
+                    shutil.copyfile(source_path, tracking_path)
+        write_shots(shots_path, m, minutes, n_shots, seed, tracking_index=source)
+        files += [shots_path, tracking_path]
+    player_map_path, team_map_path = write_maps(out_dir, distinct)
+    return files, player_map_path, team_map_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic matches for benchmarking.")
+    parser.add_argument("--out", required=True, help="Output directory.")
+    parser.add_argument("--matches", type=int, default=1, help="Number of matches.")
+    parser.add_argument("--minutes", type=float, default=90, help="Match length (tracking frames at 25 Hz).")
+    parser.add_argument("--shots", type=int, default=25, help="Shots per match.")
+    parser.add_argument("--distinct", type=int, default=1, help="Number of distinct tracking files.")
+    args = parser.parse_args()
+    files, player_map, team_map = generate(args.out, args.matches, args.minutes, args.shots, args.distinct)
+    print(f"Wrote {len(files) // 2} matches to {args.out} ({player_map}, {team_map})")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,41 +5,152 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", category=ImportWarning)
 
 import argparse
-import json
-from lib.utils import load_jsons, save_csv
-from lib.model import run_model, prepare_data_for_prediction
-from lib.enrichment import match_input_files, process_all_matches
+# Only modules without pandas/sklearn imports here, so --help and invalid inputs stay fast;
+# the model, enrichment and pipeline modules are imported in run() once the inputs are checked
+from lib.utils import load_mappings
+from lib.output import save_results, FORMATS
+from lib.discovery import discover_matches
+from lib.cache import EnrichmentCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_MB
+from lib.registry import resolve_model
+from lib import profiling
 import os
 MODEL_PATH = "models/best_model_lgbm.pkl"
 
-def load_mappings(path):
-    with open(path) as f:
-        return json.load(f)
-
 def main():
     parser = argparse.ArgumentParser(description="Run ML model on JSON input.")
-    parser.add_argument("input_files", nargs='+', help="One or more JSON files.")
+    parser.add_argument("input_files", nargs='*', help="Shots JSON and tracking JSONL files, directories or quoted glob patterns.")
+    parser.add_argument("--input-list", help="Text file listing input files, directories or glob patterns, one per line.")
     parser.add_argument("--player-map", required=True, help="Path to player mapping JSON.")
     parser.add_argument("--team-map", required=True, help="Path to team mapping JSON.")
-    parser.add_argument("--output", required=True, help="Output CSV path.")
+    parser.add_argument("--model", action="append", help=f"Registered model name (see register_model.py) or model file; default: the registry's default model, else {MODEL_PATH}. Repeat to score with several models in one run, one predictions_<name> column each.")
+    parser.add_argument("--output", required=True, help="Output path (a directory with --partition-by-match).")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output format (default: csv).")
+    parser.add_argument("--partition-by-match", action="store_true", help="Write one file per match under the output directory (implies --stream).")
     parser.add_argument("--full-output", action="store_true", help="Include all features in the CSV.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of processes used to enrich matches in parallel.")
+    parser.add_argument("--stream", action="store_true", help="Score and append each match to the output as soon as it is enriched.")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted --stream run, skipping matches already written (implies --stream).")
+    parser.add_argument("--manifest", help="Run manifest path (default: output path + .manifest.json).")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory of the enriched-match cache.")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_CACHE_MAX_MB, help="Size limit of the enriched-match cache in MB.")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-enrich matches, ignoring the cache.")
+    parser.add_argument("--kinematics-window", type=float, metavar="SECONDS", help="Add shooter/goalkeeper speed, heading and acceleration and closing defenders, from the frames this many seconds before each shot (e.g. 2), to --full-output.")
+    parser.add_argument("--follow", action="store_true", help="Follow growing (live) shots/tracking files and score each shot as soon as its frame arrives.")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="With --follow, seconds between checks of the input files.")
+    parser.add_argument("--idle-timeout", type=float, default=60.0, help="With --follow, stop after this many seconds without new input.")
+    parser.add_argument("--profile", metavar="REPORT", help="Write per-stage and per-match timings, CPU time, peak memory and counts to this JSON file.")
+    parser.add_argument("--profile-cprofile", metavar="PROF", help="With --profile, also dump a cProfile of feature computation and prediction (main process only) to this file.")
     args = parser.parse_args()
+    if not args.input_files and not args.input_list:
+        parser.error("no input files given (pass files, directories or globs, or --input-list)")
+    if args.profile_cprofile and not args.profile:
+        parser.error("--profile-cprofile needs --profile")
 
+    profiler = profiling.start(cprofile=bool(args.profile_cprofile)) if args.profile else None
     try:
-        MODEL_PATH
-        if not os.path.exists(MODEL_PATH):
-            raise FileNotFoundError(f"Model file not found at: {MODEL_PATH}")
-        
-        player_map = load_mappings(args.player_map)
-        team_map = load_mappings(args.team_map)
-        data = load_jsons(args.input_files)
-        all_shots_df = process_all_matches(args.input_files, player_map, team_map)  # Preprocessed DataFrame
+        run(args)
+    finally:
+        if profiler is not None:
+            profiling.stop()
+            profiler.write(args.profile, args.profile_cprofile)
+            print(f"Profile written to {args.profile}")
+
+def validate_inputs(args):
+    """
+    Check the model, mappings, inputs and output location before anything heavy is imported.
+    Returns the matched shots/tracking pairs; raises on the first problem.
+    """
+    # {label: model file}; labels name the prediction columns when there are several models
+    args.models = {}
+    for spec in args.model or [None]:
+        model_path = resolve_model(spec, fallback=MODEL_PATH)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model file not found at: {model_path}")
+        label = spec if spec and not os.path.isfile(spec) else os.path.splitext(os.path.basename(model_path))[0]
+        if label in args.models:
+            raise ValueError(f"Model given twice: {label}")
+        args.models[label] = model_path
+    for path in (args.player_map, args.team_map):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Mapping file not found: {path}")
+    if args.workers < 1:
+        raise ValueError("--workers must be at least 1")
+    if args.kinematics_window is not None and args.kinematics_window <= 0:
+        raise ValueError("--kinematics-window must be a positive number of seconds")
+    if args.resume and args.format != "csv" and not args.partition_by_match:
+        raise ValueError(f"A single {args.format} file cannot be resumed; use CSV or --partition-by-match.")
+    if args.follow and (args.resume or args.partition_by_match):
+        raise ValueError("--follow cannot be combined with --resume or --partition-by-match.")
+    if args.follow and args.poll_interval <= 0:
+        raise ValueError("--poll-interval must be a positive number of seconds")
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    if not os.path.isdir(output_dir):
+        raise FileNotFoundError(f"Output directory does not exist: {output_dir}")
+
+    matched_files = discover_matches(args.input_files, args.input_list)
+    if not matched_files:
+        raise ValueError("No matched (shots + tracking) file pairs found in the inputs.")
+    if args.follow:
+        return matched_files  # live files may not have been created yet
+    missing = [path for files in matched_files.values() for path in files.values() if not os.path.isfile(path)]
+    if missing:
+        raise FileNotFoundError(f"Input file not found: {', '.join(missing)}")
+    return matched_files
+
+def run(args):
+    try:
+        with profiling.stage("discover") as counts:
+            matched_files = validate_inputs(args)
+            counts["matches"] = len(matched_files)
+
+        from lib.model import run_model, prepare_data_for_prediction, get_scorers
+        from lib.enrichment import process_all_matches
+        from lib.pipeline import stream_scores
+        from lib.kinematics import add_kinematics
+
+        with profiling.stage("load_mappings"):
+            player_map = load_mappings(args.player_map)
+            team_map = load_mappings(args.team_map)
+        cache = None if args.no_cache else EnrichmentCache(args.cache_dir, max_bytes=args.cache_max_mb * 2**20)
+        if args.follow:
+            from lib.live import follow
+            written = follow(
+                matched_files, player_map, team_map, get_scorers(args.models), args.output,
+                fmt=args.format, full_output=args.full_output, poll_interval=args.poll_interval,
+                idle_timeout=args.idle_timeout, kinematics_window=args.kinematics_window,
+            )
+            print(f"Output saved to {args.output} ({written} shots)")
+            return
+        if args.stream or args.resume or args.partition_by_match:
+            written = stream_scores(
+                matched_files, player_map, team_map, get_scorers(args.models), args.output,
+                full_output=args.full_output, workers=args.workers, cache=cache,
+                manifest_path=args.manifest, resume=args.resume,
+                fmt=args.format, partition_by_match=args.partition_by_match,
+                kinematics_window=args.kinematics_window,
+            )
+            if not written:
+                raise ValueError("No valid shots found after enrichment. Cannot proceed with model.")
+            print(f"Output saved to {args.output} ({written} shots)")
+            return
+
+        with profiling.stage("enrich") as counts:
+            all_shots_df = process_all_matches(
+                matched_files, player_map, team_map, workers=args.workers, cache=cache,
+                kinematics_window=args.kinematics_window,
+            )  # Preprocessed DataFrame
+            counts["rows"] = len(all_shots_df)
         if all_shots_df.empty:
             raise ValueError("No valid shots found after enrichment. Cannot proceed with model.")
         
-        X_pred = prepare_data_for_prediction(all_shots_df)
-        results = run_model(MODEL_PATH, X_pred, full_output=args.full_output)      # List[dict]
-        save_csv(results, args.output)
+        with profiling.stage("prepare", rows=len(all_shots_df)):
+            X_pred = prepare_data_for_prediction(all_shots_df)
+        with profiling.stage("run_model", rows=len(X_pred)):
+            results = run_model(args.models, X_pred, full_output=args.full_output)      # List[dict]
+            if args.full_output and args.kinematics_window:
+                results = add_kinematics(results, all_shots_df)
+        with profiling.stage("save", rows=len(results)):
+            save_results(results, args.output, args.format)
         print(f"Output saved to {args.output}")
     except Exception as e:
         print(f"Error: {e}")
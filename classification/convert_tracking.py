@@ -0,0 +1,29 @@
+import warnings
+warnings.filterwarnings("ignore", category=UserWarning)
+warnings.filterwarnings("ignore", category=FutureWarning)
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ImportWarning)
+
+import argparse
+import time
+from lib.store import convert_tracking, open_store_for
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert tracking JSONL files to memory-mapped binary stores.")
+    parser.add_argument("tracking_files", nargs='+', help="One or more *_tracking_data.jsonl files.")
+    parser.add_argument("--force", action="store_true", help="Convert again even if an up-to-date store exists.")
+    args = parser.parse_args()
+
+    for tracking_path in args.tracking_files:
+        if not args.force and open_store_for(tracking_path) is not None:
+            print(f"{tracking_path}: store is up to date")
+            continue
+        start = time.perf_counter()
+        try:
+            store_path = convert_tracking(tracking_path)
+            print(f"{tracking_path} -> {store_path} ({time.perf_counter() - start:.1f} s)")
+        except Exception as e:
+            print(f"Failed to convert {tracking_path}: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import warnings
+warnings.filterwarnings("ignore", category=UserWarning)
+warnings.filterwarnings("ignore", category=FutureWarning)
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ImportWarning)
+
+import argparse
+import joblib
+from lib.compiled import export_pipeline
+from lib.model import DEFAULT_MODEL_PATH, compiled_path_for
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a trained pipeline to a compiled NumPy artifact.")
+    parser.add_argument("--model", default=str(DEFAULT_MODEL_PATH), help="Path to the trained pipeline (.pkl).")
+    parser.add_argument("--output", help="Output path (default: model path with .npz extension).")
+    args = parser.parse_args()
+
+    output = args.output or compiled_path_for(args.model)
+    try:
+        meta = export_pipeline(joblib.load(args.model), output, source_path=args.model)
+        print(f"Exported {len(meta['layout'])} features (max tree depth {meta['max_depth']}) to {output}")
+    except Exception as e:
+        print(f"Error: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+class FrameIndex:
+    """
+    Sorted index of tracking frame timestamps (Videotimestamp) for nearest-frame lookups.
+    Frames are identified by their position in the original (file) order.
+    """
+
+    def __init__(self, timestamps):
+        timestamps = np.asarray(timestamps, dtype=float)
+        # Stable sort keeps equal timestamps in file order, so the first one wins ties
+        self.order = np.argsort(timestamps, kind="stable")
+        self.sorted_times = timestamps[self.order]
+
+    def __len__(self):
+        return len(self.sorted_times)
+
+    def nearest(self, shot_timestamps):
+        """
+        Resolve every shot timestamp to its closest frame in one vectorized pass.
+        Returns (positions, errors): the file position of the closest frame and the
+        signed alignment error (frame time - shot time) in seconds.
+        When two frames are equally close, the one appearing first in the file is
+        chosen, which is the same frame a linear min() over the file would pick.
+        """
+        if not len(self):
+            raise ValueError("Cannot align shots against an empty frame index.")
+
+        times = self.sorted_times
+        shot_ts = np.asarray(shot_timestamps, dtype=float)
+
+        # First frame at or after each shot, and the last frame strictly before it
+        right = np.searchsorted(times, shot_ts, side="left")
+        has_right = right < len(times)
+        has_left = right > 0
+        left = np.maximum(right - 1, 0)
+        right = np.minimum(right, len(times) - 1)
+        # Jump to the first of any run of duplicate timestamps on the left side
+        left = np.searchsorted(times, times[left], side="left")
+
+        left_diff = np.abs(times[left] - shot_ts)
+        right_diff = np.abs(times[right] - shot_ts)
+        left_pos = self.order[left]
+        right_pos = self.order[right]
+
+        take_right = ~has_left | (
+            has_right & ((right_diff < left_diff) | ((right_diff == left_diff) & (right_pos < left_pos)))
+        )
+        positions = np.where(take_right, right_pos, left_pos)
+        errors = np.where(take_right, times[right], times[left]) - shot_ts
+        return positions, errors
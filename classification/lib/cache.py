@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "ie_driblab_xg" / "enrichment"
+DEFAULT_CACHE_MAX_MB = 2048
+
+
+def content_hash(path, chunk_size=1 << 20):
+    """Hash of a file's content."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def data_hash(*parts):
+    """Hash of JSON-serializable values (e.g. loaded player/team maps)."""
+    h = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        h.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class EnrichmentCache:
+    """
+    On-disk cache of enriched per-match feature tables, stored as Parquet files.
+    Entries are keyed by the content of the input files plus any extra key parts
+    (player/team maps, enrichment code version, ...). Reading an entry marks it as
+    recently used; the least recently used entries are removed once the cache grows
+    beyond max_bytes.
+    File content hashes are remembered per (path, size, mtime), so unchanged inputs
+    are not re-read to compute the key.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_MB * 2**20):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        stamp = [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+        memo = self.cache_dir / "hashes" / (hashlib.blake2b(stamp[0].encode(), digest_size=16).hexdigest() + ".json")
+        try:
+            with open(memo) as f:
+                saved = json.load(f)
+            if saved["stamp"] == stamp:
+                return saved["hash"]
+        except (OSError, ValueError, KeyError):
+            pass
+        digest = content_hash(path)
+        self._write_atomic(memo, json.dumps({"stamp": stamp, "hash": digest}).encode())
+        return digest
+
+    def key(self, paths, *parts):
+        """Cache key for the content of the given files and extra JSON-serializable parts."""
+        h = hashlib.blake2b(digest_size=20)
+        for path in paths:
+            h.update(self.file_hash(path).encode())
+        for part in parts:
+            h.update(json.dumps(part, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def _entry(self, key):
+        return self.cache_dir / f"{key}.parquet"
+
+    def get(self, key):
+        """Cached DataFrame for a key, or None. An unreadable (e.g. truncated) entry is removed."""
+        import pandas as pd  # not at module level: the CLI imports this module before validating its inputs
+        path = self._entry(key)
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):  # pyarrow's ArrowInvalid is a ValueError
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return df
+
+    def put(self, key, df):
+        """Store a DataFrame under a key, then evict old entries if the cache is too big."""
+        with tempfile.NamedTemporaryFile(dir=self._ensure_dir(), suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, self._entry(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _ensure_dir(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        return self.cache_dir
+
+    def _write_atomic(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+            f.write(data)
+        os.replace(f.name, path)
@@ -0,0 +1,241 @@
+import json
+import numpy as np
+from lib.utils import file_sha256
+
+# Export format of the compiled model (.npz). Bump when the layout changes.
+COMPILED_FORMAT = 1
+
+# LightGBM numeric split semantics (see LightGBM Tree::NumericalDecision)
+K_ZERO_THRESHOLD = 1e-35
+MISSING_TYPES = {"None": 0, "Zero": 1, "NaN": 2}
+
+
+def _plain(value):
+    """numpy scalars (np.bool_, np.str_) to plain Python values for JSON."""
+    return value.item() if hasattr(value, "item") else value
+
+
+def _feature_layout(preprocessor):
+    """
+    Output columns of a fitted ColumnTransformer as a list of
+    {"column": name} (passthrough) or {"column": name, "equals": category} (one-hot).
+    """
+    layout = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "remainder":
+            if transformer == "drop" or not len(columns):
+                continue
+            raise ValueError("Compiling a ColumnTransformer remainder is not supported.")
+        if transformer == "passthrough" or getattr(transformer, "func", "") is None:
+            layout += [{"column": column} for column in columns]
+        elif hasattr(transformer, "categories_"):
+            if transformer.drop is not None or transformer.handle_unknown != "ignore":
+                raise ValueError("Only OneHotEncoder(handle_unknown='ignore') without drop can be compiled.")
+            for column, categories in zip(columns, transformer.categories_):
+                layout += [{"column": column, "equals": _plain(c)} for c in categories]
+        else:
+            raise ValueError(f"Unsupported transformer in pipeline: {name} ({type(transformer).__name__})")
+    return layout
+
+
+def encode_features(layout, X):
+    """Feature matrix (n_rows, n_features) of X with a pipeline's passthrough/one-hot layout."""
+    columns = {}
+    matrix = np.empty((len(X), len(layout)), dtype=np.float64)
+    for i, item in enumerate(layout):
+        name = item["column"]
+        if "equals" in item:
+            if name not in columns:
+                columns[name] = np.asarray(X[name], dtype=object)
+            matrix[:, i] = columns[name] == item["equals"]
+        else:
+            matrix[:, i] = np.asarray(X[name], dtype=np.float64)
+    return matrix
+
+
+def _flatten_trees(booster_dump):
+    """
+    All trees of a LightGBM dump_model() as flat node arrays.
+    Leaves use themselves as both children, so evaluation can run a fixed number of steps.
+    """
+    feature, threshold, default_left, missing_type, left, right, value = [], [], [], [], [], [], []
+    roots = []
+    max_depth = 0
+
+    def add(node, depth):
+        nonlocal max_depth
+        index = len(feature)
+        feature.append(0)
+        threshold.append(0.0)
+        default_left.append(False)
+        missing_type.append(0)
+        left.append(index)
+        right.append(index)
+        value.append(0.0)
+        if "split_feature" not in node:
+            value[index] = node["leaf_value"]
+            max_depth = max(max_depth, depth)
+            return index
+        if node["decision_type"] != "<=":
+            raise ValueError("Only numerical ('<=') splits can be compiled.")
+        feature[index] = node["split_feature"]
+        threshold[index] = node["threshold"]
+        default_left[index] = node["default_left"]
+        missing_type[index] = MISSING_TYPES[node["missing_type"]]
+        left[index] = add(node["left_child"], depth + 1)
+        right[index] = add(node["right_child"], depth + 1)
+        return index
+
+    for tree in booster_dump["tree_info"]:
+        roots.append(add(tree["tree_structure"], 0))
+
+    return {
+        "feature": np.array(feature, dtype=np.int32),
+        "threshold": np.array(threshold, dtype=np.float64),
+        "default_left": np.array(default_left, dtype=bool),
+        "missing_type": np.array(missing_type, dtype=np.int8),
+        "left": np.array(left, dtype=np.int32),
+        "right": np.array(right, dtype=np.int32),
+        "value": np.array(value, dtype=np.float64),
+        "roots": np.array(roots, dtype=np.int32),
+    }, max_depth
+
+
+def export_pipeline(pipeline, out_path, source_path=None):
+    """
+    Export a fitted Pipeline(ColumnTransformer, LGBMRegressor) to a compiled .npz artifact:
+    the fixed one-hot layout plus the booster's trees as flat arrays.
+    source_path (the .pkl it came from) is recorded by checksum so scorers can tell
+    whether the artifact is up to date.
+    """
+    preprocessor = pipeline.steps[0][1]
+    regressor = pipeline.steps[-1][1]
+    booster_dump = regressor.booster_.dump_model()
+    if not booster_dump["objective"].startswith("regression") or booster_dump["num_tree_per_iteration"] != 1:
+        raise ValueError(f"Only single-output regression models can be compiled, got {booster_dump['objective']}.")
+    if booster_dump["average_output"]:
+        raise ValueError("Averaged-output (random forest) boosters cannot be compiled.")
+
+    arrays, max_depth = _flatten_trees(booster_dump)
+    meta = {
+        "format": COMPILED_FORMAT,
+        "layout": _feature_layout(preprocessor),
+        "max_depth": max_depth,
+        "source_sha256": file_sha256(source_path) if source_path else None,
+    }
+    with open(out_path, "wb") as f:
+        np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+    return meta
+
+
+class CompiledModel:
+    """
+    Pure-NumPy evaluator for a model exported with export_pipeline.
+    predict() takes the same feature columns as the sklearn pipeline.
+    """
+
+    def __init__(self, meta, arrays):
+        if meta["format"] != COMPILED_FORMAT:
+            raise ValueError(f"Unsupported compiled model format: {meta['format']}")
+        self.meta = meta
+        self.layout = meta["layout"]
+        self.max_depth = meta["max_depth"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.default_left = arrays["default_left"]
+        self.missing_type = arrays["missing_type"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.uses_missing_rules = bool((self.missing_type != MISSING_TYPES["None"]).any())
+        # children[2 * node + go_left]: right child at even, left child at odd positions
+        self._children = np.stack([self.right, self.left], axis=1).astype(np.intp).ravel()
+        self.feature = self.feature.astype(np.intp)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            arrays = {key: data[key] for key in data.files if key != "meta"}
+        return cls(meta, arrays)
+
+    def transform(self, X):
+        return encode_features(self.layout, X)
+
+    def predict(self, X):
+        features = self.transform(X)
+        n_rows, n_features = features.shape
+        if not self.uses_missing_rules:
+            # Without Zero/NaN missing rules LightGBM treats NaN as 0.0
+            features = np.where(np.isnan(features), 0.0, features)
+        flat = features.ravel()
+        row_base = (np.arange(n_rows) * n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots))).astype(np.intp)
+        # Leaves point to themselves, so a fixed number of steps lands every row on a leaf
+        for _ in range(self.max_depth):
+            values = flat.take(row_base + self.feature.take(nodes))
+            if self.uses_missing_rules:
+                go_left = self._missing_aware_decision(nodes, values)
+            else:
+                go_left = values <= self.threshold.take(nodes)
+            nodes = self._children.take(2 * nodes + go_left)
+        return self.value.take(nodes).sum(axis=1)
+
+    def _missing_aware_decision(self, nodes, values):
+        missing_type = self.missing_type[nodes]
+        is_nan = np.isnan(values)
+        values = np.where(is_nan & (missing_type != MISSING_TYPES["NaN"]), 0.0, values)
+        is_missing = (
+            ((missing_type == MISSING_TYPES["Zero"]) & (np.abs(values) <= K_ZERO_THRESHOLD))
+            | ((missing_type == MISSING_TYPES["NaN"]) & is_nan)
+        )
+        return np.where(is_missing, self.default_left[nodes], values <= self.threshold[nodes])
+
+
+# Native LightGBM artifacts: the booster in LightGBM's own text format plus a JSON
+# sidecar (<path>.json) with the one-hot layout, readable by any LightGBM version
+NATIVE_SUFFIX = ".lgb"
+NATIVE_FORMAT = 1
+
+
+def export_native(pipeline, out_path, source_path=None):
+    """
+    Export a fitted Pipeline(ColumnTransformer, LGBMRegressor) to a native LightGBM model
+    file and its layout sidecar. Loading it needs LightGBM and NumPy, but no unpickling.
+    """
+    preprocessor = pipeline.steps[0][1]
+    regressor = pipeline.steps[-1][1]
+    meta = {
+        "format": NATIVE_FORMAT,
+        "layout": _feature_layout(preprocessor),
+        "features": [str(c) for c in preprocessor.feature_names_in_],
+        "source_sha256": file_sha256(source_path) if source_path else None,
+    }
+    regressor.booster_.save_model(str(out_path))
+    with open(str(out_path) + ".json", "w") as f:
+        json.dump(meta, f, indent=2)
+    meta["sha256"] = file_sha256(out_path)
+    return meta
+
+
+class NativeModel:
+    """A booster exported with export_native; predict() takes the pipeline's feature columns."""
+
+    def __init__(self, booster, meta):
+        if meta["format"] != NATIVE_FORMAT:
+            raise ValueError(f"Unsupported native model format: {meta['format']}")
+        self.booster = booster
+        self.meta = meta
+        self.layout = meta["layout"]
+        self.feature_names_in_ = np.array(meta["features"], dtype=object)
+
+    @classmethod
+    def load(cls, path):
+        import lightgbm as lgb
+        with open(str(path) + ".json") as f:
+            meta = json.load(f)
+        return cls(lgb.Booster(model_file=str(path)), meta)
+
+    def predict(self, X):
+        return self.booster.predict(encode_features(self.layout, X))
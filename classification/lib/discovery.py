@@ -0,0 +1,86 @@
+import glob
+import os
+from pathlib import Path
+
+GLOB_CHARS = set("*?[")
+
+
+def is_input_file(path):
+    return path.endswith(".json") or path.endswith("_tracking_data.jsonl")
+
+
+def _walk(directory):
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if is_input_file(name):
+                yield os.path.join(root, name)
+
+
+def extract_prefix(path):
+    """Get the base prefix before any underscores or extensions."""
+    filename = Path(path).name
+    if filename.endswith("_tracking_data.jsonl"):
+        return filename.replace("_tracking_data.jsonl", "")
+    elif filename.endswith(".json"):
+        return filename.replace(".json", "")
+    return None
+
+
+def match_input_files(filepaths):
+    """
+    Match JSON and JSONL files based on filename prefix (not internal matchId).
+    """
+    file_map = {}
+    for f in filepaths:
+        prefix = extract_prefix(f)
+        if not prefix:
+            continue
+
+        if f.endswith("_tracking_data.jsonl"):
+            file_map.setdefault(prefix, {})["tracking"] = f
+        elif f.endswith(".json"):
+            file_map.setdefault(prefix, {})["shots"] = f
+
+    matched = {k: v for k, v in file_map.items() if "shots" in v and "tracking" in v}
+
+    if not matched:
+        print("No matched (shots + tracking) file pairs found.")
+    else:
+        print(f"Matched {len(matched)} file pairs:")
+        for k in matched:
+            print(f"  {k}: {matched[k]['shots']} + {matched[k]['tracking']}")
+    return matched
+
+
+def iter_input_paths(inputs, input_list=None):
+    """
+    Candidate shots/tracking file paths from files, directories (searched recursively),
+    glob patterns (** matches any depth) and an optional list file with one entry per line.
+    Only the list file is opened; input files are found by name.
+    """
+    for item in inputs:
+        if os.path.isdir(item):
+            yield from _walk(item)
+        elif GLOB_CHARS & set(item):
+            for path in sorted(glob.iglob(item, recursive=True)):
+                if os.path.isdir(path):
+                    yield from _walk(path)
+                elif is_input_file(path):
+                    yield path
+        else:
+            yield item
+    if input_list:
+        with open(input_list) as f:
+            entries = [line.strip() for line in f]
+        yield from iter_input_paths([e for e in entries if e and not e.startswith("#")])
+
+
+def discover_matches(inputs, input_list=None):
+    """Shots/tracking pairs (as match_input_files) found from the given inputs."""
+    return match_input_files(iter_input_paths(inputs, input_list))
+
+
+def match_size(files):
+    """Total size in bytes of a match's files (those that exist)."""
+    return sum(os.path.getsize(path) for path in files.values() if os.path.exists(path))
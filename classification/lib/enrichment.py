@@ -1,8 +1,28 @@
-import json
 import math
 import os
-from pathlib import Path
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
 import pandas as pd
+from lib import profiling
+# Defined in lib.discovery, which the CLI imports before pandas; kept importable from here
+from lib.discovery import extract_prefix, match_input_files, match_size
+from lib.geometry import shot_features
+from lib.jsonio import load as load_json
+from lib.kinematics import tracking_kinematics
+from lib.lookup import MatchLookup, EMPTY_TEAM, frame_tables
+from lib.store import open_store_for
+from lib.tracking import read_tracking, frame_snapshot
+
+FRAME_PAYLOADS = (None, "array", "ref")
+
+# Part of the enrichment cache key: bump whenever enrich_shots output changes
+ENRICHMENT_VERSION = 1
+
+# With workers > 1, how many matches (per worker) may be enriched ahead of the next one
+# iter_enriched_matches yields, while it waits for a slow match
+MAX_AHEAD = 4
 
 # Function to count defenders inside the shooting cone
 def count_defenders_in_cone(shooter_x, shooter_y, defenders, goal_left, goal_right):
@@ -48,390 +68,440 @@ def get_field_zone_6(x, y, attacking_right=True):
         horiz = "right"
     return f"{horiz}_{'near' if near else 'far'}"
     
-def extract_prefix(path):
-    """Get the base prefix before any underscores or extensions."""
-    filename = Path(path).name
-    if filename.endswith("_tracking_data.jsonl"):
-        return filename.replace("_tracking_data.jsonl", "")
-    elif filename.endswith(".json"):
-        return filename.replace(".json", "")
-    return None
-
-def match_input_files(filepaths):
-    """
-    Match JSON and JSONL files based on filename prefix (not internal matchId).
-    """
-    file_map = {}
-    for f in filepaths:
-        prefix = extract_prefix(f)
-        if not prefix:
-            continue
-
-        if f.endswith("_tracking_data.jsonl"):
-            file_map.setdefault(prefix, {})["tracking"] = f
-        elif f.endswith(".json"):
-            file_map.setdefault(prefix, {})["shots"] = f
+def _coord(value):
+    """Frame coordinate as float, NaN when missing."""
+    return np.nan if value is None else float(value)
 
-    matched = {k: v for k, v in file_map.items() if "shots" in v and "tracking" in v}
+def _value(value):
+    """Feature value as a plain float, None when it could not be computed."""
+    return None if np.isnan(value) else float(value)
 
-    if not matched:
-        print("No matched (shots + tracking) file pairs found.")
-    else:
-        print(f"Matched {len(matched)} file pairs:")
-        for k in matched:
-            print(f"  {k}: {matched[k]['shots']} + {matched[k]['tracking']}")
-    return matched
-    
-def process_all_matches(filepaths, player_map, team_map):
-    matched_files = match_input_files(filepaths)
-    all_shots = []
-
-    for match_id, files in matched_files.items():
-        print(f"Processing match_id: {match_id}")
-        shots_path = files['shots']
-        tracking_path = files['tracking']
-
-        if not os.path.exists(shots_path):
-            print(f"Shots file missing: {shots_path}")
-            continue
-        if not os.path.exists(tracking_path):
-            print(f"Tracking file missing: {tracking_path}")
-            continue
-
-        # Load shots
-        with open(shots_path, "r") as f:
-            shots_data = json.load(f)
-
-        if not shots_data:
-            print(f"No shots found in {shots_path}")
-            continue
-
-        # Load tracking metadata
-        with open(tracking_path, "r") as f:
-            metadata = json.loads(f.readline())
-            players_data = metadata.get("players_data", {})
-            teams_data = metadata.get("teams_data", {})
-
-        # Load tracking frames
-        tracking_frames = []
-        with open(tracking_path, "r") as f:
-            next(f)  # skip metadata
-            for line in f:
-                obj = json.loads(line)
-                if "Videotimestamp" in obj:
-                    tracking_frames.append(obj)
-
-        if not tracking_frames:
-            print(f"No tracking frames found in {tracking_path}")
+def enrich_match(match_id, files, player_map, team_map, frame_payload=None, kinematics_window=None):
+    """
+    Enrich the shots of a single match (one shots + tracking file pair).
+    Returns a list of dicts, one per enriched shot.
+    frame_payload controls what is kept of the closest tracking frame:
+      None    - nothing (default)
+      "array" - a compact float32 snapshot in "frame_snapshot" (see lib.tracking.frame_snapshot)
+      "ref"   - "frame_file"/"frame_offset", to read the frame back with lib.tracking.load_frame
+    With kinematics_window (seconds), the kinematic features of lib.kinematics are added,
+    computed from the frames in that window before each shot.
+    """
+    if frame_payload not in FRAME_PAYLOADS:
+        raise ValueError(f"Unknown frame payload: {frame_payload}")
+    enriched = []
+    print(f"Processing match_id: {match_id}")
+    shots_path = files['shots']
+    tracking_path = files['tracking']
+
+    if not os.path.exists(shots_path):
+        print(f"Shots file missing: {shots_path}")
+        return enriched
+    if not os.path.exists(tracking_path):
+        print(f"Tracking file missing: {tracking_path}")
+        return enriched
+
+    # Load shots
+    with profiling.stage("load_shots", match_id) as counts:
+        shots_data = load_json(shots_path)
+        counts["shots"] = len(shots_data) if shots_data else 0
+
+    if not shots_data:
+        print(f"No shots found in {shots_path}")
+        return enriched
+
+    # Read only the closest frame for each shot from the converted store if there is an
+    # up-to-date one, otherwise stream the tracking metadata and closest frames in one pass
+    shot_times = [float(shot["videoTimestamp"]) for shot in shots_data]
+    with profiling.stage("read_tracking", match_id) as counts:
+        store = open_store_for(tracking_path)
+        if store is not None:
+            metadata, closest_frames, frame_errors, frame_offsets = store.read(shot_times)
+        else:
+            metadata, closest_frames, frame_errors, frame_offsets = read_tracking(tracking_path, shot_times)
+        counts["frames"] = len({id(frame) for frame in closest_frames if frame is not None})
+
+    if closest_frames[0] is None:
+        print(f"No tracking frames found in {tracking_path}")
+        return enriched
+
+    lookup = MatchLookup(metadata, player_map, team_map)
+    kinematics = None
+    if kinematics_window:
+        with profiling.stage("kinematics", match_id) as counts:
+            kinematics = tracking_kinematics(shots_data, shot_times, lookup, tracking_path, store, kinematics_window)
+            counts["shots"] = len(kinematics)
+
+    with profiling.stage("features", match_id) as counts:
+        enriched = enrich_shots(
+            shots_data, shot_times, closest_frames, frame_errors, metadata, player_map, team_map,
+            frame_offsets=frame_offsets, tracking_path=tracking_path, frame_payload=frame_payload,
+            lookup=lookup, kinematics=kinematics,
+        )
+        counts["rows"] = len(enriched)
+    return enriched
+
+def enrich_shots(shots_data, shot_times, closest_frames, frame_errors, metadata, player_map, team_map,
+                 frame_offsets=None, tracking_path=None, frame_payload=None, lookup=None, kinematics=None):
+    """
+    Enrich shots given the closest tracking frame of each one and the match metadata.
+    This is the per-shot part of enrich_match; it needs no files, so it can also be
+    used on shots and frames received from elsewhere (see lib/server.py).
+    lookup is the match's lib.lookup.MatchLookup; it is built from metadata if not given.
+    kinematics is an optional list of extra features per shot (see lib.kinematics) added to the rows.
+    """
+    players_data = metadata.get("players_data", {})
+    if lookup is None:
+        lookup = MatchLookup(metadata, player_map, team_map)
+    if frame_offsets is None:
+        frame_offsets = [None] * len(shots_data)
+    if kinematics is None:
+        kinematics = [None] * len(shots_data)
+    enriched = []
+
+    # Resolve shooter, goalkeeper and frame players for each shot
+    resolved = []
+    tables = {}  # per-frame team tables, shared by all shots on the same frame
+    for shot, shot_ts, closest_frame, frame_error, frame_offset, shot_kinematics in zip(
+        shots_data, shot_times, closest_frames, frame_errors, frame_offsets, kinematics
+    ):
+        player_tracking_id = lookup.player(shot["player"]["id"])
+        team_tracking_id = lookup.team(shot["team"]["id"])
+        opp_team_tracking_id = lookup.team(shot["opponentTeam"]["id"])
+
+        if opp_team_tracking_id is None:
+            print(f"Skipping shot due to missing team mapping for opponent {shot['opponentTeam']['id']}")
             continue
 
-        frame_times = [f["Videotimestamp"] for f in tracking_frames]        
-
-
-        # Process each shot
-        for shot in shots_data:
-            shot_ts = float(shot["videoTimestamp"])
-            idx = min(range(len(frame_times)), key=lambda i: abs(frame_times[i] - shot_ts))
-            closest_frame = tracking_frames[idx]
-
-            player_event_id = str(shot["player"]["id"])
-            team_event_id = str(shot["team"]["id"])
-            opp_team_event_id = str(shot["opponentTeam"]["id"])
-
-            player_tracking_id = player_map.get(player_event_id)
-            team_tracking_id = team_map.get(team_event_id)
-            opp_team_tracking_id = team_map.get(opp_team_event_id)
-            
-            if opp_team_tracking_id is None:
-                print(f"Skipping shot due to missing team mapping for opponent {opp_team_event_id}")
-                continue
-
-            ball_x = ball_y = None
-            if player_tracking_id and str(team_tracking_id) in closest_frame["data"]:
-                for player in closest_frame["data"][str(team_tracking_id)]:
-                    if player["id"] == player_tracking_id:
-                        ball_x = player["x"]
-                        ball_y = player["y"]
-                        break
-
-            goalkeeper_id = None
-            team_id_key = str(opp_team_tracking_id)
-            for pid, info in players_data[team_id_key].items():
-                if info["position"] == "GK":
-                    goalkeeper_id = int(pid)
-                    break
-
-            goalkeeper_x = goalkeeper_y = None
-            if goalkeeper_id:
-                for player in closest_frame["data"][team_id_key]:
-                    if player["id"] == goalkeeper_id:
-                        goalkeeper_x = player["x"]
-                        goalkeeper_y = player["y"]
-                        break
-
-            if goalkeeper_x is not None and goalkeeper_y is not None and ball_x is not None and ball_y is not None:
-                dx = ball_x - goalkeeper_x
-                dy = ball_y - goalkeeper_y
-                distance_to_goalkeeper = (dx**2 + dy**2)**0.5
+        if id(closest_frame) not in tables:
+            tables[id(closest_frame)] = frame_tables(closest_frame)
+        frame_teams = tables[id(closest_frame)]
+
+        ball_x = ball_y = None
+        shooter_team = frame_teams.get(str(team_tracking_id))
+        if player_tracking_id and shooter_team is not None:
+            shooter = shooter_team.get(player_tracking_id)
+            if shooter is not None:
+                ball_x = shooter["x"]
+                ball_y = shooter["y"]
+
+        team_id_key = str(opp_team_tracking_id)
+        goalkeeper_id = lookup.goalkeeper(team_id_key)
+
+        goalkeeper_x = goalkeeper_y = None
+        opponent_team = frame_teams.get(team_id_key, EMPTY_TEAM)
+        goalkeeper = opponent_team.get(goalkeeper_id) if goalkeeper_id is not None else None
+        if goalkeeper_id:
+            if team_id_key not in frame_teams:
+                raise KeyError(team_id_key)
+            if goalkeeper is not None:
+                goalkeeper_x = goalkeeper["x"]
+                goalkeeper_y = goalkeeper["y"]
+
+        resolved.append({
+            "shot": shot,
+            "shot_ts": shot_ts,
+            "frame": closest_frame,
+            "frame_error": frame_error,
+            "frame_offset": frame_offset,
+            "kinematics": shot_kinematics,
+            "player_tracking_id": player_tracking_id,
+            "team_tracking_id": team_tracking_id,
+            "opp_team_tracking_id": opp_team_tracking_id,
+            "ball": (ball_x, ball_y),
+            "goalkeeper": (goalkeeper_x, goalkeeper_y),
+            "goalkeeper_id": goalkeeper_id,
+            "goalkeeper_found": goalkeeper is not None and "x" in goalkeeper and "y" in goalkeeper,
+            "opponents": opponent_team,
+            # Attackers in the cone are looked up with the raw team tracking id
+            "attackers": frame_teams.get(team_tracking_id, EMPTY_TEAM),
+        })
+
+    # Compute the geometric features of all shots in the match at once
+    if resolved:
+        n_players = max(len(r["opponents"]) + len(r["attackers"]) for r in resolved)
+        players_x = np.full((len(resolved), n_players), np.nan)
+        players_y = np.full((len(resolved), n_players), np.nan)
+        opponents = np.zeros((len(resolved), n_players), dtype=bool)
+        defenders = np.zeros((len(resolved), n_players), dtype=bool)
+        attackers = np.zeros((len(resolved), n_players), dtype=bool)
+        for i, r in enumerate(resolved):
+            opp, att = r["opponents"], r["attackers"]
+            n_opp, n_all = len(opp), len(opp) + len(att)
+            players_x[i, :n_opp] = opp.x
+            players_y[i, :n_opp] = opp.y
+            players_x[i, n_opp:n_all] = att.x
+            players_y[i, n_opp:n_all] = att.y
+            opponents[i, :n_opp] = True
+            defenders[i, :n_opp] = [pid != r["goalkeeper_id"] for pid in opp.ids]
+            attackers[i, n_opp:n_all] = True
+
+        features = shot_features(
+            ball_x=[_coord(r["ball"][0]) for r in resolved],
+            ball_y=[_coord(r["ball"][1]) for r in resolved],
+            gk_x=[_coord(r["goalkeeper"][0]) for r in resolved],
+            gk_y=[_coord(r["goalkeeper"][1]) for r in resolved],
+            players_x=players_x,
+            players_y=players_y,
+            opponents=opponents,
+            defenders=defenders,
+            attackers=attackers,
+        )
+
+    for i, r in enumerate(resolved):
+        shot = r["shot"]
+        closest_frame = r["frame"]
+        ball_x, ball_y = r["ball"]
+        goalkeeper_x, goalkeeper_y = r["goalkeeper"]
+
+        distance_to_goalkeeper = _value(features["distance_to_goalkeeper"][i])
+        distance_to_goal = _value(features["distance_to_goal"][i])
+        angle_to_goal = _value(features["angle_to_goal"][i])
+        angle_to_goal_deg = _value(features["angle_to_goal_degrees"][i])
+        goalkeeper_in_shot_path = bool(features["goalkeeper_in_shot_path"][i])
+        num_defenders_nearby = int(features["num_defenders_nearby"][i])
+        defenders_in_cone = int(features["defenders_in_cone"][i])
+        attackers_in_cone = int(features["attackers_in_cone"][i])
+        defenders_in_box = int(features["defenders_in_box"][i])
+        gk_in_cone = bool(features["goalkeeper_in_cone"][i]) if r["goalkeeper_found"] else None
+        distance_to_center_goal = _value(features["distance_to_center_goal"][i])
+        goalkeeper_angle_to_goal_deg = _value(features["goalkeeper_angle_to_goal_degrees"][i])
+
+        attacking_right = features["goal_x"][i] == 105
+        field_zone_6 = get_field_zone_6(ball_x, ball_y, attacking_right=attacking_right)
+
+        # Distance category
+        if distance_to_goal is not None:
+            if distance_to_goal < 10:
+                distance_category = "very_close"
+            elif distance_to_goal < 20:
+                distance_category = "close"
+            elif distance_to_goal < 30:
+                distance_category = "medium"
             else:
-                distance_to_goalkeeper = None
-
-            if ball_x is not None and ball_x > 50:
-                x_goal, y_goal = 105, 50
+                distance_category = "far"
+        else:
+            distance_category = None
+
+        # Angle category
+        if angle_to_goal_deg is not None:
+            if angle_to_goal_deg < 10:
+                angle_category = "narrow"
+            elif angle_to_goal_deg < 25:
+                angle_category = "medium"
             else:
-                x_goal, y_goal = 0, 50
-
-            if ball_x is not None and ball_y is not None:
-                distance_to_goal = ((x_goal - ball_x)**2 + (y_goal - ball_y)**2)**0.5
-            else:
-                distance_to_goal = None
-
-            goal_x = x_goal
-            goal_left_y = 30.34
-            goal_right_y = 37.66
-
-            if x_goal == 105:
-                goal_left = (105, goal_left_y)
-                goal_right = (105, goal_right_y)
-            else:
-                goal_left = (0, goal_right_y)
-                goal_right = (0, goal_left_y)
-
-            if ball_x is not None and ball_y is not None:
-                a = math.hypot(goal_x - ball_x, goal_left_y - ball_y)
-                b = math.hypot(goal_x - ball_x, goal_right_y - ball_y)
-                c = goal_right_y - goal_left_y
-                try:
-                    angle_to_goal = math.acos((a**2 + b**2 - c**2) / (2 * a * b))
-                except:
-                    angle_to_goal = None
-            else:
-                angle_to_goal = None
-
-            angle_to_goal_deg = math.degrees(angle_to_goal) if angle_to_goal is not None else None
-
-            goalkeeper_in_shot_path = is_goalkeeper_in_path(
-                shooter_x=ball_x,
-                shooter_y=ball_y,
-                gk_x=goalkeeper_x,
-                gk_y=goalkeeper_y,
-                goal_x=x_goal,
-                goal_y=34,
-                tolerance=5
-            )
-
-            opponent_tracking_id = str(opp_team_tracking_id)
-            num_defenders_nearby = 0
-            if opponent_tracking_id in closest_frame["data"]:
-                for player in closest_frame["data"][opponent_tracking_id]:
-                    if ball_x is not None and ball_y is not None and "x" in player and "y" in player:
-                        px, py = player["x"], player["y"]
-                        distance = math.hypot(ball_x - px, ball_y - py)
-                        if distance <= 5:
-                            num_defenders_nearby += 1
-
-            shooter_x, shooter_y = ball_x, ball_y
-            opponent_players = [
-                p for p in closest_frame["data"].get(opponent_tracking_id, [])
-                if p["id"] != goalkeeper_id
-            ]
-
-            try:
-                defenders_in_cone = count_defenders_in_cone(
-                    shooter_x, shooter_y,
-                    opponent_players,
-                    goal_left=goal_left,
-                    goal_right=goal_right
-                )
-            except:
-                defenders_in_cone = None
-
-            defenders_in_box = 0
-            for p in opponent_players:
-                if "x" in p and "y" in p:
-                    px, py = p["x"], p["y"]
-                    if x_goal == 105:
-                        in_area = px > 83.5 and 18 <= py <= 82
-                    else:
-                        in_area = px < 16.5 and 18 <= py <= 82
-                    if in_area:
-                        defenders_in_box += 1
-
-            attacking_right = x_goal == 105
-            field_zone_6 = get_field_zone_6(ball_x, ball_y, attacking_right=attacking_right)
-
-
-            # GoalKeeper in shooting cone
-            if goalkeeper_id is not None:
-                goalkeeper_player = next(
-                    (p for p in closest_frame["data"].get(opponent_tracking_id, []) if p["id"] == goalkeeper_id and "x" in p and "y" in p),
-                    None
-                )
-                if goalkeeper_player:
-                    gk_in_cone = count_defenders_in_cone(
-                        shooter_x, shooter_y,
-                        [goalkeeper_player],  
-                        goal_left=goal_left,
-                        goal_right=goal_right
-                    ) > 0
-                else:
-                    gk_in_cone = None
-            else:
-                gk_in_cone = None
-
-
-            # Count attackers in shooting cone
-            shooter_x, shooter_y = ball_x, ball_y
-            team_players = closest_frame["data"].get(team_tracking_id, [])
-            try:
-                attackers_in_cone = count_defenders_in_cone(
-                    shooter_x, shooter_y,
-                    team_players,
-                    goal_left=goal_left,
-                    goal_right=goal_right
-                )
-            except:
-                attackers_in_cone = None
-
-            # Distance category
-            if distance_to_goal is not None:
-                if distance_to_goal < 10:
-                    distance_category = "very_close"
-                elif distance_to_goal < 20:
-                    distance_category = "close"
-                elif distance_to_goal < 30:
-                    distance_category = "medium"
-                else:
-                    distance_category = "far"
-            else:
-                distance_category = None
-
-            # Angle category
-            if angle_to_goal_deg is not None:
-                if angle_to_goal_deg < 10:
-                    angle_category = "narrow"
-                elif angle_to_goal_deg < 25:
-                    angle_category = "medium"
-                else:
-                    angle_category = "wide"
-            else:
-                angle_category = None
-
-            # Pressure score
-            pressure_score = (
-                (num_defenders_nearby or 0) +
-                (defenders_in_cone or 0) +
-                (defenders_in_box or 0) +
-                (1 if goalkeeper_in_shot_path else 0)
+                angle_category = "wide"
+        else:
+            angle_category = None
+
+        # Pressure score
+        pressure_score = (
+            (num_defenders_nearby or 0) +
+            (defenders_in_cone or 0) +
+            (defenders_in_box or 0) +
+            (1 if goalkeeper_in_shot_path else 0)
+        )
+
+        # Header or not
+        bodypart = shot["shot"]['bodyPart']
+        if bodypart is not None:
+            header_or_not = bodypart.lower() == "head_or_other"
+        else:
+            header_or_not = None
+
+        row = {
+            "id": shot['id'],
+            "period": shot['matchPeriod'],
+            "minute": shot['minute'],
+            "second": shot['second'],
+            "ball_x": ball_x,
+            "ball_y": ball_y,
+            "videoTimestamp": r["shot_ts"],
+            "Frame": closest_frame['frame'],
+            "frame_time_error": float(r["frame_error"]),
+            "player_id": r["player_tracking_id"],
+            "team_id": r["team_tracking_id"],
+            "opp_team_id": r["opp_team_tracking_id"],
+            "position": shot['player']['position'],
+            "bodypart": shot["shot"]['bodyPart'],
+            "isGoal": shot["shot"]["isGoal"],
+            "on_target": shot["shot"]['onTarget'],
+            "xg": shot["shot"]["xg"],
+            "xg2": shot["shot"]["xg2"],
+            "period_frame": closest_frame["period"],
+            "goalkeeper_x": goalkeeper_x,
+            "goalkeeper_y": goalkeeper_y,
+            "distance_to_goalkeeper": distance_to_goalkeeper,
+            "distance_to_goal": distance_to_goal,
+            "angle_to_goal": angle_to_goal,
+            "angle_to_goal_degrees": angle_to_goal_deg,
+            "num_defenders_nearby": num_defenders_nearby,
+            "poss_duration": shot['possession']['duration'],
+            "poss_start_x":shot['possession']['startLocation']['x'],
+            "poss_start_y":shot['possession']['startLocation']['y'],
+            "goalkeeper_in_shot_path":goalkeeper_in_shot_path,
+            "defenders_in_box":defenders_in_box,
+            "field_zone_6": field_zone_6,
+            "distance_category": distance_category,
+            "angle_category": angle_category,
+            "pressure_score": pressure_score,
+            "header": header_or_not,
+            "defenders_in_cone": defenders_in_cone,
+            "attackers_in_cone":attackers_in_cone,
+            "goalkeeper_in_cone": gk_in_cone,
+            "distance_to_center_goal": distance_to_center_goal,
+            "goalkeeper_angle_to_goal_degrees": goalkeeper_angle_to_goal_deg,
+        }
+
+        if r["kinematics"] is not None:
+            row.update(r["kinematics"])
+
+        # Optional compact copy of (or pointer to) the frame instead of the full nested dict
+        if frame_payload == "array":
+            row["frame_snapshot"] = frame_snapshot(
+                closest_frame,
+                attacking_team=str(r["team_tracking_id"]),
+                defending_team=str(r["opp_team_tracking_id"]),
+                shooter_id=r["player_tracking_id"],
+                players_data=players_data,
             )
+        elif frame_payload == "ref":
+            row["frame_file"] = tracking_path
+            row["frame_offset"] = r["frame_offset"]
+        enriched.append(row)
+    return enriched
 
-            # Header or not
-            bodypart = shot["shot"]['bodyPart']
-            if bodypart is not None:
-                header_or_not = bodypart.lower() == "head_or_other"
-            else:
-                header_or_not = None
-
-            # Recoger jugadores de ambos equipos (excluyendo porteros)
-            attack_team_id = str(team_tracking_id)
-            defense_team_id = str(opp_team_tracking_id)
-
-            # Excluir portero del equipo rival (ya lo tienes como goalkeeper_id)
-            attacking_players = [
-                p for p in closest_frame["data"].get(attack_team_id, [])
-                if p.get("id") != player_tracking_id  # opcional: excluir el propio tirador
-            ]
-
-            defending_players = [
-                p for p in closest_frame["data"].get(defense_team_id, [])
-                if p.get("id") != goalkeeper_id
-            ]
-
-            # Combinar todos los jugadores (excepto porteros)
-            all_field_players = attacking_players + defending_players
-
-            # Calcular número de jugadores (atacantes + defensores) dentro del cono
-            try:
-                people_in_cone = count_defenders_in_cone(
-                    shooter_x, shooter_y,
-                    all_field_players,
-                    goal_left=goal_left,
-                    goal_right=goal_right
-                )
-            except:
-                people_in_cone = None
-
-            # Distance from goalkeeper to center of goal
-            if goalkeeper_x is not None and goalkeeper_y is not None:
-                distance_to_center_goal = math.hypot(goal_x - goalkeeper_x, 34 - goalkeeper_y)
+def _enrich_match_safe(match_id, files, player_map, team_map, frame_payload=None, cache=None, kinematics_window=None):
+    """
+    Run enrich_match, returning (rows, error message) so one bad match can't stop the run.
+    With a cache, previously enriched matches are loaded instead of recomputed
+    (frame arrays are not cached, so frame_payload="array" always recomputes).
+    """
+    with profiling.stage("match", match_id) as counts:
+        try:
+            if cache is None or frame_payload == "array":
+                rows = enrich_match(match_id, files, player_map, team_map, frame_payload, kinematics_window)
             else:
-                distance_to_center_goal = None
-
-
-            # Compute goalkeeper's angle to the goal (angle visible from GK's position)
-            if goalkeeper_x is not None and goalkeeper_y is not None:
-                a_gk = math.hypot(goal_x - goalkeeper_x, goal_left_y - goalkeeper_y)
-                b_gk = math.hypot(goal_x - goalkeeper_x, goal_right_y - goalkeeper_y)
-                c_gk = abs(goal_right_y - goal_left_y)  # vertical width of goal
+                rows = _enrich_match_cached(match_id, files, player_map, team_map, frame_payload, cache, kinematics_window)
+        except Exception as e:
+            counts["failed"] = 1
+            return [], f"{type(e).__name__}: {e}"
+        counts["rows"] = len(rows)
+        return rows, None
+
+def _enrich_match_in_pool(match_id, files, player_map, team_map, frame_payload, cache, kinematics_window, profile):
+    """_enrich_match_safe in a pool process; also returns the process's profile records when profiling."""
+    args = (match_id, files, player_map, team_map, frame_payload, cache, kinematics_window)
+    if not profile:
+        return _enrich_match_safe(*args) + (None,)
+    with profiling.capture() as records:
+        rows, error = _enrich_match_safe(*args)
+    return rows, error, records
+
+def _enrich_match_cached(match_id, files, player_map, team_map, frame_payload, cache, kinematics_window=None):
+    if not (os.path.exists(files['shots']) and os.path.exists(files['tracking'])):
+        return enrich_match(match_id, files, player_map, team_map, frame_payload, kinematics_window)
+    # "ref" rows point into the tracking file, so its location is part of the key too
+    frame_file = os.path.abspath(files['tracking']) if frame_payload == "ref" else None
+    # The window is only part of the key when set, so entries cached without kinematics stay valid
+    extra = [{"kinematics_window": kinematics_window}] if kinematics_window else []
+    key = cache.key(
+        [files['shots'], files['tracking']], player_map, team_map, ENRICHMENT_VERSION, frame_payload, frame_file, *extra,
+    )
+    with profiling.stage("cache_get", match_id) as counts:
+        cached = cache.get(key)
+        counts["hits"] = int(cached is not None)
+    if cached is not None:
+        print(f"Loaded match_id: {match_id} from cache")
+        return cached.to_dict('records')
+
+    rows = enrich_match(match_id, files, player_map, team_map, frame_payload, kinematics_window)
+    try:
+        cache.put(key, pd.DataFrame(rows))
+    except Exception as e:
+        print(f"Could not cache match {match_id}: {type(e).__name__}: {e}")
+    return rows
+
+def iter_enriched_matches(matched_files, player_map, team_map, workers=1, frame_payload=None, cache=None,
+                          kinematics_window=None):
+    """
+    Enrich matched shots/tracking pairs (as returned by match_input_files) one match at a time,
+    yielding (match_id, rows, error) in match order as soon as each match is done.
+    With workers > 1 matches are enriched in a process pool, refilled as soon as any match
+    completes, with at most 2 * workers matches in flight, largest (by file size) first
+    among the next MAX_AHEAD * workers matches. Progress is reported in completion order;
+    only the yielded matches are put back in match order, holding at most MAX_AHEAD * workers
+    matches, so memory does not grow with the number of matches.
+    A failing match is reported and yielded with its error instead of stopping the run.
+    frame_payload is passed to enrich_match (no frame data is kept by default).
+    cache is an optional lib.cache.EnrichmentCache of previously enriched matches.
+    kinematics_window (seconds) adds the kinematic features of lib.kinematics (off by default).
+    """
+    total = len(matched_files)
+    if workers > 1 and total > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            order = deque()  # matches taken from matched_files and not yielded yet, in match order
+            waiting = []  # (size, -position, match_id, files) of those not submitted yet
+            running = {}  # future -> match_id
+            finished = {}  # match_id -> (rows, error) of matches waiting for an earlier one
+            queued = enumerate(matched_files.items())
+            done = 0
+            while True:
+                # Refill the pool whenever matches complete, but stay at most
+                # MAX_AHEAD * workers matches ahead of the next one to yield
+                for position, (match_id, files) in itertools.islice(queued, MAX_AHEAD * workers - len(order)):
+                    order.append(match_id)
+                    waiting.append((match_size(files), -position, match_id, files))
+                # Largest first, so the pool does not end up waiting on a big match started last
+                waiting.sort()
+                while waiting and len(running) < 2 * workers:
+                    _, _, match_id, files = waiting.pop()
+                    future = pool.submit(_enrich_match_in_pool, match_id, files, player_map, team_map,
+                                         frame_payload, cache, kinematics_window, profiling.enabled())
+                    running[future] = match_id
+                if not order:
+                    break
+                completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    match_id = running.pop(future)
+                    rows, error, records = future.result()
+                    profiling.add_records(records)
+                    done += 1
+                    _report_match(match_id, rows, error, done, total)
+                    finished[match_id] = rows, error
+                while order and order[0] in finished:
+                    match_id = order.popleft()
+                    yield (match_id, *finished.pop(match_id))
+    else:
+        for done, (match_id, files) in enumerate(matched_files.items(), start=1):
+            rows, error = _enrich_match_safe(match_id, files, player_map, team_map, frame_payload, cache, kinematics_window)
+            _report_match(match_id, rows, error, done, total)
+            yield match_id, rows, error
 
-                try:
-                    goalkeeper_angle_to_goal = math.acos((a_gk**2 + b_gk**2 - c_gk**2) / (2 * a_gk * b_gk))
-                    goalkeeper_angle_to_goal_deg = math.degrees(goalkeeper_angle_to_goal)
-                except:
-                    goalkeeper_angle_to_goal = None
-                    goalkeeper_angle_to_goal_deg = None
-            else:
-                goalkeeper_angle_to_goal = None
-                goalkeeper_angle_to_goal_deg = None
-
-            all_shots.append({
-                "id": shot['id'],
-                "period": shot['matchPeriod'],
-                "minute": shot['minute'],
-                "second": shot['second'],
-                "ball_x": ball_x,
-                "ball_y": ball_y,
-                "videoTimestamp": shot_ts,
-                "Frame": closest_frame['frame'],
-                "player_id": player_tracking_id,
-                "team_id": team_tracking_id,
-                "opp_team_id": opp_team_tracking_id,
-                "position": shot['player']['position'],
-                "bodypart": shot["shot"]['bodyPart'],
-                "isGoal": shot["shot"]["isGoal"],
-                "on_target": shot["shot"]['onTarget'],
-                "xg": shot["shot"]["xg"],
-                "xg2": shot["shot"]["xg2"],
-                "period_frame": closest_frame["period"],
-                "data": closest_frame['data'],
-                "goalkeeper_x": goalkeeper_x,
-                "goalkeeper_y": goalkeeper_y,
-                "distance_to_goalkeeper": distance_to_goalkeeper,
-                "distance_to_goal": distance_to_goal,
-                "angle_to_goal": angle_to_goal,
-                "angle_to_goal_degrees": angle_to_goal_deg,
-                "num_defenders_nearby": num_defenders_nearby,
-                "poss_duration": shot['possession']['duration'],
-                "poss_start_x":shot['possession']['startLocation']['x'],
-                "poss_start_y":shot['possession']['startLocation']['y'],
-                "goalkeeper_in_shot_path":goalkeeper_in_shot_path,
-                "defenders_in_box":defenders_in_box,
-                "field_zone_6": field_zone_6,
-                "distance_category": distance_category,
-                "angle_category": angle_category,
-                "pressure_score": pressure_score,
-                "header": header_or_not,
-                "defenders_in_cone": defenders_in_cone,
-                "attackers_in_cone":attackers_in_cone,
-                "goalkeeper_in_cone": gk_in_cone,
-                "distance_to_center_goal": distance_to_center_goal,
-                "goalkeeper_angle_to_goal_degrees": goalkeeper_angle_to_goal_deg,
-            })
-        if not all_shots:
-            print("No enriched shots found for the input files. Check if they have valid data.")
-            return pd.DataFrame()
+def process_all_matches(filepaths, player_map, team_map, workers=1, frame_payload=None, cache=None,
+                        kinematics_window=None):
+    """
+    Enrich all matched shots/tracking pairs into one DataFrame, in the order of match_input_files.
+    filepaths can also be pairs already matched by match_input_files (a dict).
+    See iter_enriched_matches for workers, frame_payload, cache and kinematics_window.
+    """
+    matched_files = filepaths if isinstance(filepaths, dict) else match_input_files(filepaths)
+    all_shots = [
+        row
+        for _, rows, _ in iter_enriched_matches(
+            matched_files, player_map, team_map, workers, frame_payload, cache, kinematics_window
+        )
+        for row in rows
+    ]
+    if not all_shots:
+        print("No enriched shots found for the input files. Check if they have valid data.")
+        return pd.DataFrame()
 
     all_shots_df = pd.DataFrame(all_shots)
     return all_shots_df
 
-
+def _report_match(match_id, rows, error, done, total):
+    if error:
+        print(f"[{done}/{total}] Failed to process match {match_id}: {error}")
+    else:
+        print(f"[{done}/{total}] {match_id}: {len(rows)} shots enriched")
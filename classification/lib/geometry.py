@@ -0,0 +1,111 @@
+import numpy as np
+
+# Goal posts and reference points used by the shot features (see process_all_matches)
+GOAL_LEFT_Y = 30.34
+GOAL_RIGHT_Y = 37.66
+GOAL_CENTER_Y = 34
+DISTANCE_GOAL_Y = 50
+NEARBY_RADIUS = 5
+GK_PATH_TOLERANCE = 5
+
+
+def goal_x_for(ball_x):
+    """Goal being attacked: right goal (x=105) when the ball is past halfway, else left goal (x=0)."""
+    return np.where(np.asarray(ball_x, dtype=float) > 50, 105.0, 0.0)
+
+
+def _sign(p1x, p1y, p2x, p2y, p3x, p3y):
+    return (p1x - p3x) * (p2y - p3y) - (p2x - p3x) * (p1y - p3y)
+
+
+def in_cone(px, py, shooter_x, shooter_y, goal_x):
+    """
+    Vectorized point-in-triangle test for the shooting cone (shooter, left post, right post).
+    Points or shooters with missing (NaN) coordinates are never inside the cone.
+    All arguments must broadcast against each other.
+    """
+    right_goal = goal_x == 105
+    left_y = np.where(right_goal, GOAL_LEFT_Y, GOAL_RIGHT_Y)
+    right_y = np.where(right_goal, GOAL_RIGHT_Y, GOAL_LEFT_Y)
+
+    b1 = _sign(px, py, shooter_x, shooter_y, goal_x, left_y) < 0.0
+    b2 = _sign(px, py, goal_x, left_y, goal_x, right_y) < 0.0
+    b3 = _sign(px, py, goal_x, right_y, shooter_x, shooter_y) < 0.0
+    valid = ~np.isnan(px) & ~np.isnan(py) & ~np.isnan(shooter_x) & ~np.isnan(shooter_y)
+    return valid & (b1 == b2) & (b2 == b3)
+
+
+def _goal_angle(x, y, goal_x):
+    a = np.hypot(goal_x - x, GOAL_LEFT_Y - y)
+    b = np.hypot(goal_x - x, GOAL_RIGHT_Y - y)
+    c = GOAL_RIGHT_Y - GOAL_LEFT_Y
+    # Degenerate triangles give NaN here, where math.acos used to raise
+    return np.arccos((a**2 + b**2 - c**2) / (2 * a * b))
+
+
+def shot_features(ball_x, ball_y, gk_x, gk_y, players_x, players_y, opponents, defenders, attackers):
+    """
+    Compute the geometric shot features for a batch of shots in array operations.
+
+    ball_x, ball_y, gk_x, gk_y: (n_shots,) arrays, NaN where the position is unknown.
+    players_x, players_y: (n_shots, n_players) arrays of frame positions, NaN padded.
+    opponents: (n_shots, n_players) mask of opponent players (goalkeeper included).
+    defenders: (n_shots, n_players) mask of opponent players other than the goalkeeper.
+    attackers: (n_shots, n_players) mask of players counted as attackers in the cone.
+
+    Returns a dict of (n_shots,) arrays. Continuous features are NaN where the scalar
+    code returned None; counts and flags follow the scalar code exactly.
+    """
+    ball_x = np.asarray(ball_x, dtype=float)
+    ball_y = np.asarray(ball_y, dtype=float)
+    gk_x = np.asarray(gk_x, dtype=float)
+    gk_y = np.asarray(gk_y, dtype=float)
+    players_x = np.asarray(players_x, dtype=float)
+    players_y = np.asarray(players_y, dtype=float)
+
+    goal_x = goal_x_for(ball_x)
+    ball_known = ~np.isnan(ball_x) & ~np.isnan(ball_y)
+    gk_known = ~np.isnan(gk_x) & ~np.isnan(gk_y)
+    player_known = ~np.isnan(players_x) & ~np.isnan(players_y)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distance_to_goalkeeper = ((ball_x - gk_x)**2 + (ball_y - gk_y)**2)**0.5
+        distance_to_goal = ((goal_x - ball_x)**2 + (DISTANCE_GOAL_Y - ball_y)**2)**0.5
+        angle_to_goal = _goal_angle(ball_x, ball_y, goal_x)
+        goalkeeper_angle = _goal_angle(gk_x, gk_y, goal_x)
+        distance_to_center_goal = np.hypot(goal_x - gk_x, GOAL_CENTER_Y - gk_y)
+
+        # Goalkeeper lateral offset from the shooter -> goal centre line
+        shot_dx = goal_x - ball_x
+        shot_dy = GOAL_CENTER_Y - ball_y
+        cross = np.abs(shot_dx * (gk_y - ball_y) - shot_dy * (gk_x - ball_x))
+        shot_length = np.hypot(shot_dx, shot_dy)
+        lateral_offset = np.where(shot_length != 0, cross / shot_length, np.inf)
+    goalkeeper_in_shot_path = ball_known & gk_known & (lateral_offset <= GK_PATH_TOLERANCE)
+
+    bx = ball_x[:, None]
+    by = ball_y[:, None]
+    gx = goal_x[:, None]
+    nearby = np.hypot(bx - players_x, by - players_y) <= NEARBY_RADIUS
+    cone = in_cone(players_x, players_y, bx, by, gx)
+    in_box = np.where(
+        gx == 105,
+        players_x > 83.5,
+        players_x < 16.5,
+    ) & (players_y >= 18) & (players_y <= 82)
+
+    return {
+        "goal_x": goal_x,
+        "distance_to_goalkeeper": distance_to_goalkeeper,
+        "distance_to_goal": distance_to_goal,
+        "angle_to_goal": angle_to_goal,
+        "angle_to_goal_degrees": np.degrees(angle_to_goal),
+        "goalkeeper_in_shot_path": goalkeeper_in_shot_path,
+        "num_defenders_nearby": (opponents & player_known & nearby).sum(axis=1),
+        "defenders_in_cone": (defenders & cone).sum(axis=1),
+        "attackers_in_cone": (attackers & cone).sum(axis=1),
+        "defenders_in_box": (defenders & player_known & in_box).sum(axis=1),
+        "goalkeeper_in_cone": in_cone(gk_x, gk_y, ball_x, ball_y, goal_x),
+        "distance_to_center_goal": distance_to_center_goal,
+        "goalkeeper_angle_to_goal_degrees": np.degrees(goalkeeper_angle),
+    }
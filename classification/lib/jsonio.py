@@ -0,0 +1,120 @@
+import importlib.util
+import json
+
+# Fastest first; the first installed one is the default
+BACKENDS = ("msgspec", "orjson", "json")
+
+# Lines decoded per bulk call when scanning a tracking file
+CHUNK_LINES = 4096
+
+
+_available = None
+
+
+def available_backends():
+    """Installed backends, fastest first. Found without importing them: a backend's parser is imported on first use."""
+    global _available
+    if _available is None:
+        _available = [name for name in BACKENDS if name == "json" or importlib.util.find_spec(name) is not None]
+    return list(_available)
+
+
+class JsonBackend:
+    """
+    JSON decoding with the stdlib json module. Subclasses use faster parsers;
+    anything they reject (e.g. NaN literals) is decoded again with json, so all
+    backends return the same values.
+    """
+    name = "json"
+    errors = (ValueError,)
+
+    def _loads(self, data):
+        return json.loads(data)
+
+    def loads(self, data):
+        """Decode one JSON document (str or bytes)."""
+        try:
+            return self._loads(data)
+        except self.errors:
+            return json.loads(data)
+
+    def loads_lines(self, lines):
+        """Decode many JSON lines (bytes) with a single parser call."""
+        try:
+            return self._loads(b"[" + b",".join(lines) + b"]")
+        except self.errors:
+            return [json.loads(line) for line in lines]
+
+    def frame_timestamps(self, lines):
+        """Videotimestamp of each tracking frame line (None where it has none)."""
+        return [obj.get("Videotimestamp") for obj in self.loads_lines(lines)]
+
+
+class OrjsonBackend(JsonBackend):
+    name = "orjson"
+    errors = (ValueError,)
+
+    def __init__(self):
+        import orjson
+        self._orjson_loads = orjson.loads
+
+    def _loads(self, data):
+        return self._orjson_loads(data)
+
+    def loads_lines(self, lines):
+        # orjson is fastest per line: joining the lines first only adds a copy
+        orjson_loads = self._orjson_loads
+        try:
+            return [orjson_loads(line) for line in lines]
+        except self.errors:
+            return [json.loads(line) for line in lines]
+
+
+class MsgspecBackend(JsonBackend):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        class FrameStamp(msgspec.Struct):
+            """The only field of a tracking frame needed to index it; everything else is skipped, not decoded."""
+            Videotimestamp: float | None = None
+
+        self.errors = (ValueError, msgspec.DecodeError)
+        self._decoder = msgspec.json.Decoder()
+        self._stamps = msgspec.json.Decoder(list[FrameStamp])
+
+    def _loads(self, data):
+        return self._decoder.decode(data)
+
+    def frame_timestamps(self, lines):
+        try:
+            stamps = self._stamps.decode(b"[" + b",".join(lines) + b"]")
+        except self.errors:
+            return super().frame_timestamps(lines)
+        return [stamp.Videotimestamp for stamp in stamps]
+
+
+_BACKEND_CLASSES = {"json": JsonBackend, "orjson": OrjsonBackend, "msgspec": MsgspecBackend}
+_backends = {}
+
+
+def get_backend(name=None):
+    """JSON backend by name ("msgspec", "orjson" or "json"); the fastest installed one by default."""
+    name = name or available_backends()[0]
+    if name not in available_backends():
+        raise ValueError(f"JSON backend not available: {name} (installed: {', '.join(available_backends())})")
+    if name not in _backends:
+        _backends[name] = _BACKEND_CLASSES[name]()
+    return _backends[name]
+
+
+def loads(data):
+    """Decode one JSON document with the default backend."""
+    return get_backend().loads(data)
+
+
+def load(path):
+    """Decode a JSON file with the default backend."""
+    with open(path, "rb") as f:
+        return loads(f.read())
@@ -0,0 +1,259 @@
+from collections import deque
+import numpy as np
+from lib.alignment import FrameIndex
+from lib.jsonio import loads
+from lib.lookup import frame_tables, EMPTY_TEAM
+from lib.tracking import frame_index
+
+# Default length of the window of frames before each shot, in seconds
+DEFAULT_WINDOW_S = 2.0
+# Current velocities are measured over the last RECENT_S seconds before the shot; the
+# earlier velocity used for acceleration over [window - RECENT_S, window] seconds before it
+RECENT_S = 0.5
+# Largest gap between a sample's target time and the frame used for it
+SAMPLE_TOLERANCE_S = 0.2
+# A defender is closing in when within CLOSING_RADIUS of the shooter and approaching faster than CLOSING_SPEED
+CLOSING_RADIUS = 10
+CLOSING_SPEED = 1.0
+
+# Speeds are in pitch units per second (m/s on the 105 x 68 tracking pitch), headings in
+# degrees counter-clockwise from the +x axis
+KINEMATIC_FEATURES = [
+    'shooter_speed', 'shooter_heading_deg', 'shooter_acceleration',
+    'goalkeeper_speed', 'goalkeeper_heading_deg',
+    'defenders_closing_in', 'max_defender_closing_speed',
+]
+COUNT_FEATURES = {'defenders_closing_in'}
+
+
+def window_positions(timestamps, end_positions, window_s):
+    """
+    File positions of the frames in each shot's window: frames up to the shot's closest
+    frame (in file order) whose timestamp is at most window_s before it, in time order.
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    windows = []
+    for end in end_positions:
+        before = timestamps[:end + 1]
+        end_time = timestamps[end]
+        positions = np.flatnonzero((before >= end_time - window_s) & (before <= end_time))
+        windows.append(positions[np.argsort(before[positions], kind="stable")])
+    return windows
+
+
+def _jsonl_frames(tracking_path, offsets, positions):
+    """Stream the frames at these (sorted) positions, seeking only over gaps."""
+    with open(tracking_path, "rb") as f:
+        for pos in positions:
+            if f.tell() != offsets[pos]:
+                f.seek(offsets[pos])
+            yield pos, loads(f.readline())
+
+
+def _store_frames(store, positions):
+    for pos in positions:
+        yield pos, store.frame(pos)
+
+
+def _place(track, column, team, player_id):
+    i = team.index.get(player_id) if player_id is not None else None
+    if i is not None:
+        track[column] = (team.x[i], team.y[i])
+
+
+def _extract(window, buffer, shot):
+    """(times, shooter, goalkeeper, defenders) tracks of one shot over its window frames."""
+    team_key, opp_key, shooter_id, goalkeeper_id = shot
+    n_frames = len(window)
+    # Defenders are the opponents (goalkeeper excluded) present in the shot frame
+    shot_opponents = buffer[int(window[-1])][1].get(opp_key, EMPTY_TEAM)
+    defender_ids = [pid for pid in shot_opponents.ids if pid != goalkeeper_id]
+    times = np.full(n_frames, np.nan)
+    shooter = np.full((n_frames, 2), np.nan)
+    goalkeeper = np.full((n_frames, 2), np.nan)
+    defenders = np.full((n_frames, len(defender_ids), 2), np.nan)
+    for column, pos in enumerate(window):
+        time, tables = buffer[int(pos)]
+        times[column] = np.nan if time is None else time
+        _place(shooter, column, tables.get(team_key, EMPTY_TEAM), shooter_id)
+        opponents = tables.get(opp_key, EMPTY_TEAM)
+        _place(goalkeeper, column, opponents, goalkeeper_id)
+        for j, pid in enumerate(defender_ids):
+            _place(defenders[:, j], column, opponents, pid)
+    return times, shooter, goalkeeper, defenders
+
+
+def collect_tracks(frames, windows, shots):
+    """
+    Run once through the window frames, in file order. A ring buffer keeps only the
+    frames that a pending shot still needs. Each shot's tracks are extracted when its
+    closest (last) frame arrives. shots holds (team key, opponent key, shooter id,
+    goalkeeper id) per shot. Memory is bounded by the window frames of pending shots.
+    Returns one (times, shooter, goalkeeper, defenders) tuple per shot (None for an empty window).
+    """
+    tracks = [None] * len(windows)
+    by_end = {}
+    for i, window in enumerate(windows):
+        if len(window):
+            by_end.setdefault(int(window[-1]), []).append(i)
+    pending = deque(sorted(by_end))
+    first_needed = {end: min(int(windows[i].min()) for i in by_end[end]) for end in by_end}
+
+    buffer = {}
+    for pos, frame in frames:
+        buffer[int(pos)] = (frame.get("Videotimestamp"), frame_tables(frame))
+        while pending and pending[0] <= pos:
+            for i in by_end[pending.popleft()]:
+                tracks[i] = _extract(windows[i], buffer, shots[i])
+        # Drop frames before the earliest window start of the shots still to come
+        oldest = min((first_needed[end] for end in pending), default=None)
+        for old in [p for p in buffer if oldest is None or p < oldest]:
+            del buffer[old]
+    return tracks
+
+
+def _stack(tracks):
+    """Right-align the shots' tracks in NaN padded arrays; the last column is each shot frame."""
+    present = [t for t in tracks if t is not None]
+    width = max([len(t[0]) for t in present], default=1)
+    n_defenders = max([t[3].shape[1] for t in present], default=0)
+    n = len(tracks)
+    times = np.full((n, width), np.nan)
+    shooter = np.full((n, width, 2), np.nan)
+    goalkeeper = np.full((n, width, 2), np.nan)
+    defenders = np.full((n, width, n_defenders, 2), np.nan)
+    for i, track in enumerate(tracks):
+        if track is None:
+            continue
+        t, s, g, d = track
+        k = len(t)
+        times[i, width - k:] = t
+        shooter[i, width - k:] = s
+        goalkeeper[i, width - k:] = g
+        defenders[i, width - k:, :d.shape[1]] = d
+    return times, shooter, goalkeeper, defenders
+
+
+def _sample(times, seconds_before):
+    """Column of the frame closest to seconds_before the shot frame, per shot, and whether it is close enough."""
+    target = times[:, -1:] - seconds_before
+    gap = np.abs(np.where(np.isnan(times), np.inf, times) - target)
+    column = gap.argmin(axis=1)
+    return column, gap[np.arange(len(times)), column] <= SAMPLE_TOLERANCE_S
+
+
+def _at(track, column):
+    return track[np.arange(len(track)), column]
+
+
+def _velocity(track, times, start, end, valid):
+    dt = _at(times, end) - _at(times, start)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        velocity = (_at(track, end) - _at(track, start)) / dt[:, None]
+    velocity[~valid | ~(dt > 0)] = np.nan
+    return velocity
+
+
+def kinematic_features(times, shooter, goalkeeper, defenders, window_s=DEFAULT_WINDOW_S):
+    """
+    Compute the kinematic features of all shots at once from their window tracks.
+    Inputs: times (n_shots, W), shooter and goalkeeper (n_shots, W, 2), defenders
+    (n_shots, W, D, 2). Arrays are NaN padded, with the shot frame in the last column.
+    Returns {feature: (n_shots,) array}, NaN where the window does not cover the samples needed.
+    """
+    n, width = times.shape
+    end = np.full(n, width - 1)
+    recent, recent_ok = _sample(times, RECENT_S)
+    early_start, early_start_ok = _sample(times, window_s)
+    early_end, early_end_ok = _sample(times, window_s - RECENT_S)
+    recent_ok &= recent != end
+    early_ok = early_start_ok & early_end_ok & (early_start != early_end)
+
+    shooter_v = _velocity(shooter, times, recent, end, recent_ok)
+    goalkeeper_v = _velocity(goalkeeper, times, recent, end, recent_ok)
+    shooter_speed = np.hypot(shooter_v[:, 0], shooter_v[:, 1])
+    early_v = _velocity(shooter, times, early_start, early_end, early_ok)
+    # Acceleration between the midpoints of the early and recent intervals
+    mid_recent = (_at(times, recent) + _at(times, end)) / 2
+    mid_early = (_at(times, early_start) + _at(times, early_end)) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acceleration = (shooter_speed - np.hypot(early_v[:, 0], early_v[:, 1])) / (mid_recent - mid_early)
+
+    # Defender distance to the shooter in the shot frame and RECENT_S earlier
+    rows = np.arange(n)
+    now = defenders[rows, end] - shooter[rows, end][:, None]
+    before = defenders[rows, recent] - shooter[rows, recent][:, None]
+    distance_now = np.hypot(now[..., 0], now[..., 1])
+    dt = _at(times, end) - _at(times, recent)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        closing_speed = (np.hypot(before[..., 0], before[..., 1]) - distance_now) / dt[:, None]
+    closing_speed[~recent_ok] = np.nan
+    with np.errstate(invalid="ignore"):
+        closing_in = ((closing_speed > CLOSING_SPEED) & (distance_now <= CLOSING_RADIUS)).sum(axis=1)
+    max_closing = np.fmax.reduce(closing_speed, axis=1, initial=-np.inf)
+    max_closing[np.isinf(max_closing)] = np.nan
+
+    return {
+        'shooter_speed': shooter_speed,
+        'shooter_heading_deg': np.degrees(np.arctan2(shooter_v[:, 1], shooter_v[:, 0])),
+        'shooter_acceleration': acceleration,
+        'goalkeeper_speed': np.hypot(goalkeeper_v[:, 0], goalkeeper_v[:, 1]),
+        'goalkeeper_heading_deg': np.degrees(np.arctan2(goalkeeper_v[:, 1], goalkeeper_v[:, 0])),
+        'defenders_closing_in': np.where(recent_ok, closing_in, np.nan),
+        'max_defender_closing_speed': max_closing,
+    }
+
+
+def match_kinematics(shots_data, shot_times, lookup, timestamps, frames_at, window_s=DEFAULT_WINDOW_S):
+    """
+    Kinematic features of every shot of a match, as one dict per shot (values are None
+    where they cannot be computed). timestamps are the frame timestamps in file order and
+    frames_at(positions) yields (position, frame) for sorted positions; only the frames
+    within window_s before each shot are read.
+    """
+    if not len(timestamps) or not shots_data:
+        return [dict.fromkeys(KINEMATIC_FEATURES) for _ in shots_data]
+    end_positions, _ = FrameIndex(timestamps).nearest(shot_times)
+    windows = window_positions(timestamps, end_positions, window_s)
+
+    shots = []
+    for shot in shots_data:
+        opp_key = str(lookup.team(shot["opponentTeam"]["id"]))
+        shots.append((
+            str(lookup.team(shot["team"]["id"])), opp_key,
+            lookup.player(shot["player"]["id"]), lookup.goalkeepers.get(opp_key),
+        ))
+
+    needed = np.unique(np.concatenate(windows))
+    tracks = collect_tracks(frames_at(needed), windows, shots)
+    features = kinematic_features(*_stack(tracks), window_s=window_s)
+    return [
+        {name: _plain(name, values[i]) for name, values in features.items()}
+        for i in range(len(shots_data))
+    ]
+
+
+def _plain(name, value):
+    """Feature value for the enriched rows: int for counts, float otherwise, None for NaN."""
+    if np.isnan(value):
+        return None
+    return int(value) if name in COUNT_FEATURES else float(value)
+
+
+def tracking_kinematics(shots_data, shot_times, lookup, tracking_path, store=None, window_s=DEFAULT_WINDOW_S):
+    """match_kinematics reading the window frames from a converted store if given, else from the JSONL file."""
+    if store is not None:
+        return match_kinematics(shots_data, shot_times, lookup, store.arrays["timestamps"],
+                                lambda positions: _store_frames(store, positions), window_s)
+    timestamps, offsets = frame_index(tracking_path)
+    return match_kinematics(shots_data, shot_times, lookup, timestamps,
+                            lambda positions: _jsonl_frames(tracking_path, offsets, positions), window_s)
+
+
+def add_kinematics(results, shots_df):
+    """
+    Full-output results (a DataFrame indexed like the enriched shots it was scored from)
+    with the kinematic columns of shots_df joined on.
+    """
+    columns = [c for c in KINEMATIC_FEATURES if c in shots_df.columns]
+    return results.join(shots_df[columns]) if columns else results
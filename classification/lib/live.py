@@ -0,0 +1,214 @@
+import os
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from lib.alignment import FrameIndex
+from lib.enrichment import enrich_shots
+from lib.jsonio import load as load_json, loads
+from lib.kinematics import match_kinematics, add_kinematics
+from lib.lookup import MatchLookup
+from lib.output import open_writer
+from lib.tracking import load_frame
+
+# Seconds of the most recent frames kept in memory; older frames are read back by offset
+RECENT_FRAMES_S = 10.0
+
+
+class TailReader:
+    """Complete lines appended to a growing file since the last read, with their byte offsets."""
+
+    def __init__(self, path):
+        self.path = path
+        self.position = 0
+        self._partial = b""
+
+    def read_lines(self):
+        """[(offset, line)] of the lines completed since the last call (without the newline)."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return []
+        if size < self.position:
+            raise ValueError(f"{self.path} was truncated while following it")
+        if size == self.position:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.position)
+            data = f.read(size - self.position)
+        offset = self.position - len(self._partial)
+        self.position += len(data)
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()  # incomplete last line, kept for the next read
+        result = []
+        for line in lines:
+            result.append((offset, line))
+            offset += len(line) + 1
+        return result
+
+
+class LiveMatch:
+    """
+    State of one match while its files grow: the tracking metadata and lookups, the
+    timestamp and offset of every frame so far, the frames of the last RECENT_FRAMES_S
+    seconds, and the shots waiting for their frame.
+    """
+
+    def __init__(self, match_id, files, player_map, team_map, kinematics_window=None):
+        self.match_id = match_id
+        self.shots_path = files['shots']
+        self.tracking_path = files['tracking']
+        self.player_map = player_map
+        self.team_map = team_map
+        self.kinematics_window = kinematics_window
+        self.tracking = TailReader(self.tracking_path)
+        self.metadata = None
+        self.lookup = None
+        self.timestamps = []
+        self.offsets = []
+        self.recent = OrderedDict()  # frame position -> frame
+        self.pending = []
+        self.shots_seen = 0
+        self._shots_stamp = None
+
+    def poll(self):
+        """Read whatever was appended to the tracking and shots files; True if anything arrived."""
+        new_frames = self._poll_tracking()
+        new_shots = self._poll_shots()
+        return bool(new_frames or new_shots)
+
+    def _poll_tracking(self):
+        lines = self.tracking.read_lines()
+        for offset, line in lines:
+            if offset == 0:
+                self.metadata = loads(line)
+                self.lookup = MatchLookup(self.metadata, self.player_map, self.team_map)
+                continue
+            if not line.strip():
+                continue
+            frame = loads(line)
+            ts = frame.get("Videotimestamp")
+            if ts is None:
+                continue  # not indexed, as in lib.tracking.scan_frames
+            self.recent[len(self.timestamps)] = frame
+            self.timestamps.append(float(ts))
+            self.offsets.append(offset)
+        if lines and self.timestamps:
+            latest = self.timestamps[-1]
+            while self.recent and self.timestamps[next(iter(self.recent))] < latest - RECENT_FRAMES_S:
+                self.recent.popitem(last=False)
+        return len(lines)
+
+    def _poll_shots(self):
+        """The shots file is a JSON array rewritten as it grows; shots after those already seen are new."""
+        try:
+            stat = os.stat(self.shots_path)
+        except FileNotFoundError:
+            return 0
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp == self._shots_stamp:
+            return 0
+        try:
+            shots = load_json(self.shots_path) or []
+        except ValueError:
+            return 0  # caught mid-write: read it again on the next poll
+        self._shots_stamp = stamp
+        new = shots[self.shots_seen:]
+        self.shots_seen = len(shots)
+        self.pending.extend(new)
+        return len(new)
+
+    def ready_shots(self, final=False):
+        """
+        Take the pending shots whose closest frame is known: a frame at or after the shot
+        time has arrived, so no later frame can be closer. final=True takes them all.
+        """
+        if self.metadata is None or not self.timestamps:
+            return []
+        latest = self.timestamps[-1]
+        ready, waiting = [], []
+        for shot in self.pending:
+            (ready if final or float(shot["videoTimestamp"]) <= latest else waiting).append(shot)
+        self.pending = waiting
+        return ready
+
+    def frame(self, position):
+        """A frame seen so far, from memory if recent, otherwise read back from the file."""
+        frame = self.recent.get(position)
+        return frame if frame is not None else load_frame(self.tracking_path, self.offsets[position])
+
+    def enrich(self, shots):
+        """Enriched rows for shots, aligned and computed like lib.enrichment.enrich_match."""
+        shot_times = [float(shot["videoTimestamp"]) for shot in shots]
+        timestamps = np.array(self.timestamps)
+        positions, errors = FrameIndex(timestamps).nearest(shot_times)
+        kinematics = None
+        if self.kinematics_window:
+            kinematics = match_kinematics(
+                shots, shot_times, self.lookup, timestamps,
+                lambda needed: ((p, self.frame(p)) for p in needed), self.kinematics_window,
+            )
+        return enrich_shots(
+            shots, shot_times, [self.frame(p) for p in positions], errors, self.metadata,
+            self.player_map, self.team_map, frame_offsets=[self.offsets[p] for p in positions],
+            tracking_path=self.tracking_path, lookup=self.lookup, kinematics=kinematics,
+        )
+
+
+def follow(matched_files, player_map, team_map, scorer, out_path, fmt="csv", full_output=False,
+           poll_interval=0.1, idle_timeout=60.0, kinematics_window=None):
+    """
+    Follow growing shots/tracking files and score each shot as soon as its frame has
+    arrived, appending the predictions to out_path. Stops when no input has grown for
+    idle_timeout seconds (or on Ctrl-C); shots still waiting are then scored with the
+    closest frame available. Returns the number of shots written.
+    """
+    writer = open_writer(out_path, fmt)
+    writer.start()
+    matches = [LiveMatch(m, files, player_map, team_map, kinematics_window) for m, files in matched_files.items()]
+    print(f"Following {len(matches)} matches (Ctrl-C to stop, idle timeout {idle_timeout} s)")
+    scorer.model  # load the model now rather than on the first shot
+    written = 0
+    last_activity = time.monotonic()
+    try:
+        while True:
+            active = False
+            for match in matches:
+                active = match.poll() or active
+                written += _score(match, match.ready_shots(), scorer, writer, full_output)
+            # Idle time counts from the end of the last poll that found data
+            if active:
+                last_activity = time.monotonic()
+            elif idle_timeout is not None and time.monotonic() - last_activity >= idle_timeout:
+                print(f"No new data for {idle_timeout} s, stopping")
+                break
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("Stopping")
+    finally:
+        try:
+            for match in matches:
+                match.poll()
+                written += _score(match, match.ready_shots(final=True), scorer, writer, full_output)
+        finally:
+            writer.close()
+    return written
+
+
+def _score(match, shots, scorer, writer, full_output):
+    if not shots:
+        return 0
+    try:
+        rows = match.enrich(shots)
+        if not rows:
+            return 0
+        shots_df = pd.DataFrame(rows)
+        results = scorer.score(shots_df, full_output=full_output)
+        if full_output and match.kinematics_window:
+            results = add_kinematics(results, shots_df)
+    except Exception as e:
+        print(f"Failed to score {len(shots)} shots of match {match.match_id}: {type(e).__name__}: {e}")
+        return 0
+    writer.write(match.match_id, results)
+    print(f"{match.match_id}: scored {len(results)} shots (ids {', '.join(str(s['id']) for s in shots)})")
+    return len(results)
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class TeamFrame:
+    """The players of one team in one tracking frame, with an id -> index table and coordinate arrays."""
+
+    def __init__(self, players):
+        self.players = players
+        self.ids = [p.get("id") for p in players]
+        self.index = {}
+        for i, pid in enumerate(self.ids):
+            self.index.setdefault(pid, i)  # first occurrence, like a linear scan
+        self.x = np.array([p.get("x") for p in players], dtype=float)
+        self.y = np.array([p.get("y") for p in players], dtype=float)
+
+    def __len__(self):
+        return len(self.players)
+
+    def get(self, player_id):
+        """Player dict with this id, or None."""
+        i = self.index.get(player_id)
+        return None if i is None else self.players[i]
+
+
+EMPTY_TEAM = TeamFrame([])
+
+
+def frame_tables(frame):
+    """{team key: TeamFrame} for a tracking frame."""
+    return {team_key: TeamFrame(players) for team_key, players in frame["data"].items()}
+
+
+class MatchLookup:
+    """
+    Lookup tables of a match, built once from the tracking metadata line:
+    the goalkeeper of each team and event -> tracking id resolution.
+    """
+
+    def __init__(self, metadata, player_map, team_map):
+        self.players_data = metadata.get("players_data", {})
+        self.player_map = player_map
+        self.team_map = team_map
+        # First "GK" listed for each team (None if the team has none)
+        self.goalkeepers = {}
+        for team_key, players in self.players_data.items():
+            self.goalkeepers[team_key] = next(
+                (int(pid) for pid, info in players.items() if info.get("position") == "GK"), None
+            )
+        self._players = {}
+        self._teams = {}
+
+    def player(self, event_id):
+        """Tracking id of an event player id (None if unmapped)."""
+        if event_id not in self._players:
+            self._players[event_id] = self.player_map.get(str(event_id))
+        return self._players[event_id]
+
+    def team(self, event_id):
+        """Tracking id of an event team id (None if unmapped)."""
+        if event_id not in self._teams:
+            self._teams[event_id] = self.team_map.get(str(event_id))
+        return self._teams[event_id]
+
+    def goalkeeper(self, team_key):
+        """Goalkeeper tracking id of a team; KeyError if the team is not in the metadata."""
+        return self.goalkeepers[team_key]
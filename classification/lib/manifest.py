@@ -0,0 +1,90 @@
+import json
+import os
+from lib.cache import content_hash
+
+MANIFEST_FORMAT = 1
+
+
+def manifest_path_for(out_path):
+    return str(out_path) + ".manifest.json"
+
+
+class RunManifest:
+    """
+    Per-match progress of a streaming run, saved next to the output after every match.
+    For each match prefix it records the status ("done" or "failed"), the size, mtime and
+    content hash of its input files, the number of rows written and the byte range of
+    those rows in the output file.
+    settings (output path, model checksum, ...) must match for a run to be resumed.
+    """
+
+    def __init__(self, path, settings, hasher=content_hash):
+        self.path = str(path)
+        self.settings = settings
+        self.matches = {}
+        self.hasher = hasher
+
+    @classmethod
+    def load(cls, path, hasher=content_hash):
+        """The saved manifest at path, or None if there is none (or it cannot be read)."""
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if saved.get("format") != MANIFEST_FORMAT:
+            return None
+        manifest = cls(path, saved["settings"], hasher)
+        manifest.matches = saved["matches"]
+        return manifest
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"format": MANIFEST_FORMAT, "settings": self.settings, "matches": self.matches}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def input_state(self, match_id, files):
+        """Size, mtime and content hash of a match's input files (hashes are reused while size and mtime match)."""
+        previous = self.matches.get(match_id, {}).get("inputs", {})
+        state = {}
+        for kind, path in files.items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                state[kind] = {"path": path, "hash": None}
+                continue
+            old = previous.get(kind, {})
+            if old.get("size") == stat.st_size and old.get("mtime_ns") == stat.st_mtime_ns:
+                digest = old["hash"]
+            else:
+                digest = self.hasher(path)
+            state[kind] = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+        return state
+
+    def is_done(self, match_id, files):
+        """Whether a match was completed with the same input file contents."""
+        entry = self.matches.get(match_id)
+        if entry is None or entry["status"] != "done":
+            return False
+        current = self.input_state(match_id, files)
+        return all(
+            state["hash"] is not None and state["hash"] == entry["inputs"].get(kind, {}).get("hash")
+            for kind, state in current.items()
+        )
+
+    def record(self, match_id, inputs, status, rows=0, output=None, start=None, end=None, error=None):
+        self.matches[match_id] = {
+            "status": status,
+            "inputs": inputs,
+            "rows": rows,
+            "output": output,
+            "start": start,
+            "end": end,
+            "error": error,
+        }
+        self.save()
+
+    def keep_only(self, match_ids):
+        """Forget all matches except match_ids."""
+        self.matches = {m: e for m, e in self.matches.items() if m in match_ids}
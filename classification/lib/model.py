@@ -2,31 +2,41 @@ import json
 import pandas as pd
 from pathlib import Path
 import os
-import math
-import glob
-from lib.enrichment import process_all_matches
 
+import threading
 import joblib
 
+from lib import profiling
+from lib.compiled import CompiledModel, NativeModel, NATIVE_SUFFIX, file_sha256
+
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parent.parent / "models" / "best_model_lgbm.pkl"
+# Batches up to this size are scored with the compiled NumPy trees when available;
+# larger batches are faster through LightGBM itself
+COMPILED_MAX_BATCH = 1000
+
+# Features the model expects, in order
+FEATURES = [
+    'distance_to_goal', 'angle_to_goal_degrees', 'distance_to_goalkeeper',
+    'goalkeeper_angle_to_goal_degrees', 'distance_to_center_goal', 'num_defenders_nearby',
+    'defenders_in_box', 'defenders_in_cone', 'poss_start_x', 'poss_duration',
+    'attackers_in_cone', 'distance_category', 'angle_category',
+    'goalkeeper_in_shot_path', 'goalkeeper_in_cone'
+]
+
 def prepare_data_for_prediction(all_shots_df):
     excluded_features = [
         'Frame','player_id', 'team_id', 'opp_team_id', 'videoTimestamp', 'period_frame',
         'period', 'minute', 'second', 'ball_x', 'ball_y', 'goalkeeper_x', 'goalkeeper_y',
         'poss_start_y','xg', 'xg2', 'position',
-        'data','on_target','angle_to_goal',
+        'data','frame_snapshot','frame_file','frame_offset','frame_time_error',
+        'on_target','angle_to_goal',
     ]
 
     # Drop excluded columns
     df = all_shots_df.drop(columns=excluded_features, errors='ignore')
 
     # Features your model expects
-    features = [
-        'distance_to_goal', 'angle_to_goal_degrees', 'distance_to_goalkeeper',
-        'goalkeeper_angle_to_goal_degrees', 'distance_to_center_goal', 'num_defenders_nearby',
-        'defenders_in_box', 'defenders_in_cone', 'poss_start_x', 'poss_duration',
-        'attackers_in_cone', 'distance_category', 'angle_category',
-        'goalkeeper_in_shot_path', 'goalkeeper_in_cone'
-    ]
+    features = FEATURES
 
     # Check for missing columns
     missing = [col for col in features if col not in df.columns]
@@ -49,18 +59,17 @@ def prepare_data_for_prediction(all_shots_df):
 
     return X_pred
 
-def run_model(MODEL_PATH, X_pred, full_output=False):
+def _format_results(X_pred, predictions, full_output=False):
     """
-    Accepts a data frame.
-    Returns a list of dicts including predictions.
+    predictions is one array (written to a 'predictions' column) or a dict of
+    {column: array} with the predictions of several models.
     """
-    model = joblib.load(MODEL_PATH)
-    # Run predictions
-    predictions = model.predict(X_pred.drop(columns=['id']))
-
+    if not isinstance(predictions, dict):
+        predictions = {'predictions': predictions}
     if full_output:
         result_df = X_pred.copy()
-        result_df['predictions'] = predictions
+        for column, values in predictions.items():
+            result_df[column] = values
         # Ensure 'id' is first column
         cols = result_df.columns.tolist()
         if cols[0] != 'id':
@@ -69,4 +78,172 @@ def run_model(MODEL_PATH, X_pred, full_output=False):
             result_df = result_df[cols]
         return result_df
     else:
-        return [{'id': row['id'], 'predictions': float(pred)} for row, pred in zip(X_pred.to_dict('records'), predictions)]
+        columns = list(predictions)
+        return [
+            {'id': row_id, **{column: float(pred) for column, pred in zip(columns, preds)}}
+            for row_id, *preds in zip(X_pred['id'].tolist(), *predictions.values())
+        ]
+
+def load_model_file(model_path):
+    """A native LightGBM export (.lgb, see lib.compiled.export_native) or a pickled pipeline."""
+    if str(model_path).endswith(NATIVE_SUFFIX):
+        return NativeModel.load(model_path)
+    return joblib.load(model_path)
+
+def compiled_path_for(model_path):
+    """Where export_model.py writes the compiled artifact of a model (.pkl -> .npz)."""
+    return Path(model_path).with_suffix(".npz")
+
+def load_compiled_for(model_path):
+    """
+    Load the compiled artifact of a model if it exists and was exported from
+    exactly this model file (checked by checksum); otherwise None. For a native
+    export the pickle it was exported from must match.
+    """
+    path = compiled_path_for(model_path)
+    if not path.exists():
+        return None
+    compiled = CompiledModel.load(path)
+    if str(model_path).endswith(NATIVE_SUFFIX):
+        with open(str(model_path) + ".json") as f:
+            source_sha256 = json.load(f).get("source_sha256")
+    else:
+        source_sha256 = file_sha256(model_path)
+    if compiled.meta.get("source_sha256") != source_sha256:
+        return None
+    return compiled
+
+class ShotScorer:
+    """
+    Keeps a trained model loaded in memory for repeated scoring.
+    The model file is checked on every call and only reloaded when its
+    modification time (or size) changes. Small batches use the compiled
+    artifact from export_model.py when one matching the model file exists.
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH):
+        self.model_path = str(model_path)
+        self._model = None
+        self._compiled = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        stat = os.stat(self.model_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    with profiling.stage("load_model"):
+                        self._model = load_model_file(self.model_path)
+                        self._compiled = load_compiled_for(self.model_path)
+                    self._stamp = stamp
+
+    @property
+    def model(self):
+        self._refresh()
+        return self._model
+
+    @property
+    def compiled(self):
+        """The exported CompiledModel next to the model file, if it is up to date (else None)."""
+        self._refresh()
+        return self._compiled
+
+    def checksum(self):
+        return file_sha256(self.model_path)
+
+    def predict(self, X_pred):
+        """Predictions for a prepared feature frame (as returned by prepare_data_for_prediction)."""
+        X = X_pred.drop(columns=['id'])
+        compiled = self.compiled
+        with profiling.stage("predict", rows=len(X)):
+            if compiled is not None and len(X) <= COMPILED_MAX_BATCH:
+                return compiled.predict(X)
+            return self.model.predict(X)
+
+    def score(self, df, full_output=False):
+        """
+        Score a DataFrame of enriched shots (as returned by process_all_matches).
+        Returns the same structure as run_model.
+        """
+        with profiling.stage("prepare", rows=len(df)):
+            X_pred = prepare_data_for_prediction(df)
+        return _format_results(X_pred, self.predict(X_pred), full_output=full_output)
+
+    def score_records(self, records, full_output=False):
+        """Score an iterable of enriched shot dicts."""
+        return self.score(pd.DataFrame(list(records)), full_output=full_output)
+
+_scorers = {}
+
+def get_scorer(model_path=DEFAULT_MODEL_PATH):
+    """Shared ShotScorer per model path, so a model is unpickled once per process."""
+    key = os.path.abspath(model_path)
+    if key not in _scorers:
+        _scorers[key] = ShotScorer(model_path)
+    return _scorers[key]
+
+def model_label(model_path):
+    """Name of a model file in prediction columns: its file name without the extension."""
+    return Path(model_path).stem
+
+class MultiScorer:
+    """
+    Scores the same prepared features with several models at once. Each model's
+    predictions go to a 'predictions_<label>' column; the predictions run in
+    parallel threads (LightGBM and NumPy release the GIL while predicting).
+    models is a dict of {label: model path}; each model is loaded once per process.
+    """
+
+    def __init__(self, models):
+        self.scorers = {label: get_scorer(path) for label, path in models.items()}
+
+    @property
+    def model(self):
+        return {label: scorer.model for label, scorer in self.scorers.items()}
+
+    def checksum(self):
+        return {label: scorer.checksum() for label, scorer in self.scorers.items()}
+
+    def predict(self, X_pred):
+        """{'predictions_<label>': predictions} for a prepared feature frame."""
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(self.scorers)) as pool:
+            futures = {label: pool.submit(scorer.predict, X_pred) for label, scorer in self.scorers.items()}
+            return {f'predictions_{label}': future.result() for label, future in futures.items()}
+
+    def score(self, df, full_output=False):
+        with profiling.stage("prepare", rows=len(df)):
+            X_pred = prepare_data_for_prediction(df)
+        return _format_results(X_pred, self.predict(X_pred), full_output=full_output)
+
+    def score_records(self, records, full_output=False):
+        return self.score(pd.DataFrame(list(records)), full_output=full_output)
+
+def get_scorers(models):
+    """
+    A ShotScorer for one model path, or a MultiScorer for several: a list of paths
+    (labelled by model_label) or a dict of {label: path}.
+    """
+    if isinstance(models, (str, Path)):
+        return get_scorer(models)
+    if not isinstance(models, dict):
+        labels = [model_label(path) for path in models]
+        if len(set(labels)) != len(labels):
+            raise ValueError(f"Models need distinct file names to label their predictions: {labels}")
+        models = dict(zip(labels, models))
+    if len(models) == 1:
+        return get_scorer(next(iter(models.values())))
+    return MultiScorer(models)
+
+def run_model(MODEL_PATH, X_pred, full_output=False):
+    """
+    Accepts a data frame and a model path, or several models (a list of paths or a
+    dict of {label: path}) to score the same features with.
+    Returns a list of dicts including predictions (one 'predictions_<label>'
+    column per model when there are several).
+    Models are loaded once per process and reused until their file changes.
+    """
+    predictions = get_scorers(MODEL_PATH).predict(X_pred)
+    return _format_results(X_pred, predictions, full_output=full_output)
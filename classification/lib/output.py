@@ -0,0 +1,209 @@
+import os
+import shutil
+from lib.utils import save_csv, append_csv
+
+FORMATS = ("csv", "parquet", "arrow")
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+# Column types for Parquet/Arrow output; columns not listed keep their pandas type
+CATEGORIES = {
+    'distance_category': ["very_close", "close", "medium", "far"],
+    'angle_category': ["narrow", "medium", "wide"],
+}
+FLOAT32_COLUMNS = [
+    'distance_to_goal', 'angle_to_goal_degrees', 'distance_to_goalkeeper',
+    'goalkeeper_angle_to_goal_degrees', 'distance_to_center_goal', 'poss_start_x', 'poss_duration',
+    # Kinematic features (--kinematics-window); None where the window has no data
+    'shooter_speed', 'shooter_heading_deg', 'shooter_acceleration', 'goalkeeper_speed',
+    'goalkeeper_heading_deg', 'max_defender_closing_speed',
+]
+INT32_COLUMNS = ['num_defenders_nearby', 'defenders_in_box', 'defenders_in_cone', 'attackers_in_cone']
+# Counts that can be missing: nullable Int32, so a match with no value has the same schema
+NULLABLE_INT32_COLUMNS = ['defenders_closing_in']
+BOOL_COLUMNS = ['goalkeeper_in_shot_path', 'goalkeeper_in_cone']
+
+
+def typed_frame(results):
+    """
+    Results (list of dicts or DataFrame) as a DataFrame with compact column types:
+    categoricals with fixed categories, booleans, float32 features and int32 counts
+    (nullable Int32 where a count can be missing).
+    The types do not depend on the values, so every match gets the same schema.
+    """
+    import pandas as pd
+    df = results.copy() if isinstance(results, pd.DataFrame) else pd.DataFrame(results)
+    for column, categories in CATEGORIES.items():
+        if column in df.columns:
+            df[column] = pd.Categorical(df[column], categories=categories)
+    for column in FLOAT32_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("float32")
+    for column in INT32_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("int32")
+    for column in NULLABLE_INT32_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("Int32")
+    for column in BOOL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(bool)
+    return df
+
+
+def _arrow_table(results):
+    import pyarrow as pa
+    return pa.Table.from_pandas(typed_frame(results), preserve_index=False)
+
+
+def save_results(results, out_path, fmt="csv"):
+    """Write all results at once as CSV, Parquet or Arrow (IPC file)."""
+    if fmt == "csv":
+        save_csv(results, out_path)
+        return
+    writer = open_writer(out_path, fmt)
+    writer.start()
+    writer.write(None, results)
+    writer.close()
+
+
+class CsvWriter:
+    """Appends each match to one CSV file. Matches are byte ranges of the file, so runs can be resumed."""
+    resumable = True
+
+    def __init__(self, out_path):
+        self.out_path = str(out_path)
+
+    def start(self, keep=None):
+        """
+        Prepare the output. keep is None for a new output, or the manifest entries of
+        matches to keep from an earlier run: the file is cut back to their rows.
+        """
+        if keep is None:
+            if os.path.exists(self.out_path):
+                os.remove(self.out_path)
+        elif os.path.exists(self.out_path):
+            self._keep_only(keep)
+
+    def write(self, match_id, results):
+        """Append results; returns where they were written (output path and byte range)."""
+        start = os.path.getsize(self.out_path) if os.path.exists(self.out_path) else 0
+        append_csv(results, self.out_path)
+        if start == 0:
+            with open(self.out_path, "rb") as f:
+                start = len(f.readline())  # the header is not part of the match
+        return {"output": self.out_path, "start": start, "end": os.path.getsize(self.out_path)}
+
+    def close(self):
+        pass
+
+    def _keep_only(self, keep):
+        ranges = sorted(
+            ((e["start"], e["end"], e) for e in keep.values() if e.get("start") is not None), key=lambda r: r[0]
+        )
+        with open(self.out_path, "rb") as f:
+            header_end = len(f.readline())
+        contiguous = all(
+            start == (ranges[i - 1][1] if i else header_end) for i, (start, _, _) in enumerate(ranges)
+        )
+        if contiguous:
+            # Common case after an interrupted run: drop a partly written match at the end
+            with open(self.out_path, "r+b") as f:
+                f.truncate(ranges[-1][1] if ranges else header_end)
+            return
+        tmp_path = self.out_path + ".tmp"
+        with open(self.out_path, "rb") as src, open(tmp_path, "wb") as dst:
+            dst.write(src.readline())
+            for start, end, entry in ranges:
+                src.seek(start)
+                entry["start"] = dst.tell()
+                dst.write(src.read(end - start))
+                entry["end"] = dst.tell()
+        os.replace(tmp_path, self.out_path)
+
+
+class ArrowWriter:
+    """
+    Streams matches into one Parquet file (one row group per match) or Arrow IPC file
+    (one record batch per match). The file is only complete after close(), so these
+    outputs cannot be resumed.
+    """
+    resumable = False
+
+    def __init__(self, out_path, fmt):
+        self.out_path = str(out_path)
+        self.fmt = fmt
+        self._writer = None
+
+    def start(self, keep=None):
+        if keep is not None:
+            raise ValueError(f"A single {self.fmt} file cannot be resumed; use CSV or --partition-by-match.")
+        if os.path.exists(self.out_path):
+            os.remove(self.out_path)
+
+    def write(self, match_id, results):
+        table = _arrow_table(results)
+        if self._writer is None:
+            self._writer = self._open(table.schema)
+        self._writer.write_table(table)
+        return {"output": self.out_path, "start": None, "end": None}
+
+    def _open(self, schema):
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.out_path, schema)
+        import pyarrow as pa
+        return pa.ipc.new_file(self.out_path, schema)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class PartitionedWriter:
+    """Writes each match to its own file, out_dir/match=<prefix>/part<ext>, readable as one Hive-partitioned dataset."""
+    resumable = True
+
+    def __init__(self, out_dir, fmt):
+        self.out_dir = str(out_dir)
+        self.fmt = fmt
+
+    def path_for(self, match_id):
+        return os.path.join(self.out_dir, f"match={match_id}", "part" + EXTENSIONS[self.fmt])
+
+    def start(self, keep=None):
+        """Remove the partitions of an earlier run, except those of the matches in keep."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        kept = {f"match={match_id}" for match_id in (keep or {})}
+        for name in os.listdir(self.out_dir):
+            if name.startswith("match=") and name not in kept:
+                shutil.rmtree(os.path.join(self.out_dir, name))
+
+    def write(self, match_id, results):
+        if match_id is None:
+            raise ValueError("Partitioned output needs results per match (use --stream).")
+        path = self.path_for(match_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        if self.fmt == "csv":
+            save_csv(results, tmp_path)
+        else:
+            writer = ArrowWriter(tmp_path, self.fmt)
+            writer.write(match_id, results)
+            writer.close()
+        os.replace(tmp_path, path)
+        return {"output": path, "start": None, "end": None}
+
+    def close(self):
+        pass
+
+
+def open_writer(out_path, fmt="csv", partition_by_match=False):
+    """Output writer for a format; with partition_by_match, out_path is a directory with one file per match."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format: {fmt} (expected one of {', '.join(FORMATS)})")
+    if partition_by_match:
+        return PartitionedWriter(out_path, fmt)
+    if fmt == "csv":
+        return CsvWriter(out_path)
+    return ArrowWriter(out_path, fmt)
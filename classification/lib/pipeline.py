@@ -0,0 +1,85 @@
+import os
+import pandas as pd
+from lib import profiling
+from lib.cache import content_hash, data_hash
+from lib.enrichment import iter_enriched_matches, ENRICHMENT_VERSION
+from lib.kinematics import add_kinematics
+from lib.manifest import RunManifest, manifest_path_for
+from lib.output import open_writer
+
+
+def stream_scores(matched_files, player_map, team_map, scorer, out_path, full_output=False, workers=1, cache=None,
+                  manifest_path=None, resume=False, fmt="csv", partition_by_match=False, kinematics_window=None):
+    """
+    Enrich and score one match at a time, writing each match's predictions to
+    out_path as soon as it is done (see lib.output.open_writer for fmt and
+    partition_by_match). Only one match (or 2 * workers with a process pool) is held
+    in memory, and matches written before a crash stay in CSV or partitioned output.
+    Progress is recorded per match in a RunManifest (out_path + ".manifest.json" by
+    default). With resume=True, matches completed by an earlier run with the same
+    settings and unchanged input files are kept and skipped; failed, changed and new
+    matches are processed again. kinematics_window adds the kinematic features of
+    lib.kinematics to full output.
+    Returns the number of shots in the output.
+    """
+    writer = open_writer(out_path, fmt, partition_by_match)
+    if resume and not writer.resumable:
+        raise ValueError(f"A single {fmt} file cannot be resumed; use CSV or --partition-by-match.")
+
+    manifest_path = manifest_path or manifest_path_for(out_path)
+    settings = {
+        "output": os.path.abspath(out_path),
+        "format": fmt,
+        "partition_by_match": partition_by_match,
+        "full_output": full_output,
+        "kinematics_window": kinematics_window,
+        "model_sha256": scorer.checksum(),
+        # Shots skipped for a missing mapping leave a match "done" with fewer rows, so a
+        # fixed map (or changed enrichment code) must invalidate completed matches
+        "enrichment_version": ENRICHMENT_VERSION,
+        "maps_hash": data_hash(player_map, team_map),
+    }
+
+    # The enrichment cache already remembers file hashes by size/mtime
+    hasher = cache.file_hash if cache is not None else content_hash
+    manifest = RunManifest.load(manifest_path, hasher) if resume else None
+    if manifest is not None and manifest.settings == settings and os.path.exists(out_path):
+        done = [match_id for match_id, files in matched_files.items() if manifest.is_done(match_id, files)]
+        manifest.keep_only(done)
+        writer.start(keep=manifest.matches)
+        print(f"Resuming: {len(done)} matches already done, {len(matched_files) - len(done)} to process")
+        matched_files = {m: files for m, files in matched_files.items() if m not in done}
+    else:
+        if resume:
+            print("No resumable run found for this output (or settings changed): starting from scratch")
+        manifest = RunManifest(manifest_path, settings, hasher)
+        writer.start()
+    manifest.save()
+
+    try:
+        for match_id, rows, error in iter_enriched_matches(
+            matched_files, player_map, team_map, workers, cache=cache, kinematics_window=kinematics_window
+        ):
+            inputs = manifest.input_state(match_id, matched_files[match_id])
+            if error:
+                manifest.record(match_id, inputs, "failed", error=error)
+                continue
+            if not rows:
+                manifest.record(match_id, inputs, "done")
+                continue
+            try:
+                with profiling.stage("score", match_id, rows=len(rows)):
+                    shots_df = pd.DataFrame(rows)
+                    results = scorer.score(shots_df, full_output=full_output)
+                    if full_output and kinematics_window:
+                        results = add_kinematics(results, shots_df)
+            except Exception as e:
+                print(f"Failed to score match {match_id}: {type(e).__name__}: {e}")
+                manifest.record(match_id, inputs, "failed", error=f"{type(e).__name__}: {e}")
+                continue
+            with profiling.stage("write", match_id, rows=len(results)):
+                location = writer.write(match_id, results)
+            manifest.record(match_id, inputs, "done", rows=len(results), **location)
+    finally:
+        writer.close()
+    return sum(entry["rows"] for entry in manifest.matches.values() if entry["status"] == "done")
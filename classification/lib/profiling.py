@@ -0,0 +1,183 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Stages whose code is run under cProfile when a cProfile dump is requested. Only
+# their runs on the main thread are: a Profile must not be enabled from several
+# threads at once (e.g. MultiScorer's parallel "predict" stages)
+HOT_STAGES = {"features", "predict"}
+
+# Fields of every record; any other field is a count, summed per stage in the report
+RECORD_KEYS = {"stage", "match", "wall_s", "cpu_s", "peak_rss_mb", "pid", "error"}
+
+# The Profiler of this process while --profile is on; None (the default) makes stage() a no-op
+_active = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+class _NullStage:
+    """Returned by stage() when profiling is off: no clock reads, counts are discarded."""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name, match, counts):
+        self.profiler = profiler
+        self.name = name
+        self.match = match
+        self.counts = counts
+
+    def __enter__(self):
+        self.cprofiled = (self.name in HOT_STAGES and self.profiler.cprofile is not None
+                          and threading.current_thread() is threading.main_thread())
+        if self.cprofiled:
+            self.profiler.cprofile.enable()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self.counts
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        if self.cprofiled:
+            self.profiler.cprofile.disable()
+        record = {"stage": self.name, "match": self.match, "wall_s": wall, "cpu_s": cpu,
+                  "peak_rss_mb": peak_rss_mb(), "pid": os.getpid()}
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        record.update(self.counts)
+        self.profiler.records.append(record)
+        return False
+
+
+class Profiler:
+    """
+    Collects one record per stage run: wall time, CPU time, peak RSS so far and any
+    counts (rows, frames, ...) the stage reports. With cprofile=True the hot stages
+    (HOT_STAGES) also run under cProfile.
+    """
+
+    def __init__(self, cprofile=False):
+        self.records = []
+        self.started = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.cprofile = None
+        if cprofile:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+
+    def stage(self, name, match=None, counts=None):
+        return _Stage(self, name, match, counts if counts is not None else {})
+
+    def report(self):
+        """The JSON report: totals, a summary per stage and the stages of each match."""
+        stages, matches = {}, {}
+        for record in self.records:
+            summary = stages.setdefault(record["stage"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            summary["calls"] += 1
+            summary["wall_s"] += record["wall_s"]
+            summary["cpu_s"] += record["cpu_s"]
+            if record["peak_rss_mb"] is not None:
+                summary["peak_rss_mb"] = max(summary.get("peak_rss_mb", 0), record["peak_rss_mb"])
+            if "error" in record:
+                summary["errors"] = summary.get("errors", 0) + 1
+            for key, value in record.items():
+                if key not in RECORD_KEYS:
+                    summary[key] = summary.get(key, 0) + value
+            if record["match"] is not None:
+                entry = {k: v for k, v in record.items() if k not in ("stage", "match")}
+                matches.setdefault(str(record["match"]), {})[record["stage"]] = entry
+        return {
+            "command": sys.argv,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "total": {
+                "wall_s": time.perf_counter() - self.wall,
+                "cpu_s": time.process_time() - self.cpu,
+                "peak_rss_mb": peak_rss_mb(),
+            },
+            "stages": stages,
+            "matches": matches,
+        }
+
+    def write(self, path, cprofile_path=None):
+        tmp_path = str(path) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.report(), f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        if cprofile_path and self.cprofile is not None:
+            self.cprofile.dump_stats(cprofile_path)
+
+
+def stage(name, match=None, **counts):
+    """
+    Context manager timing a stage of the active profiler, yielding a dict the stage can
+    add counts to (e.g. counts["rows"] = len(rows)). Without an active profiler it only
+    returns a shared no-op object.
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name, match, counts)
+
+
+def enabled():
+    return _active is not None
+
+
+def start(cprofile=False):
+    """Start profiling this process and return the Profiler."""
+    global _active
+    _active = Profiler(cprofile)
+    return _active
+
+
+def stop():
+    """Stop profiling and return the Profiler that was active (or None)."""
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+@contextmanager
+def capture():
+    """
+    Profile a block with a fresh Profiler and yield its record list, restoring the
+    previous profiler afterwards. Used in pool processes, whose records are sent back
+    to the main process (see add_records).
+    """
+    global _active
+    previous, _active = _active, Profiler()
+    try:
+        yield _active.records
+    finally:
+        _active = previous
+
+
+def add_records(records):
+    """Add records collected in another process to the active profiler."""
+    if _active is not None and records:
+        _active.records.extend(records)
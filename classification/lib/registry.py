@@ -0,0 +1,133 @@
+import json
+import os
+import time
+from pathlib import Path
+from lib.utils import file_sha256
+
+# Manifest of the named models. Paths in it are relative to its directory.
+DEFAULT_REGISTRY_PATH = Path(__file__).resolve().parent.parent / "models" / "registry.json"
+
+FORMAT_PICKLE = "pickle"
+FORMAT_NATIVE = "lightgbm"
+
+
+class ModelRegistry:
+    """
+    Named model versions, in a JSON manifest:
+        {"default": name, "models": {name: entry}}
+    Each entry records the pickled pipeline and optionally its native LightGBM export
+    (see lib.compiled.export_native), with their checksums, the feature list and the
+    one-hot encoder categories, plus the training metadata written by train.py if any.
+    Scoring loads the native file when there is one.
+    """
+
+    def __init__(self, path=DEFAULT_REGISTRY_PATH):
+        self.path = Path(path)
+        self.default = None
+        self.models = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                manifest = json.load(f)
+            self.default = manifest.get("default")
+            self.models = manifest.get("models", {})
+
+    def _absolute(self, relative):
+        return os.path.normpath(os.path.join(self.path.parent, relative))
+
+    def _relative(self, path):
+        return os.path.relpath(os.path.abspath(path), self.path.parent.resolve())
+
+    def save(self):
+        tmp_path = str(self.path) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"default": self.default, "models": self.models}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def names(self):
+        return sorted(self.models)
+
+    def entry(self, name=None):
+        """The manifest entry of a model (the default model if name is None)."""
+        name = name or self.default
+        if name not in self.models:
+            known = ", ".join(self.names()) or "none"
+            raise ValueError(f"Unknown model '{name}' in {self.path} (registered: {known})")
+        return self.models[name]
+
+    def path_for(self, name=None, verify=True):
+        """
+        File to load for a model: its native export when registered, else the pickle.
+        With verify=True the file's checksum must match the manifest, and so must the
+        pickle's when it still exists next to a native export.
+        """
+        entry = self.entry(name)
+        fmt = FORMAT_NATIVE if entry.get("native") else FORMAT_PICKLE
+        artifact = entry["native"] if fmt == FORMAT_NATIVE else entry["pickle"]
+        path = self._absolute(artifact["path"])
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model file of '{name or self.default}' not found: {path}")
+        if verify:
+            if file_sha256(path) != artifact["sha256"]:
+                raise ValueError(f"Checksum mismatch for model '{name or self.default}': {path} changed since it was registered (register it again with register_model.py)")
+            # A retrained pickle makes its native export stale, even though the export is unchanged
+            pickle_path = self._absolute(entry["pickle"]["path"])
+            if fmt == FORMAT_NATIVE and os.path.exists(pickle_path) and file_sha256(pickle_path) != entry["pickle"]["sha256"]:
+                raise ValueError(f"Checksum mismatch for model '{name or self.default}': {pickle_path} changed since it was registered, so its native export is stale (re-register this model with register_model.py)")
+        return path
+
+    def register(self, name, model_path, native=True, default=False):
+        """
+        Add (or replace) a model from a pickled pipeline, exporting the native LightGBM
+        file next to it (<model>.lgb) unless native=False. Returns the new entry.
+        """
+        import joblib
+        from lib.compiled import export_native, NATIVE_SUFFIX
+        pipeline = joblib.load(model_path)
+        preprocessor = pipeline.steps[0][1]
+        categories = {}
+        for _, transformer, columns in preprocessor.transformers_:
+            if hasattr(transformer, "categories_"):
+                for column, values in zip(columns, transformer.categories_):
+                    categories[column] = [v.item() if hasattr(v, "item") else v for v in values]
+        entry = {
+            "pickle": {"path": self._relative(model_path), "sha256": file_sha256(model_path)},
+            "features": [str(c) for c in preprocessor.feature_names_in_],
+            "categories": categories,
+            "registered": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        if native:
+            native_path = str(Path(model_path).with_suffix(NATIVE_SUFFIX))
+            meta = export_native(pipeline, native_path, source_path=model_path)
+            entry["native"] = {"path": self._relative(native_path), "sha256": meta["sha256"]}
+        training_meta = Path(model_path).with_suffix(".json")
+        if training_meta.exists():
+            with open(training_meta) as f:
+                training = json.load(f)
+            entry["training"] = {k: training.get(k) for k in ("version", "created", "params", "test_metrics")}
+        self.models[name] = entry
+        if default or self.default is None:
+            self.default = name
+        self.save()
+        return entry
+
+    def remove(self, name):
+        self.entry(name)
+        del self.models[name]
+        if self.default == name:
+            self.default = None
+        self.save()
+
+
+def resolve_model(spec=None, registry_path=DEFAULT_REGISTRY_PATH, fallback=None):
+    """
+    Model file for --model: an existing file path is used as is, anything else is looked
+    up by name in the registry (None means its default model). Without a registry, None
+    resolves to fallback.
+    """
+    if spec is not None and os.path.isfile(spec):
+        return spec
+    if not Path(registry_path).exists():
+        if spec is None and fallback is not None:
+            return str(fallback)
+        raise FileNotFoundError(f"Model not found: {spec} (no file and no registry at {registry_path})")
+    return ModelRegistry(registry_path).path_for(spec)
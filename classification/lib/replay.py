@@ -0,0 +1,51 @@
+import json
+import os
+import time
+from lib.jsonio import load as load_json, loads
+
+
+def _write_shots(path, shots):
+    """Rewrite the shots JSON atomically, so a follower never reads half a file."""
+    tmp_path = str(path) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(shots, f)
+    os.replace(tmp_path, path)
+
+
+def replay_match(shots_path, tracking_path, out_dir, speed=1.0, shot_delay=0.0):
+    """
+    Replay a recorded match into out_dir as a live feed: the tracking frames are appended
+    to a JSONL file at the pace of their timestamps (divided by speed), and each shot is
+    added to the shots JSON once the match clock passes its timestamp plus shot_delay.
+    speed=0 writes everything without waiting. Returns the paths written (shots, tracking).
+    """
+    shots = sorted(load_json(shots_path) or [], key=lambda shot: float(shot["videoTimestamp"]))
+    out_shots = os.path.join(out_dir, os.path.basename(shots_path))
+    out_tracking = os.path.join(out_dir, os.path.basename(tracking_path))
+    published = []
+    _write_shots(out_shots, published)
+
+    started = time.monotonic()
+    first_ts = None
+    with open(tracking_path, "rb") as source, open(out_tracking, "wb") as out:
+        out.write(source.readline())  # metadata
+        out.flush()
+        for line in source:
+            ts = loads(line).get("Videotimestamp") if line.strip() else None
+            if ts is not None:
+                ts = float(ts)
+                if first_ts is None:
+                    first_ts = ts
+                if speed:
+                    wait = (ts - first_ts) / speed - (time.monotonic() - started)
+                    if wait > 0:
+                        time.sleep(wait)
+                due = [s for s in shots[len(published):] if float(s["videoTimestamp"]) + shot_delay <= ts]
+                if due:
+                    published.extend(due)
+                    _write_shots(out_shots, published)
+            out.write(line if line.endswith(b"\n") else line + b"\n")
+            out.flush()
+    if len(published) < len(shots):
+        _write_shots(out_shots, shots)
+    return out_shots, out_tracking
@@ -0,0 +1,255 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+from lib.enrichment import enrich_shots
+from lib.lookup import MatchLookup
+from lib.model import FEATURES, DEFAULT_MODEL_PATH, ShotScorer
+
+# Model features passed to the model as numbers (the others are one-hot encoded)
+NUMERICAL_FEATURES = [f for f in FEATURES if f not in (
+    'distance_category', 'angle_category', 'goalkeeper_in_shot_path', 'goalkeeper_in_cone')]
+
+
+class MicroBatcher:
+    """
+    Collects enriched shots submitted by concurrent request threads and scores
+    them together: one predict call per batch of up to max_batch shots, waiting
+    at most max_delay seconds for a batch to fill up.
+    """
+
+    def __init__(self, scorer, max_batch=64, max_delay=0.005):
+        self.scorer = scorer
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batch_sizes = deque(maxlen=10000)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        """Queue an enriched shot; the returned Future resolves to its prediction."""
+        future = Future()
+        self._queue.put((record, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._score(batch)
+
+    def _score(self, batch):
+        try:
+            results = self.scorer.score_records([record for record, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                # Score the shots one at a time, so a bad shot fails only its own request
+                for item in batch:
+                    self._score([item])
+            return
+        self.batch_sizes.append(len(batch))
+        for (_, future), result in zip(batch, results):
+            future.set_result(result['predictions'])
+
+
+class LatencyMetrics:
+    """
+    Request counters and latency percentiles over the most recent requests.
+    server_errors counts the requests of any endpoint answered with a 500.
+    """
+
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.server_errors = 0
+        self._lock = threading.Lock()
+
+    def record_server_error(self):
+        with self._lock:
+            self.server_errors += 1
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            self.requests += 1
+            if ok:
+                self.latencies.append(seconds)
+            else:
+                self.errors += 1
+
+    def snapshot(self, batch_sizes=()):
+        with self._lock:
+            latencies = np.array(self.latencies) * 1000
+            report = {"requests": self.requests, "errors": self.errors, "server_errors": self.server_errors}
+        if len(latencies):
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            report["latency_ms"] = {
+                "p50": float(p50),
+                "p90": float(p90),
+                "p99": float(p99),
+                "max": float(latencies.max()),
+            }
+        batch_sizes = list(batch_sizes)
+        if batch_sizes:
+            report["mean_batch_size"] = float(np.mean(batch_sizes))
+        return report
+
+
+class ScoringService:
+    """
+    Model, player/team maps and per-match tracking metadata kept in memory, so a
+    shot event plus its tracking frame can be enriched and scored on request.
+    """
+
+    def __init__(self, player_map, team_map, model_path=DEFAULT_MODEL_PATH, max_batch=64, max_delay=0.005):
+        self.player_map = player_map
+        self.team_map = team_map
+        self.matches = {}
+        self.scorer = ShotScorer(model_path)
+        self.scorer.model  # load now rather than on the first request
+        self.batcher = MicroBatcher(self.scorer, max_batch=max_batch, max_delay=max_delay)
+        self.metrics = LatencyMetrics()
+
+    def register_match(self, match_id, metadata):
+        """Store the tracking metadata line (players_data/teams_data) of a match."""
+        if not isinstance(metadata, dict):
+            raise TypeError(f"Match metadata must be a JSON object, not {type(metadata).__name__}")
+        self.matches[str(match_id)] = (metadata, MatchLookup(metadata, self.player_map, self.team_map))
+
+    def enrich(self, payload):
+        """
+        Enrich one shot. The payload holds the shot event ("shot"), its tracking frame
+        ("frame") and either the tracking metadata ("metadata") or the "match_id" of
+        metadata registered earlier.
+        """
+        shot = payload["shot"]
+        frame = payload["frame"]
+        if "metadata" in payload:
+            metadata, lookup = payload["metadata"], None
+        elif str(payload.get("match_id")) in self.matches:
+            metadata, lookup = self.matches[str(payload["match_id"])]
+        else:
+            raise ValueError("Request needs 'metadata' or the 'match_id' of a registered match.")
+
+        shot_ts = float(shot["videoTimestamp"])
+        frame_error = frame["Videotimestamp"] - shot_ts if "Videotimestamp" in frame else np.nan
+        rows = enrich_shots(
+            [shot], [shot_ts], [frame], [frame_error], metadata, self.player_map, self.team_map, lookup=lookup,
+        )
+        if not rows:
+            raise ValueError("Shot could not be enriched (missing team mapping for opponent).")
+        return rows[0]
+
+    def score(self, payload):
+        """Enrich one shot and return its xG prediction and model features."""
+        row = self.enrich(payload)
+        # goalkeeper_in_cone may be None: prepare_data_for_prediction casts it to bool
+        missing = [f for f in FEATURES if f != 'goalkeeper_in_cone' and row.get(f) is None]
+        if missing:
+            raise ValueError(f"Missing features for prediction: {missing}")
+        # Checked here rather than in the batch, where it would fail the other requests' shots
+        for feature in NUMERICAL_FEATURES:
+            try:
+                float(row[feature])
+            except (TypeError, ValueError):
+                raise ValueError(f"Feature {feature} is not a number: {row[feature]!r}") from None
+        prediction = self.batcher.submit(row).result()
+        return {"id": row["id"], "predictions": prediction, "features": {f: row[f] for f in FEATURES}}
+
+    def metrics_report(self):
+        return self.metrics.snapshot(self.batcher.batch_sizes)
+
+    def close(self):
+        self.batcher.close()
+
+
+def make_handler(service):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._send(200, service.metrics_report())
+            elif self.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": f"Unknown path: {self.path}"})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+            except ValueError as e:
+                self._send(400, {"error": f"Invalid JSON: {e}"})
+                return
+
+            if self.path == "/score":
+                start = time.perf_counter()
+                try:
+                    result = service.score(payload)
+                except Exception as e:
+                    service.metrics.record(time.perf_counter() - start, ok=False)
+                    self._send_error(e)
+                    return
+                service.metrics.record(time.perf_counter() - start)
+                self._send(200, result)
+            elif self.path.startswith("/matches/"):
+                try:
+                    service.register_match(self.path[len("/matches/"):], payload)
+                except Exception as e:
+                    self._send_error(e)
+                    return
+                self._send(200, {"status": "registered"})
+            else:
+                self._send(404, {"error": f"Unknown path: {self.path}"})
+
+        def _send_error(self, error):
+            """400 for a bad request payload, 500 (counted in /metrics) for anything else."""
+            if isinstance(error, (KeyError, TypeError, ValueError)):
+                self._send(400, {"error": f"{type(error).__name__}: {error}"})
+            else:
+                service.metrics.record_server_error()
+                self._send(500, {"error": f"Internal error: {type(error).__name__}: {error}"})
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+def make_server(service, host="127.0.0.1", port=8000):
+    """HTTP server for a ScoringService: POST /score, POST /matches/<id>, GET /metrics, GET /health."""
+    return ThreadingHTTPServer((host, port), make_handler(service))
@@ -0,0 +1,215 @@
+import json
+import os
+from array import array
+import numpy as np
+from lib.alignment import FrameIndex
+from lib.jsonio import get_backend, CHUNK_LINES
+
+# Binary tracking store: MAGIC, uint64 header length, JSON header, then the arrays
+STORE_FORMAT = 1
+MAGIC = b"IEXGTRK1"
+ALIGNMENT = 64
+
+
+def store_path_for(tracking_path):
+    """Store location for a tracking file: 123_tracking_data.jsonl -> 123_tracking_data.trk"""
+    root, _ = os.path.splitext(str(tracking_path))
+    return root + ".trk"
+
+
+def _source_stamp(tracking_path):
+    stat = os.stat(tracking_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def convert_tracking(tracking_path, store_path=None):
+    """
+    Convert a tracking JSONL file to a binary store that can be memory-mapped.
+    The store holds the metadata line as JSON, the timestamp/frame/period/byte offset
+    of every frame and, per team, fixed-width (frames x slots) player id and x/y arrays.
+    Returns the store path.
+    """
+    store_path = store_path or store_path_for(tracking_path)
+    source = _source_stamp(tracking_path)
+
+    timestamps, frames, periods, offsets = array("d"), array("q"), array("q"), array("q")
+    teams = {}  # team key -> per-frame counts (-1 when absent) and flat ids/x/y
+
+    backend = get_backend()
+
+    def flush(lines, line_offsets):
+        for obj, line_offset in zip(backend.loads_lines(lines), line_offsets):
+            if "Videotimestamp" in obj:
+                _append_frame(obj, len(timestamps), teams, timestamps, frames, periods)
+                offsets.append(line_offset)
+        lines.clear()
+        line_offsets.clear()
+
+    with open(tracking_path, "rb") as f:
+        metadata = backend.loads(f.readline())
+        offset = f.tell()
+        lines, line_offsets = [], []
+        for line in f:
+            if line.strip():
+                lines.append(line)
+                line_offsets.append(offset)
+                if len(lines) == CHUNK_LINES:
+                    flush(lines, line_offsets)
+            offset += len(line)
+        flush(lines, line_offsets)
+
+    arrays = {
+        "timestamps": np.frombuffer(timestamps, dtype=np.float64),
+        "frame": np.frombuffer(frames, dtype=np.int64),
+        "period": np.frombuffer(periods, dtype=np.int64),
+        "offsets": np.frombuffer(offsets, dtype=np.int64),
+    }
+    n_frames = len(timestamps)
+    for i, (team_key, team) in enumerate(teams.items()):
+        counts = np.frombuffer(team["counts"], dtype=np.int64)
+        counts = np.concatenate([counts, np.full(n_frames - len(counts), -1)])  # absent from the last frames
+        slots = max(int(counts.max()), 0)
+        # Scatter the flat player lists into (frames, slots) arrays
+        rows = np.repeat(np.arange(n_frames), np.maximum(counts, 0))
+        starts = np.cumsum(np.maximum(counts, 0)) - np.maximum(counts, 0)
+        cols = np.arange(len(rows)) - np.repeat(starts, np.maximum(counts, 0))
+        ids = np.full((n_frames, slots), -1, dtype=np.int64)
+        x = np.full((n_frames, slots), np.nan)
+        y = np.full((n_frames, slots), np.nan)
+        ids[rows, cols] = np.frombuffer(team["ids"], dtype=np.int64)
+        x[rows, cols] = np.frombuffer(team["x"], dtype=np.float64)
+        y[rows, cols] = np.frombuffer(team["y"], dtype=np.float64)
+        arrays.update({f"team{i}_count": counts.astype(np.int16), f"team{i}_id": ids, f"team{i}_x": x, f"team{i}_y": y})
+
+    # Array offsets are relative to the (aligned) end of the header
+    layout, position = {}, 0
+    for name, arr in arrays.items():
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": position}
+        position = _aligned(position + arr.nbytes)
+    header = json.dumps({
+        "format": STORE_FORMAT,
+        "source": source,
+        "metadata": metadata,
+        "n_frames": n_frames,
+        "teams": list(teams),
+        "arrays": layout,
+    }).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    tmp_path = store_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        for name, arr in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.truncate(data_start + position)
+    os.replace(tmp_path, store_path)
+    return store_path
+
+
+def _aligned(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def _append_frame(obj, index, teams, timestamps, frames, periods):
+    if not isinstance(obj.get("frame"), int) or not isinstance(obj.get("period"), int):
+        raise ValueError(f"Frame {index}: 'frame' and 'period' must be integers to convert.")
+    timestamps.append(obj["Videotimestamp"])
+    frames.append(obj["frame"])
+    periods.append(obj["period"])
+    for team_key, players in obj.get("data", {}).items():
+        team = teams.setdefault(team_key, {"counts": array("q"), "ids": array("q"), "x": array("d"), "y": array("d")})
+        # Frames this team was missing from so far
+        team["counts"].extend([-1] * (index - len(team["counts"])))
+        team["counts"].append(len(players))
+        for player in players:
+            if not isinstance(player.get("id"), int):
+                raise ValueError(f"Frame {index}: player ids must be integers to convert.")
+            team["ids"].append(player["id"])
+            x, y = player.get("x"), player.get("y")
+            team["x"].append(np.nan if x is None else x)
+            team["y"].append(np.nan if y is None else y)
+
+
+class TrackingStore:
+    """
+    Read-only, memory-mapped view of a store written by convert_tracking.
+    Only the timestamps and the frames that are actually requested are paged in.
+    """
+
+    def __init__(self, store_path):
+        self.path = store_path
+        with open(store_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a tracking store: {store_path}")
+            header_size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            self.header = json.loads(f.read(header_size))
+        self.data_start = _aligned(len(MAGIC) + 8 + header_size)
+        if self.header["format"] != STORE_FORMAT:
+            raise ValueError(f"Unsupported tracking store format: {self.header['format']}")
+        self.metadata = self.header["metadata"]
+        self.teams = self.header["teams"]
+        self.arrays = {name: self._map(spec) for name, spec in self.header["arrays"].items()}
+
+    def _map(self, spec):
+        shape = tuple(spec["shape"])
+        if not np.prod(shape):
+            return np.empty(shape, dtype=spec["dtype"])
+        return np.memmap(self.path, dtype=spec["dtype"], mode="r", offset=self.data_start + spec["offset"], shape=shape)
+
+    def __len__(self):
+        return self.header["n_frames"]
+
+    def is_fresh(self, tracking_path):
+        """Whether the store was converted from the current version of tracking_path."""
+        return self.header["source"] == _source_stamp(tracking_path)
+
+    def frame(self, position):
+        """Rebuild frame `position` as the dict found in the JSONL file."""
+        data = {}
+        for i, team_key in enumerate(self.teams):
+            count = int(self.arrays[f"team{i}_count"][position])
+            if count < 0:
+                continue
+            ids = self.arrays[f"team{i}_id"][position, :count]
+            xs = self.arrays[f"team{i}_x"][position, :count]
+            ys = self.arrays[f"team{i}_y"][position, :count]
+            data[team_key] = [
+                {"id": int(pid), "x": None if np.isnan(x) else float(x), "y": None if np.isnan(y) else float(y)}
+                for pid, x, y in zip(ids, xs, ys)
+            ]
+        return {
+            "frame": int(self.arrays["frame"][position]),
+            "period": int(self.arrays["period"][position]),
+            "Videotimestamp": float(self.arrays["timestamps"][position]),
+            "data": data,
+        }
+
+    def read(self, shot_timestamps):
+        """Same result as lib.tracking.read_tracking, read from the store."""
+        if not len(self):
+            missing = [None] * len(shot_timestamps)
+            return self.metadata, missing, np.full(len(shot_timestamps), np.nan), missing
+
+        positions, errors = FrameIndex(self.arrays["timestamps"]).nearest(shot_timestamps)
+        frames = {pos: self.frame(pos) for pos in np.unique(positions)}
+        offsets = self.arrays["offsets"]
+        return self.metadata, [frames[pos] for pos in positions], errors, [int(offsets[pos]) for pos in positions]
+
+
+def open_store_for(tracking_path):
+    """The converted store of a tracking file, or None if there is none or it is out of date."""
+    store_path = store_path_for(tracking_path)
+    if not os.path.exists(store_path):
+        return None
+    try:
+        store = TrackingStore(store_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable tracking store {store_path}: {e}")
+        return None
+    if not store.is_fresh(tracking_path):
+        print(f"Tracking store {store_path} is out of date, reading {tracking_path}")
+        return None
+    return store
@@ -0,0 +1,155 @@
+import os
+from array import array
+import numpy as np
+from lib.alignment import FrameIndex
+from lib.jsonio import get_backend, loads, CHUNK_LINES
+
+
+def index_path_for(tracking_path):
+    """Sidecar frame index of a tracking file: 123_tracking_data.jsonl -> 123_tracking_data.idx"""
+    root, _ = os.path.splitext(str(tracking_path))
+    return root + ".idx"
+
+
+def scan_frames(tracking_path, backend=None):
+    """
+    Timestamp (Videotimestamp) and byte offset of every frame, from a full pass over the file.
+    Lines are decoded in bulk, CHUNK_LINES at a time.
+    """
+    backend = backend or get_backend()
+    timestamps = array("d")
+    offsets = array("q")
+
+    def flush(lines, line_offsets):
+        for ts, line_offset in zip(backend.frame_timestamps(lines), line_offsets):
+            if ts is not None:
+                timestamps.append(ts)
+                offsets.append(line_offset)
+        lines.clear()
+        line_offsets.clear()
+
+    with open(tracking_path, "rb") as f:
+        f.readline()  # metadata
+        offset = f.tell()
+        lines, line_offsets = [], []
+        for line in f:
+            if line.strip():
+                lines.append(line)
+                line_offsets.append(offset)
+                if len(lines) == CHUNK_LINES:
+                    flush(lines, line_offsets)
+            offset += len(line)
+        flush(lines, line_offsets)
+    return np.frombuffer(timestamps, dtype=np.float64), np.frombuffer(offsets, dtype=np.int64)
+
+
+def _source_stamp(tracking_path):
+    stat = os.stat(tracking_path)
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def load_frame_index(tracking_path):
+    """(timestamps, offsets) from the sidecar index, or None if it is missing or out of date."""
+    try:
+        with np.load(index_path_for(tracking_path), allow_pickle=False) as index:
+            if not np.array_equal(index["source"], _source_stamp(tracking_path)):
+                return None
+            return index["timestamps"], index["offsets"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_frame_index(tracking_path):
+    """Scan a tracking file and save its sidecar index. Returns (timestamps, offsets)."""
+    source = _source_stamp(tracking_path)
+    timestamps, offsets = scan_frames(tracking_path)
+    index_path = index_path_for(tracking_path)
+    try:
+        with open(index_path + ".tmp", "wb") as f:
+            np.savez(f, source=source, timestamps=timestamps, offsets=offsets)
+        os.replace(index_path + ".tmp", index_path)
+    except OSError as e:
+        print(f"Could not save frame index {index_path}: {e}")
+    return timestamps, offsets
+
+
+def frame_index(tracking_path):
+    """(timestamps, offsets) of all frames, from the sidecar index if it is up to date."""
+    index = load_frame_index(tracking_path)
+    return index if index is not None else build_frame_index(tracking_path)
+
+
+def read_tracking(tracking_path, shot_timestamps, use_index=True):
+    """
+    Read the metadata (first line) of a tracking JSONL file, the closest frame for
+    every shot timestamp, the alignment error of each one and the byte offset of each
+    frame in the file (None/NaN when the file has no frames).
+    Frame timestamps and byte offsets come from the sidecar index (built on first use
+    and rebuilt when the file's size or mtime changes), so only the metadata line and
+    the closest frames are parsed. use_index=False always scans the file instead.
+    """
+    timestamps, offsets = frame_index(tracking_path) if use_index else scan_frames(tracking_path)
+
+    with open(tracking_path, "rb") as f:
+        metadata = loads(f.readline())
+
+        if not len(timestamps):
+            missing = [None] * len(shot_timestamps)
+            return metadata, missing, np.full(len(shot_timestamps), np.nan), missing
+
+        positions, errors = FrameIndex(timestamps).nearest(shot_timestamps)
+        frames = {}
+        for pos in np.unique(positions):
+            f.seek(offsets[pos])
+            frames[pos] = loads(f.readline())
+
+    return metadata, [frames[pos] for pos in positions], errors, [int(offsets[pos]) for pos in positions]
+
+
+def load_frame(tracking_path, offset):
+    """Read back a single frame from a tracking JSONL file by byte offset."""
+    with open(tracking_path, "rb") as f:
+        f.seek(offset)
+        return loads(f.readline())
+
+
+# Compact frame snapshots: one row per player slot with x, y, team code and role code
+SNAPSHOT_SLOTS = 32
+TEAM_ATTACKING, TEAM_DEFENDING, TEAM_OTHER = 0, 1, 2
+ROLE_PLAYER, ROLE_GOALKEEPER, ROLE_SHOOTER = 0, 1, 2
+
+
+def frame_snapshot(frame, attacking_team, defending_team, shooter_id, players_data):
+    """
+    Encode a frame as a fixed-width (SNAPSHOT_SLOTS, 4) float32 array of
+    [x, y, team code, role code] per player. Unused slots are NaN; players beyond
+    SNAPSHOT_SLOTS are dropped.
+    """
+    snapshot = np.full((SNAPSHOT_SLOTS, 4), np.nan, dtype=np.float32)
+    slot = 0
+    for team_key, players in frame["data"].items():
+        if team_key == attacking_team:
+            team_code = TEAM_ATTACKING
+        elif team_key == defending_team:
+            team_code = TEAM_DEFENDING
+        else:
+            team_code = TEAM_OTHER
+        positions = players_data.get(team_key, {})
+        for player in players:
+            if slot == SNAPSHOT_SLOTS:
+                return snapshot
+            if player.get("id") == shooter_id:
+                role = ROLE_SHOOTER
+            elif positions.get(str(player.get("id")), {}).get("position") == "GK":
+                role = ROLE_GOALKEEPER
+            else:
+                role = ROLE_PLAYER
+            x, y = player.get("x"), player.get("y")
+            snapshot[slot] = (
+                np.nan if x is None else x,
+                np.nan if y is None else y,
+                team_code,
+                role,
+            )
+            slot += 1
+    return snapshot
@@ -0,0 +1,195 @@
+import json
+import os
+import platform
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.compose import ColumnTransformer
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from lib.compiled import file_sha256
+from lib.model import FEATURES
+
+TARGET = 'isGoal'
+CATEGORICAL_FEATURES = ['distance_category', 'angle_category']
+BOOLEAN_FEATURES = ['goalkeeper_in_shot_path', 'goalkeeper_in_cone']
+NUMERICAL_FEATURES = [f for f in FEATURES if f not in CATEGORICAL_FEATURES + BOOLEAN_FEATURES]
+
+# Search space of the LightGBM regressor. n_estimators is an upper bound: each candidate
+# stops early once the validation loss has not improved for EARLY_STOPPING_ROUNDS rounds.
+DEFAULT_PARAM_GRID = {
+    'learning_rate': [0.01, 0.03, 0.1],
+    'max_depth': [3, 5, -1],
+    'num_leaves': [15, 31],
+    'min_child_samples': [10, 30],
+    'subsample': [0.8, 1.0],
+}
+MAX_ESTIMATORS = 2000
+EARLY_STOPPING_ROUNDS = 50
+# Settings of the notebook's split, kept so metrics stay comparable with earlier models
+TEST_SIZE = 0.3
+RANDOM_STATE = 42
+
+
+def training_data(shots_df):
+    """Feature frame and target of the enriched shots, without rows that have missing values."""
+    missing = [col for col in FEATURES + [TARGET] if col not in shots_df.columns]
+    if missing:
+        raise ValueError(f"Missing columns for training: {missing}")
+    df = shots_df.dropna(subset=FEATURES + [TARGET])
+    X = df[FEATURES].copy()
+    X['goalkeeper_in_cone'] = X['goalkeeper_in_cone'].astype(bool)
+    return X, df[TARGET].astype(int)
+
+
+def build_pipeline(**params):
+    """The scoring pipeline of the notebook: numerical passthrough, one-hot categoricals, LightGBM."""
+    import lightgbm as lgb
+    preprocessor = ColumnTransformer(transformers=[
+        ('num', 'passthrough', NUMERICAL_FEATURES),
+        ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES + BOOLEAN_FEATURES),
+    ])
+    regressor = lgb.LGBMRegressor(**dict({'random_state': RANDOM_STATE, 'n_jobs': 1, 'verbose': -1}, **params))
+    return Pipeline(steps=[('preprocessor', preprocessor), ('regressor', regressor)])
+
+
+def candidates(param_grid=None, n_iter=None, seed=RANDOM_STATE):
+    """Parameter sets to try: the whole grid, or n_iter of them sampled at random."""
+    param_grid = param_grid or DEFAULT_PARAM_GRID
+    if n_iter is not None and n_iter < len(ParameterGrid(param_grid)):
+        return list(ParameterSampler(param_grid, n_iter, random_state=seed))
+    return list(ParameterGrid(param_grid))
+
+
+def _fit_fold(params, X, y, train_index, valid_index, early_stopping_rounds):
+    """Fit one candidate on one fold with early stopping; (validation MSE, best iteration)."""
+    import lightgbm as lgb
+    pipeline = build_pipeline(n_estimators=MAX_ESTIMATORS, subsample_freq=1, **params)
+    preprocessor, regressor = pipeline.named_steps['preprocessor'], pipeline.named_steps['regressor']
+    X_train = preprocessor.fit_transform(X.iloc[train_index])
+    X_valid = preprocessor.transform(X.iloc[valid_index])
+    y_valid = y.iloc[valid_index]
+    regressor.fit(
+        X_train, y.iloc[train_index], eval_set=[(X_valid, y_valid)], eval_metric='l2',
+        callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)],
+    )
+    predictions = np.clip(regressor.booster_.predict(X_valid, num_iteration=regressor.best_iteration_), 0, 1)
+    return float(np.mean((predictions - y_valid.to_numpy()) ** 2)), int(regressor.best_iteration_ or MAX_ESTIMATORS)
+
+
+def search(X, y, param_sets, cv=3, workers=1, early_stopping_rounds=EARLY_STOPPING_ROUNDS):
+    """
+    Cross-validate every parameter set, running the (candidate, fold) fits in parallel.
+    Returns one result per candidate, best (lowest mean validation MSE) first, with the
+    number of trees to train: the mean best iteration over its folds.
+    """
+    folds = list(StratifiedKFold(cv, shuffle=True, random_state=RANDOM_STATE).split(X, y))
+    fits = Parallel(n_jobs=workers)(
+        delayed(_fit_fold)(params, X, y, train_index, valid_index, early_stopping_rounds)
+        for params in param_sets for train_index, valid_index in folds
+    )
+    results = []
+    for i, params in enumerate(param_sets):
+        scores, iterations = zip(*fits[i * cv:(i + 1) * cv])
+        results.append({
+            'params': params,
+            'cv_mse': float(np.mean(scores)),
+            'cv_mse_std': float(np.std(scores)),
+            'n_estimators': max(1, int(round(np.mean(iterations)))),
+        })
+    return sorted(results, key=lambda r: r['cv_mse'])
+
+
+def evaluate(y_true, y_pred):
+    """The notebook's test metrics of clipped xG predictions."""
+    from sklearn.metrics import brier_score_loss, r2_score, roc_auc_score
+    y_true = np.asarray(y_true)
+    y_pred = np.clip(y_pred, 0, 1)
+    metrics = {
+        'rmse': float(np.sqrt(np.mean((y_pred - y_true) ** 2))),
+        'brier': float(brier_score_loss(y_true, y_pred)),
+        'r2': float(r2_score(y_true, y_pred)),
+        'predicted_xg': float(y_pred.sum()),
+        'actual_goals': int(y_true.sum()),
+    }
+    metrics['abs_error'] = abs(metrics['predicted_xg'] - metrics['actual_goals'])
+    metrics['auc'] = float(roc_auc_score(y_true, y_pred)) if len(set(y_true)) > 1 else None
+    return metrics
+
+
+def train(shots_df, param_sets, cv=3, workers=1, early_stopping_rounds=EARLY_STOPPING_ROUNDS):
+    """
+    Search the parameter sets on the training split, refit the best one and evaluate it
+    on the held-out test split. Returns (fitted pipeline, metadata dict).
+    """
+    X, y = training_data(shots_df)
+    if y.nunique() < 2:
+        raise ValueError("Training needs both goals and non-goals.")
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
+    )
+    print(f"Searching {len(param_sets)} parameter sets x {cv} folds on {len(X_train)} shots ({workers} workers)")
+    started = time.perf_counter()
+    results = search(X_train, y_train, param_sets, cv=cv, workers=workers,
+                     early_stopping_rounds=early_stopping_rounds)
+    best = results[0]
+    print(f"Best parameters: {best['params']} ({best['n_estimators']} trees, CV MSE {best['cv_mse']:.6f})")
+
+    pipeline = build_pipeline(n_estimators=best['n_estimators'], subsample_freq=1,
+                              n_jobs=workers, **best['params'])
+    pipeline.fit(X_train, y_train)
+    pipeline.named_steps['regressor'].set_params(n_jobs=1)
+    metadata = {
+        'params': dict(best['params'], n_estimators=best['n_estimators']),
+        'cv_folds': cv,
+        'cv_mse': best['cv_mse'],
+        'search': results,
+        'search_seconds': time.perf_counter() - started,
+        'test_metrics': evaluate(y_test, pipeline.predict(X_test)),
+        'train_shots': len(X_train),
+        'test_shots': len(X_test),
+        'dropped_shots': len(shots_df) - len(X),
+    }
+    return pipeline, metadata
+
+
+def library_versions():
+    import lightgbm
+    import sklearn
+    return {'python': platform.python_version(), 'lightgbm': lightgbm.__version__,
+            'scikit-learn': sklearn.__version__, 'pandas': pd.__version__, 'numpy': np.__version__}
+
+
+def save_model(pipeline, metadata, model_dir, name="best_model_lgbm", version=None):
+    """
+    Write <name>-<version>.pkl and its <name>-<version>.json metadata (parameters, metrics,
+    features, encoder categories, library versions, checksum) to model_dir.
+    The version defaults to the UTC time. Returns (model path, metadata path).
+    """
+    import joblib
+    version = version or time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+    model_path = os.path.join(model_dir, f"{name}-{version}.pkl")
+    meta_path = os.path.join(model_dir, f"{name}-{version}.json")
+    if os.path.exists(model_path):
+        raise FileExistsError(f"Model version already exists: {model_path}")
+    joblib.dump(pipeline, model_path)
+    encoder = pipeline.named_steps['preprocessor'].named_transformers_['cat']
+    metadata = dict(
+        metadata,
+        name=name,
+        version=version,
+        created=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        features=FEATURES,
+        numerical_features=NUMERICAL_FEATURES,
+        categorical_features=CATEGORICAL_FEATURES + BOOLEAN_FEATURES,
+        categories={col: [c.item() if hasattr(c, 'item') else c for c in cats]
+                    for col, cats in zip(encoder.feature_names_in_, encoder.categories_)},
+        libraries=library_versions(),
+        sha256=file_sha256(model_path),
+    )
+    with open(meta_path, "w") as f:
+        json.dump(metadata, f, indent=2, default=str)
+    return model_path, meta_path
@@ -1,21 +1,32 @@
-import json
-import pandas as pd
+import hashlib
+import os
+from lib.jsonio import get_backend, load
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_mappings(path):
+    return load(path)
 
 def load_jsons(filepaths):
     data = []
     for path in filepaths:
         try:
-            with open(path) as f:
-                if path.endswith(".jsonl"):
-                    for line in f:
-                        data.append(json.loads(line))
-                else:
-                    data.append(json.load(f))
+            if path.endswith(".jsonl"):
+                with open(path, "rb") as f:
+                    data.extend(get_backend().loads_lines(f.read().splitlines()))
+            else:
+                data.append(load(path))
         except Exception as e:
             raise ValueError(f"Failed to load {path}: {e}")
     return data
 
 def save_csv(results, out_path):
+    import pandas as pd
     if isinstance(results, pd.DataFrame):
         df = results
     elif isinstance(results, list) and all(isinstance(r, dict) for r in results):
@@ -24,7 +35,16 @@ def save_csv(results, out_path):
         raise ValueError("Input must be a list of dictionaries or a DataFrame")
 
     try:
-        df = pd.DataFrame(results)
         df.to_csv(out_path, index=False)
     except Exception as e:
         raise IOError(f"Could not write CSV to {out_path}: {e}")
+
+def append_csv(results, out_path):
+    """Append results (list of dicts or DataFrame) to a CSV, writing the header only when the file is new or empty."""
+    import pandas as pd
+    df = results if isinstance(results, pd.DataFrame) else pd.DataFrame(results)
+    write_header = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+    try:
+        df.to_csv(out_path, mode="a", header=write_header, index=False)
+    except Exception as e:
+        raise IOError(f"Could not write CSV to {out_path}: {e}")
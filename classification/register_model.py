@@ -0,0 +1,44 @@
+import warnings
+warnings.filterwarnings("ignore", category=UserWarning)
+warnings.filterwarnings("ignore", category=FutureWarning)
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ImportWarning)
+
+import argparse
+from lib.registry import ModelRegistry, DEFAULT_REGISTRY_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description="Add, list or remove models in the model registry.")
+    parser.add_argument("name", nargs="?", help="Model name, used with classify_shots.py --model NAME.")
+    parser.add_argument("model_file", nargs="?", help="Trained pipeline (.pkl) to register under that name.")
+    parser.add_argument("--registry", default=str(DEFAULT_REGISTRY_PATH), help="Registry manifest path.")
+    parser.add_argument("--default", action="store_true", help="Make this the model used when --model is not given.")
+    parser.add_argument("--no-native", action="store_true", help="Do not export a native LightGBM model file; scoring then unpickles the .pkl.")
+    parser.add_argument("--remove", action="store_true", help="Remove the named model from the registry (its files are kept).")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    try:
+        if args.remove:
+            if not args.name:
+                parser.error("--remove needs a model name")
+            registry.remove(args.name)
+            print(f"Removed {args.name}")
+        elif args.model_file:
+            entry = registry.register(args.name, args.model_file, native=not args.no_native, default=args.default)
+            print(f"Registered {args.name}: {entry['native']['path'] if 'native' in entry else entry['pickle']['path']}")
+        elif args.name:
+            if args.default:
+                registry.entry(args.name)
+                registry.default = args.name
+                registry.save()
+            print(f"{args.name}: {registry.path_for(args.name)}")
+        for name in registry.names():
+            entry = registry.models[name]
+            fmt = "lightgbm" if entry.get("native") else "pickle"
+            print(f"{'*' if name == registry.default else ' '} {name} ({fmt}, {entry['registered']})")
+    except Exception as e:
+        print(f"Error: {e}")
+
+if __name__ == "__main__":
+    main()
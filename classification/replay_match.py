@@ -0,0 +1,34 @@
+import warnings
+warnings.filterwarnings("ignore", category=UserWarning)
+warnings.filterwarnings("ignore", category=FutureWarning)
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ImportWarning)
+
+import argparse
+import os
+from lib.replay import replay_match
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded match as growing shots/tracking files, to test classify_shots.py --follow offline.")
+    parser.add_argument("shots_file", help="Recorded shots JSON.")
+    parser.add_argument("tracking_file", help="Recorded tracking JSONL.")
+    parser.add_argument("--out-dir", required=True, help="Directory the live files are written to.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed (1 = real time, 10 = ten times faster, 0 = no waiting).")
+    parser.add_argument("--shot-delay", type=float, default=0.0, help="Seconds of match time after a shot before it appears in the shots file.")
+    args = parser.parse_args()
+    if args.speed < 0:
+        parser.error("--speed cannot be negative")
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    print(f"Replaying into {args.out_dir} at {args.speed}x (Ctrl-C to stop)")
+    try:
+        shots_path, tracking_path = replay_match(
+            args.shots_file, args.tracking_file, args.out_dir, speed=args.speed, shot_delay=args.shot_delay,
+        )
+    except KeyboardInterrupt:
+        print("Replay stopped")
+        return
+    print(f"Replay finished: {shots_path}, {tracking_path}")
+
+if __name__ == "__main__":
+    main()
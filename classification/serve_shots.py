@@ -0,0 +1,42 @@
+import warnings
+warnings.filterwarnings("ignore", category=UserWarning)
+warnings.filterwarnings("ignore", category=FutureWarning)
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ImportWarning)
+
+import argparse
+from lib.utils import load_mappings
+from lib.server import ScoringService, make_server
+from lib.model import DEFAULT_MODEL_PATH
+from lib.registry import resolve_model
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve xG predictions for live shots over HTTP.")
+    parser.add_argument("--player-map", required=True, help="Path to player mapping JSON.")
+    parser.add_argument("--team-map", required=True, help="Path to team mapping JSON.")
+    parser.add_argument("--model", help="Registered model name or model file (default: the registry's default model).")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on.")
+    parser.add_argument("--max-batch", type=int, default=64, help="Maximum shots scored in one predict call.")
+    parser.add_argument("--max-delay-ms", type=float, default=5.0, help="Maximum wait for a batch to fill up.")
+    args = parser.parse_args()
+
+    service = ScoringService(
+        load_mappings(args.player_map),
+        load_mappings(args.team_map),
+        model_path=resolve_model(args.model, fallback=DEFAULT_MODEL_PATH),
+        max_batch=args.max_batch,
+        max_delay=args.max_delay_ms / 1000,
+    )
+    server = make_server(service, args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} (POST /score, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
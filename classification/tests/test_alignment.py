@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pytest
+
+from lib.alignment import FrameIndex
+
+
+def linear_nearest(frame_times, shot_ts):
+    return min(range(len(frame_times)), key=lambda i: abs(frame_times[i] - shot_ts))
+
+
+def test_nearest_returns_positions_and_errors():
+    index = FrameIndex([0.0, 0.04, 0.08, 0.12])
+    positions, errors = index.nearest([0.05, -1.0, 3.0])
+    assert positions.tolist() == [1, 0, 3]
+    assert errors == pytest.approx([-0.01, 1.0, -2.88])
+
+
+def test_nearest_ties_pick_first_frame_in_file():
+    # 1.0 and 3.0 are equally close to 2.0; 3.0 comes first in the file
+    index = FrameIndex([3.0, 1.0, 1.0, 3.0])
+    positions, _ = index.nearest([2.0, 1.0, 3.0])
+    assert positions.tolist() == [0, 1, 0]
+
+
+def test_nearest_matches_linear_scan():
+    rng = np.random.default_rng(0)
+    # Coarse grid so duplicates and exact ties are common
+    frame_times = (rng.integers(0, 40, size=300) * 0.5).tolist()
+    shot_times = (rng.integers(-4, 84, size=500) * 0.25).tolist()
+
+    positions, errors = FrameIndex(frame_times).nearest(shot_times)
+    expected = [linear_nearest(frame_times, ts) for ts in shot_times]
+    assert positions.tolist() == expected
+    assert np.allclose(errors, np.array(frame_times)[expected] - np.array(shot_times))
+
+
+def test_nearest_on_empty_index():
+    with pytest.raises(ValueError):
+        FrameIndex([]).nearest([1.0])
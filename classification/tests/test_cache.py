@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import time
+
+import pandas as pd
+
+from lib.cache import EnrichmentCache
+from lib.enrichment import process_all_matches
+from tests.test_enrichment import write_match
+
+MAPS = ({"p1": 1}, {"t1": 100, "t2": 200})
+
+
+def test_cached_rerun_matches_fresh_enrichment(tmp_path, capsys):
+    files = write_match(tmp_path, "m0", [1, 2])
+    cache = EnrichmentCache(tmp_path / "cache")
+
+    fresh = process_all_matches(files, *MAPS)
+    first = process_all_matches(files, *MAPS, cache=cache)
+    capsys.readouterr()
+    second = process_all_matches(files, *MAPS, cache=cache)
+
+    assert "from cache" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(fresh, first)
+    pd.testing.assert_frame_equal(fresh, second)
+
+
+def test_cache_key_changes_with_inputs(tmp_path):
+    files = write_match(tmp_path, "m0", [1])
+    cache = EnrichmentCache(tmp_path / "cache")
+    key = cache.key(files, *MAPS)
+
+    assert cache.key(files, *MAPS) == key
+    assert cache.key(files, {"p1": 2}, MAPS[1]) != key
+
+    shots = json.loads(open(files[0]).read())
+    shots[0]["id"] = 99
+    with open(files[0], "w") as f:
+        json.dump(shots, f)
+    assert cache.key(files, *MAPS) != key
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    df = pd.DataFrame({"value": range(1000)})
+    cache = EnrichmentCache(tmp_path / "cache")
+    for key in ("a", "b", "c"):
+        cache.put(key, df)
+        time.sleep(0.01)
+    assert cache.get("a") is not None  # a is now the most recently used
+
+    entry_size = os.path.getsize(tmp_path / "cache" / "a.parquet")
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_corrupt_entry_is_dropped_and_re_enriched(tmp_path, capsys):
+    files = write_match(tmp_path, "m0", [1, 2])
+    cache = EnrichmentCache(tmp_path / "cache")
+    fresh = process_all_matches(files, *MAPS, cache=cache)
+    [entry] = (tmp_path / "cache").glob("*.parquet")
+    entry.write_bytes(entry.read_bytes()[:100])  # e.g. a write cut short
+
+    assert cache.get(entry.stem) is None
+    assert not entry.exists()
+    capsys.readouterr()
+    pd.testing.assert_frame_equal(process_all_matches(files, *MAPS, cache=cache), fresh)
+    assert "from cache" not in capsys.readouterr().out
+    assert entry.exists()
@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import joblib
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from lib.compiled import export_pipeline, CompiledModel
+from lib.model import ShotScorer, DEFAULT_MODEL_PATH, compiled_path_for
+
+def training_frame(n_rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        'distance_to_goal': rng.uniform(0, 60, n_rows),
+        'defenders_in_cone': rng.integers(0, 5, n_rows).astype(float),
+        'angle_category': rng.choice(['narrow', 'medium', 'wide'], n_rows),
+        'goalkeeper_in_cone': rng.random(n_rows) < 0.5,
+    })
+    # Missing values make LightGBM learn NaN-aware splits
+    X.loc[rng.random(n_rows) < 0.1, 'distance_to_goal'] = np.nan
+    y = (X['distance_to_goal'].fillna(30) < 15).astype(float) * 0.5 + X['goalkeeper_in_cone'] * 0.2
+    return X, y
+
+def fit_pipeline(X, y):
+    pipeline = Pipeline(steps=[
+        ('preprocessor', ColumnTransformer(transformers=[
+            ('num', 'passthrough', ['distance_to_goal', 'defenders_in_cone']),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), ['angle_category', 'goalkeeper_in_cone'])
+        ])),
+        ('regressor', lgb.LGBMRegressor(n_estimators=30, num_leaves=7, random_state=0, verbose=-1))
+    ])
+    return pipeline.fit(X, y)
+
+def test_compiled_model_matches_pipeline(tmp_path):
+    X, y = training_frame()
+    pipeline = fit_pipeline(X, y)
+    export_pipeline(pipeline, tmp_path / "model.npz")
+    compiled = CompiledModel.load(tmp_path / "model.npz")
+
+    X_new, _ = training_frame(seed=1)
+    X_new.loc[0, 'angle_category'] = 'unseen'  # unknown categories one-hot to all zeros
+    np.testing.assert_allclose(compiled.predict(X_new), pipeline.predict(X_new), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(compiled.predict(X_new.iloc[:1]), pipeline.predict(X_new.iloc[:1]), rtol=0, atol=1e-12)
+
+def test_shipped_compiled_model_is_up_to_date():
+    scorer = ShotScorer(DEFAULT_MODEL_PATH)
+    assert compiled_path_for(DEFAULT_MODEL_PATH).exists()
+    assert scorer.compiled is not None
+
+def test_scorer_ignores_stale_compiled_artifact(tmp_path):
+    X, y = training_frame()
+    model_path = tmp_path / "model.pkl"
+    joblib.dump(fit_pipeline(X, y), model_path)
+    export_pipeline(joblib.load(model_path), compiled_path_for(model_path), source_path=model_path)
+    assert ShotScorer(model_path).compiled is not None
+
+    joblib.dump(fit_pipeline(X, y * 2), model_path)
+    assert ShotScorer(model_path).compiled is None
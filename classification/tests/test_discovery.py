@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from concurrent.futures import Future
+
+import pandas as pd
+
+
+from lib.discovery import discover_matches, iter_input_paths
+from tests.test_enrichment import write_match
+
+
+def test_discover_matches_from_directories_globs_and_list(tmp_path):
+    (tmp_path / "season" / "round1").mkdir(parents=True)
+    (tmp_path / "season" / "round2").mkdir(parents=True)
+    write_match(tmp_path / "season" / "round1", "m1", [1])
+    write_match(tmp_path / "season" / "round2", "m2", [2])
+    write_match(tmp_path, "m3", [3])
+    (tmp_path / "season" / "notes.txt").write_text("not an input")
+    input_list = tmp_path / "inputs.txt"
+    input_list.write_text(f"# extra matches\n{tmp_path / 'm3*'}\n")
+
+    assert sorted(discover_matches([str(tmp_path / "season")])) == ["m1", "m2"]
+    assert sorted(discover_matches([str(tmp_path / "season" / "**" / "m2*")])) == ["m2"]
+    assert sorted(discover_matches([], input_list=str(input_list))) == ["m3"]
+
+
+def test_discovery_does_not_open_input_files(tmp_path, monkeypatch):
+    write_match(tmp_path, "m1", [1])
+    import builtins
+    real_open = builtins.open
+
+    def guarded_open(path, *args, **kwargs):
+        assert not str(path).startswith(str(tmp_path)), f"opened {path}"
+        return real_open(path, *args, **kwargs)
+    monkeypatch.setattr(builtins, "open", guarded_open)
+    assert len(list(iter_input_paths([str(tmp_path)]))) == 2
+
+
+class InlinePool:
+    """Stands in for the process pool: runs each match when submitted, recording the order."""
+
+    def __init__(self, max_workers):
+        self.submitted = []
+        InlinePool.last = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        self.submitted.append(args[0])
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def test_parallel_runs_start_large_matches_first_but_keep_discovery_order(tmp_path, monkeypatch):
+    from lib import enrichment
+    for name, shot_ids in (("a_small", [1]), ("b_large", list(range(10, 60))), ("c_small", [2])):
+        write_match(tmp_path, name, shot_ids)
+    matched = discover_matches([str(tmp_path)])
+    maps = ({"p1": 1}, {"t1": 100, "t2": 200})
+
+    sequential = enrichment.process_all_matches(matched, *maps)
+    monkeypatch.setattr(enrichment, "ProcessPoolExecutor", InlinePool)
+    parallel = enrichment.process_all_matches(matched, *maps, workers=2)
+
+    assert InlinePool.last.submitted == ["b_large", "a_small", "c_small"]
+    assert list(matched) == ["a_small", "b_large", "c_small"]
+    pd.testing.assert_frame_equal(sequential, parallel)
@@ -45,3 +45,96 @@ def test_process_all_matches_returns_dataframe(tmp_path):
     assert isinstance(df, pd.DataFrame)
     assert not df.empty
     assert 'distance_to_goal' in df.columns
+
+
+def write_match(tmp_path, prefix, shot_ids):
+    shots = [{
+        "id": shot_id,
+        "matchPeriod": "1H",
+        "minute": 10,
+        "second": 15,
+        "videoTimestamp": 123.45,
+        "player": {"id": "p1", "position": "Forward"},
+        "team": {"id": "t1"},
+        "opponentTeam": {"id": "t2"},
+        "shot": {"bodyPart": "right_foot", "isGoal": False, "onTarget": True, "xg": 0.1, "xg2": 0.2},
+        "possession": {"duration": 5, "startLocation": {"x": 50, "y": 34}}
+    } for shot_id in shot_ids]
+    shot_file = tmp_path / f"{prefix}.json"
+    tracking_file = tmp_path / f"{prefix}_tracking_data.jsonl"
+    shot_file.write_text(json.dumps(shots))
+    tracking_file.write_text(json.dumps({
+        "players_data": {"200": {"10": {"position": "GK"}}},
+        "teams_data": {}
+    }) + "\n" + json.dumps({
+        "frame": 100,
+        "period": 1,
+        "Videotimestamp": 123.45,
+        "data": {
+            "100": [{"id": 1, "x": 80, "y": 34}],
+            "200": [{"id": 10, "x": 100, "y": 34}]
+        }
+    }))
+    return [str(shot_file), str(tracking_file)]
+
+
+def test_process_all_matches_parallel_keeps_match_order(tmp_path):
+    from lib.enrichment import process_all_matches
+
+    files = []
+    for i in range(4):
+        files += write_match(tmp_path, f"m{i}", [i * 10, i * 10 + 1])
+
+    sequential = process_all_matches(files, {"p1": 1}, {"t1": 100, "t2": 200})
+    parallel = process_all_matches(files, {"p1": 1}, {"t1": 100, "t2": 200}, workers=2)
+    assert parallel['id'].tolist() == [0, 1, 10, 11, 20, 21, 30, 31]
+    pd.testing.assert_frame_equal(sequential, parallel)
+
+
+def test_process_all_matches_skips_failing_match(tmp_path, capsys):
+    from lib.enrichment import process_all_matches
+
+    files = write_match(tmp_path, "good", [1]) + write_match(tmp_path, "bad", [2])
+    (tmp_path / "bad_tracking_data.jsonl").write_text("{not valid json\n")
+
+    df = process_all_matches(files, {"p1": 1}, {"t1": 100, "t2": 200}, workers=2)
+    assert df['id'].tolist() == [1]
+    assert "Failed to process match bad" in capsys.readouterr().out
+
+
+def test_process_all_matches_frame_payloads(tmp_path):
+    from lib.enrichment import process_all_matches
+
+    files = write_match(tmp_path, "m0", [1])
+    maps = ({"p1": 1}, {"t1": 100, "t2": 200})
+
+    default = process_all_matches(files, *maps)
+    assert 'data' not in default.columns
+    assert 'frame_snapshot' not in default.columns
+
+    snapshot = process_all_matches(files, *maps, frame_payload="array")
+    assert snapshot['frame_snapshot'][0].shape == (32, 4)
+
+    ref = process_all_matches(files, *maps, frame_payload="ref")
+    assert ref['frame_file'][0] == files[1]
+    assert ref['frame_offset'][0] > 0
+
+
+def test_iter_enriched_matches_keeps_workers_busy_behind_a_slow_match(tmp_path, monkeypatch, capsys):
+    import time
+    from lib import enrichment
+
+    files = []
+    for i in range(4):
+        files += write_match(tmp_path, f"m{i}", [i])
+    enrich_match = enrichment.enrich_match
+    # Pool processes are forked, so they see the patched function
+    monkeypatch.setattr(enrichment, "enrich_match", lambda match_id, *args: (
+        time.sleep(1) if match_id == "m0" else None) or enrich_match(match_id, *args))
+
+    matched = enrichment.match_input_files(files)
+    yielded = [match_id for match_id, _, _ in enrichment.iter_enriched_matches(
+        matched, {"p1": 1}, {"t1": 100, "t2": 200}, workers=2)]
+    assert yielded == ["m0", "m1", "m2", "m3"]
+    reported = [line.split()[1].rstrip(":") for line in capsys.readouterr().out.splitlines() if line.startswith("[")]
+    assert reported[-1] == "m0"
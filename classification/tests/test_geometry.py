@@ -0,0 +1,78 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import math
+import numpy as np
+
+from lib.enrichment import count_defenders_in_cone, is_goalkeeper_in_path
+from lib.geometry import shot_features, goal_x_for, GOAL_LEFT_Y, GOAL_RIGHT_Y
+
+
+def random_shots(n_shots=400, n_players=12, seed=0):
+    rng = np.random.default_rng(seed)
+    ball_x = rng.uniform(0, 105, n_shots)
+    ball_y = rng.uniform(0, 68, n_shots)
+    gk_x = rng.uniform(0, 105, n_shots)
+    gk_y = rng.uniform(20, 50, n_shots)
+    # Some unknown shooter / goalkeeper positions and padded player slots
+    ball_x[::17] = np.nan
+    gk_x[::13] = np.nan
+    players_x = rng.uniform(0, 105, (n_shots, n_players))
+    players_y = rng.uniform(0, 68, (n_shots, n_players))
+    players_x[:, -2:] = np.nan
+    opponents = np.zeros((n_shots, n_players), dtype=bool)
+    opponents[:, : n_players // 2] = True
+    defenders = opponents.copy()
+    defenders[:, 0] = False
+    attackers = ~opponents
+    return ball_x, ball_y, gk_x, gk_y, players_x, players_y, opponents, defenders, attackers
+
+
+def as_points(xs, ys, mask):
+    return [
+        {"x": None if np.isnan(x) else x, "y": None if np.isnan(y) else y}
+        for x, y, m in zip(xs, ys, mask) if m
+    ]
+
+
+def test_shot_features_match_scalar_code():
+    ball_x, ball_y, gk_x, gk_y, players_x, players_y, opponents, defenders, attackers = random_shots()
+    features = shot_features(ball_x, ball_y, gk_x, gk_y, players_x, players_y, opponents, defenders, attackers)
+
+    for i in range(len(ball_x)):
+        bx = None if np.isnan(ball_x[i]) else ball_x[i]
+        by = ball_y[i]
+        gx = None if np.isnan(gk_x[i]) else gk_x[i]
+        gy = gk_y[i]
+        x_goal = 105 if bx is not None and bx > 50 else 0
+        if x_goal == 105:
+            goal_left, goal_right = (105, GOAL_LEFT_Y), (105, GOAL_RIGHT_Y)
+        else:
+            goal_left, goal_right = (0, GOAL_RIGHT_Y), (0, GOAL_LEFT_Y)
+
+        shooter_y = by if bx is not None else None
+        defenders_list = as_points(players_x[i], players_y[i], defenders[i])
+        attackers_list = as_points(players_x[i], players_y[i], attackers[i])
+        assert features["defenders_in_cone"][i] == count_defenders_in_cone(bx, shooter_y, defenders_list, goal_left, goal_right)
+        assert features["attackers_in_cone"][i] == count_defenders_in_cone(bx, shooter_y, attackers_list, goal_left, goal_right)
+        assert features["goalkeeper_in_shot_path"][i] == is_goalkeeper_in_path(bx, by, gx, gy, x_goal, 34)
+
+        if bx is None:
+            assert np.isnan(features["distance_to_goal"][i])
+            assert features["num_defenders_nearby"][i] == 0
+            continue
+        assert math.isclose(features["distance_to_goal"][i], ((x_goal - bx)**2 + (50 - by)**2)**0.5, rel_tol=1e-12)
+        a = math.hypot(x_goal - bx, GOAL_LEFT_Y - by)
+        b = math.hypot(x_goal - bx, GOAL_RIGHT_Y - by)
+        c = GOAL_RIGHT_Y - GOAL_LEFT_Y
+        expected_angle = math.degrees(math.acos((a**2 + b**2 - c**2) / (2 * a * b)))
+        assert math.isclose(features["angle_to_goal_degrees"][i], expected_angle, rel_tol=1e-9)
+        nearby = sum(
+            1 for p in as_points(players_x[i], players_y[i], opponents[i])
+            if p["x"] is not None and math.hypot(bx - p["x"], by - p["y"]) <= 5
+        )
+        assert features["num_defenders_nearby"][i] == nearby
+
+
+def test_goal_side_defaults_to_left_goal_when_ball_unknown():
+    assert goal_x_for([80.0, 20.0, np.nan]).tolist() == [105.0, 0.0, 0.0]
@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import math
+
+import pytest
+
+from lib.jsonio import available_backends, get_backend
+
+LINES = [
+    b'{"frame": 1, "period": 1, "Videotimestamp": 0.04, "data": {"100": [{"id": 1, "x": 52.37, "y": null}]}}\n',
+    b'{"frame": 2, "period": 1, "data": {}}\n',
+    b'{"frame": 3, "period": 1, "Videotimestamp": 12, "data": {}}\n',
+]
+
+
+@pytest.mark.parametrize("name", available_backends())
+def test_backends_decode_like_stdlib_json(name):
+    backend = get_backend(name)
+    reference = get_backend("json")
+
+    assert backend.loads(LINES[0]) == reference.loads(LINES[0])
+    assert backend.loads_lines(LINES) == reference.loads_lines(LINES)
+    assert backend.frame_timestamps(LINES) == [0.04, None, 12]
+
+
+@pytest.mark.parametrize("name", available_backends())
+def test_backends_fall_back_to_stdlib_for_nan(name):
+    backend = get_backend(name)
+    assert math.isnan(backend.loads(b'{"x": NaN}')["x"])
+    assert math.isnan(backend.loads_lines([b'{"x": NaN}', b'{"x": 1}'])[0]["x"])
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_backend("simdjson")
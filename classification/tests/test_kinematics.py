@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate
+from lib.jsonio import load
+from lib.kinematics import kinematic_features, match_kinematics, tracking_kinematics, _jsonl_frames
+from lib.lookup import MatchLookup
+from lib.store import convert_tracking, open_store_for
+from lib.tracking import frame_index
+
+
+def test_kinematic_features_of_constant_motion():
+    times = np.arange(51)[None, :] * 0.04  # 2 s at 25 Hz, shot frame last
+    shooter = np.stack([80 + 3 * times, np.full_like(times, 34)], axis=-1)  # 3 units/s along +x
+    goalkeeper = np.stack([np.full_like(times, 103), 30 + 1 * times], axis=-1)  # 1 unit/s along +y
+    # One defender running at the shooter's end position at 4 units/s, one standing far away
+    closing = np.stack([np.full_like(times, 86), 34 + 4 * (times[:, -1:] - times)], axis=-1)
+    standing = np.stack([np.full_like(times, 60), np.full_like(times, 10)], axis=-1)
+    defenders = np.stack([closing, standing], axis=2)
+
+    features = kinematic_features(times, shooter, goalkeeper, defenders)
+    assert features['shooter_speed'][0] == pytest.approx(3)
+    assert features['shooter_heading_deg'][0] == pytest.approx(0)
+    assert features['shooter_acceleration'][0] == pytest.approx(0)
+    assert features['goalkeeper_speed'][0] == pytest.approx(1)
+    assert features['goalkeeper_heading_deg'][0] == pytest.approx(90)
+    assert features['defenders_closing_in'][0] == 1
+    assert features['max_defender_closing_speed'][0] > 3
+
+
+def test_short_window_gives_missing_features():
+    times = np.array([[np.nan, np.nan, 0.0]])
+    track = np.zeros((1, 3, 2))
+    features = kinematic_features(times, track, track, np.zeros((1, 3, 0, 2)))
+    assert np.isnan(features['shooter_speed'][0])
+    assert np.isnan(features['defenders_closing_in'][0])
+    assert np.isnan(features['max_defender_closing_speed'][0])
+
+
+@pytest.fixture
+def synthetic_match(tmp_path):
+    files, player_map, team_map = generate(tmp_path, 1, minutes=1, n_shots=4)
+    shots = load(files[0])
+    with open(files[1]) as f:
+        metadata = json.loads(f.readline())
+    lookup = MatchLookup(metadata, load(player_map), load(team_map))
+    return shots, [float(s["videoTimestamp"]) for s in shots], lookup, files[1]
+
+
+def test_only_window_frames_are_read(synthetic_match):
+    shots, shot_times, lookup, tracking_path = synthetic_match
+    timestamps, offsets = frame_index(tracking_path)
+    read = []
+
+    def frames_at(positions):
+        read.extend(positions)
+        return _jsonl_frames(tracking_path, offsets, positions)
+
+    rows = match_kinematics(shots, shot_times, lookup, timestamps, frames_at, window_s=1.0)
+    assert len(read) <= len(shots) * 26 < len(timestamps)
+    assert all(row['shooter_speed'] is not None for row in rows)
+
+
+def test_store_and_jsonl_give_the_same_features(synthetic_match):
+    shots, shot_times, lookup, tracking_path = synthetic_match
+    from_jsonl = tracking_kinematics(shots, shot_times, lookup, tracking_path)
+    convert_tracking(tracking_path)
+    from_store = tracking_kinematics(shots, shot_times, lookup, tracking_path, store=open_store_for(tracking_path))
+    assert from_store == from_jsonl
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import pandas as pd
+
+from benchmarks.synthetic import generate
+from lib.enrichment import match_input_files, process_all_matches
+from lib.jsonio import load
+from lib.kinematics import add_kinematics
+from lib.live import TailReader, follow
+from lib.model import ShotScorer, DEFAULT_MODEL_PATH
+from lib.replay import replay_match
+
+
+def test_tail_reader_returns_only_complete_lines(tmp_path):
+    path = tmp_path / "growing.jsonl"
+    reader = TailReader(str(path))
+    assert reader.read_lines() == []
+
+    path.write_bytes(b'{"a": 1}\n{"b":')
+    assert reader.read_lines() == [(0, b'{"a": 1}')]
+    with open(path, "ab") as f:
+        f.write(b' 2}\n\n')
+    assert reader.read_lines() == [(9, b'{"b": 2}'), (18, b'')]
+    assert reader.read_lines() == []
+
+
+def test_follow_scores_a_replayed_match_like_batch_scoring(tmp_path):
+    files, player_map_path, team_map_path = generate(tmp_path / "recorded", 1, minutes=1, n_shots=4)
+    player_map, team_map = load(player_map_path), load(team_map_path)
+    live_dir = tmp_path / "live"
+    live_dir.mkdir()
+    live_files = [str(live_dir / os.path.basename(path)) for path in files]
+    scorer = ShotScorer(DEFAULT_MODEL_PATH)
+    out_path = tmp_path / "live.csv"
+
+    # One minute of tracking replayed at 30x while follow() tails the files
+    replay = threading.Thread(target=replay_match, args=(*files, str(live_dir)), kwargs={"speed": 30})
+    replay.start()
+    try:
+        written = follow(
+            match_input_files(live_files), player_map, team_map, scorer, str(out_path),
+            full_output=True, poll_interval=0.01, idle_timeout=0.5, kinematics_window=2.0,
+        )
+    finally:
+        replay.join()
+
+    shots_df = process_all_matches(files, player_map, team_map, kinematics_window=2.0)
+    expected = add_kinematics(scorer.score(shots_df, full_output=True), shots_df)
+    assert written == len(expected) == 4
+    pd.testing.assert_frame_equal(
+        pd.read_csv(out_path).sort_values("id").reset_index(drop=True),
+        expected.sort_values("id").reset_index(drop=True),
+        check_dtype=False,
+    )
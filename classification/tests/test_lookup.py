@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+
+from lib.lookup import MatchLookup, TeamFrame, frame_tables
+
+
+def test_match_lookup_resolves_goalkeepers_and_ids():
+    metadata = {"players_data": {
+        "100": {"1": {"position": "FW"}},
+        "200": {"9": {"position": "DF"}, "10": {"position": "GK"}, "11": {"position": "GK"}},
+    }}
+    lookup = MatchLookup(metadata, {"p1": 1}, {"t1": 100, "7": 200})
+
+    assert lookup.goalkeeper("200") == 10
+    assert lookup.goalkeeper("100") is None
+    with pytest.raises(KeyError):
+        lookup.goalkeeper("300")
+    assert lookup.player("p1") == 1
+    assert lookup.player("p2") is None
+    assert lookup.team(7) == 200
+
+
+def test_team_frame_indexes_players_by_id():
+    team = TeamFrame([{"id": 1, "x": 10, "y": 20}, {"id": 2, "x": None, "y": 5}, {"id": 1, "x": 0, "y": 0}])
+
+    assert len(team) == 3
+    assert team.get(1) == {"id": 1, "x": 10, "y": 20}  # first occurrence wins
+    assert team.get(3) is None
+    np.testing.assert_array_equal(team.x, [10, np.nan, 0])
+
+
+def test_frame_tables_per_team():
+    tables = frame_tables({"data": {"100": [{"id": 1, "x": 1, "y": 2}], "200": []}})
+    assert set(tables) == {"100", "200"}
+    assert len(tables["200"]) == 0
@@ -6,7 +6,7 @@ import pandas as pd
 import joblib
 import pytest
 
-from model import prepare_data_for_prediction, run_model
+from model import prepare_data_for_prediction, run_model, ShotScorer, DEFAULT_MODEL_PATH
 
 # Mock data to test model preparation and inference
 def sample_enriched_data():
@@ -64,3 +64,65 @@ def test_run_model_output_format():
     finally:
         os.remove(model_path)
 
+def enriched_record(shot_id):
+    record = sample_enriched_data().iloc[0].to_dict()
+    record['id'] = shot_id
+    return record
+
+def test_shot_scorer_scores_records_with_default_model():
+    scorer = ShotScorer(DEFAULT_MODEL_PATH)
+    result = scorer.score_records([enriched_record(1), enriched_record(2)])
+    assert [r['id'] for r in result] == [1, 2]
+    assert all(0 <= r['predictions'] <= 1 for r in result)
+
+    df = scorer.score(pd.DataFrame([enriched_record(3)]), full_output=True)
+    assert df.columns[0] == 'id'
+    assert 'predictions' in df.columns
+
+def test_shot_scorer_reloads_only_when_file_changes(tmp_path, monkeypatch):
+    import model as model_module
+    from sklearn.dummy import DummyRegressor
+
+    X_pred = prepare_data_for_prediction(pd.DataFrame([enriched_record(1)]))
+    model_path = tmp_path / "dummy_model.pkl"
+    joblib.dump(DummyRegressor(strategy="constant", constant=0.1).fit(X_pred.drop(columns=['id']), [0.1]), model_path)
+
+    loads = []
+    real_load = model_module.joblib.load
+    monkeypatch.setattr(model_module.joblib, "load", lambda path: loads.append(path) or real_load(path))
+
+    scorer = ShotScorer(model_path)
+    assert scorer.predict(X_pred)[0] == pytest.approx(0.1)
+    assert scorer.predict(X_pred)[0] == pytest.approx(0.1)
+    assert len(loads) == 1
+
+    joblib.dump(DummyRegressor(strategy="constant", constant=0.7).fit(X_pred.drop(columns=['id']), [0.7]), model_path)
+    os.utime(model_path, ns=(0, os.stat(model_path).st_mtime_ns + 1_000_000))
+    assert scorer.predict(X_pred)[0] == pytest.approx(0.7)
+    assert len(loads) == 2
+
+def test_run_model_scores_with_several_models_loading_each_once(tmp_path, monkeypatch):
+    import model as model_module
+    from sklearn.dummy import DummyRegressor
+
+    X_pred = prepare_data_for_prediction(pd.DataFrame([enriched_record(1), enriched_record(2)]))
+    paths = []
+    for name, constant in (("old", 0.1), ("new", 0.3)):
+        paths.append(tmp_path / f"{name}.pkl")
+        joblib.dump(DummyRegressor(strategy="constant", constant=constant).fit(X_pred.drop(columns=['id']), [constant] * 2), paths[-1])
+    loads = []
+    real_load = model_module.joblib.load
+    monkeypatch.setattr(model_module.joblib, "load", lambda path: loads.append(path) or real_load(path))
+
+    result = run_model(paths, X_pred)
+    assert result == [
+        {'id': 1, 'predictions_old': pytest.approx(0.1), 'predictions_new': pytest.approx(0.3)},
+        {'id': 2, 'predictions_old': pytest.approx(0.1), 'predictions_new': pytest.approx(0.3)},
+    ]
+    result_df = run_model({'a': paths[0], 'b': paths[1]}, X_pred, full_output=True)
+    assert list(result_df.columns[-2:]) == ['predictions_a', 'predictions_b']
+    assert 'distance_to_goal' in result_df.columns
+    assert len(loads) == 2
+
+    with pytest.raises(ValueError, match="distinct file names"):
+        run_model([paths[0], tmp_path / "other" / "old.pkl"], X_pred)
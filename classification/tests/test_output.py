@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from lib.output import typed_frame, open_writer, save_results
+
+
+def results(ids):
+    return [{
+        'id': i,
+        'distance_to_goal': 12.5,
+        'num_defenders_nearby': 1,
+        'distance_category': 'close',
+        'angle_category': 'wide',
+        'goalkeeper_in_shot_path': False,
+        'predictions': 0.1 * i,
+    } for i in ids]
+
+
+def test_typed_frame_schema_does_not_depend_on_values():
+    a = typed_frame(results([1]))
+    b = typed_frame(pd.DataFrame(results([2, 3])).assign(distance_category='far'))
+    assert a.dtypes.to_dict() == b.dtypes.to_dict()
+    assert a['distance_to_goal'].dtype == 'float32'
+    assert a['num_defenders_nearby'].dtype == 'int32'
+    assert list(a['distance_category'].cat.categories) == ["very_close", "close", "medium", "far"]
+
+
+def test_parquet_writer_writes_one_row_group_per_match(tmp_path):
+    path = tmp_path / "out.parquet"
+    writer = open_writer(path, "parquet")
+    writer.start()
+    writer.write("m0", results([1, 2]))
+    writer.write("m1", results([3]))
+    writer.close()
+
+    assert pq.ParquetFile(path).num_row_groups == 2
+    assert pd.read_parquet(path)['id'].tolist() == [1, 2, 3]
+    with pytest.raises(ValueError):
+        writer.start(keep={})
+
+
+def test_save_results_arrow(tmp_path):
+    path = tmp_path / "out.arrow"
+    save_results(results([1, 2]), path, "arrow")
+    df = pa.ipc.open_file(path).read_pandas()
+    assert df['predictions'].tolist() == [0.1, 0.2]
+    assert isinstance(df['angle_category'].dtype, pd.CategoricalDtype)
+
+
+def test_partitioned_writer_keeps_only_requested_matches(tmp_path):
+    writer = open_writer(tmp_path / "out", "parquet", partition_by_match=True)
+    writer.start()
+    for match_id in ("m0", "m1"):
+        writer.write(match_id, results([1]))
+
+    writer.start(keep={"m1": {}})
+    assert sorted(os.listdir(tmp_path / "out")) == ["match=m1"]
+    assert pd.read_parquet(tmp_path / "out")['match'].tolist() == ["m1"]
+
+
+def test_parquet_writer_keeps_the_kinematics_schema_across_matches(tmp_path):
+    kinematics = [
+        {'shooter_speed': 5, 'goalkeeper_heading_deg': 90.0, 'defenders_closing_in': 2},
+        {'shooter_speed': 5.5, 'goalkeeper_heading_deg': None, 'defenders_closing_in': None},
+        {'shooter_speed': None, 'goalkeeper_heading_deg': None, 'defenders_closing_in': None},
+    ]
+    path = tmp_path / "out.parquet"
+    writer = open_writer(path, "parquet")
+    writer.start()
+    for i, row in enumerate(kinematics):
+        writer.write(f"m{i}", [dict(r, **row) for r in results([i])])
+    writer.close()
+
+    df = pd.read_parquet(path)
+    assert df['shooter_speed'].dtype == 'float32'
+    assert df['defenders_closing_in'].dtype == 'Int32'
+    assert df['defenders_closing_in'].tolist()[0] == 2
+    assert df['defenders_closing_in'].isna().tolist() == [False, True, True]
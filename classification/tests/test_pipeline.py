@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from lib.enrichment import match_input_files, process_all_matches
+from lib.model import ShotScorer, DEFAULT_MODEL_PATH
+from lib.pipeline import stream_scores
+from tests.test_enrichment import write_match
+
+MAPS = ({"p1": 1}, {"t1": 100, "t2": 200})
+
+
+def test_stream_scores_matches_batch_scoring(tmp_path):
+    files = []
+    for i in range(3):
+        files += write_match(tmp_path, f"m{i}", [i * 10, i * 10 + 1])
+    scorer = ShotScorer(DEFAULT_MODEL_PATH)
+    out_path = tmp_path / "out.csv"
+    out_path.write_text("stale output\n")
+
+    written = stream_scores(match_input_files(files), *MAPS, scorer, str(out_path), full_output=True)
+
+    expected = scorer.score(process_all_matches(files, *MAPS), full_output=True)
+    assert written == 6
+    pd.testing.assert_frame_equal(pd.read_csv(out_path), expected, check_dtype=False)
+
+
+def test_stream_scores_keeps_matches_around_a_failure(tmp_path):
+    files = write_match(tmp_path, "a", [1]) + write_match(tmp_path, "b", [2]) + write_match(tmp_path, "c", [3])
+    (tmp_path / "b_tracking_data.jsonl").write_text("{not valid json\n")
+    out_path = tmp_path / "out.csv"
+
+    written = stream_scores(match_input_files(files), *MAPS, ShotScorer(DEFAULT_MODEL_PATH), str(out_path))
+    assert written == 2
+    assert pd.read_csv(out_path)["id"].tolist() == [1, 3]
+
+
+def test_resume_redoes_only_failed_and_changed_matches(tmp_path, capsys):
+    files = write_match(tmp_path, "a", [1]) + write_match(tmp_path, "b", [2]) + write_match(tmp_path, "c", [3])
+    good_tracking = (tmp_path / "b_tracking_data.jsonl").read_text()
+    (tmp_path / "b_tracking_data.jsonl").write_text("{not valid json\n")
+    out_path = tmp_path / "out.csv"
+    scorer = ShotScorer(DEFAULT_MODEL_PATH)
+
+    assert stream_scores(match_input_files(files), *MAPS, scorer, str(out_path)) == 2
+
+    # Fix match b, change match a and leave a partly written row behind, as after a crash
+    (tmp_path / "b_tracking_data.jsonl").write_text(good_tracking)
+    write_match(tmp_path, "a", [11])
+    with open(out_path, "a") as f:
+        f.write("99,0.")
+    capsys.readouterr()
+
+    assert stream_scores(match_input_files(files), *MAPS, scorer, str(out_path), resume=True) == 3
+    assert "1 matches already done, 2 to process" in capsys.readouterr().out
+    assert sorted(pd.read_csv(out_path)["id"].tolist()) == [2, 3, 11]
+
+
+def test_resume_starts_over_when_settings_change(tmp_path):
+    files = write_match(tmp_path, "a", [1])
+    out_path = tmp_path / "out.csv"
+    scorer = ShotScorer(DEFAULT_MODEL_PATH)
+    stream_scores(match_input_files(files), *MAPS, scorer, str(out_path))
+
+    stream_scores(match_input_files(files), *MAPS, scorer, str(out_path), full_output=True, resume=True)
+    assert "distance_to_goal" in pd.read_csv(out_path).columns
+
+
+def test_resume_redoes_matches_after_a_mapping_change(tmp_path, capsys):
+    import json
+    files = write_match(tmp_path, "a", [1]) + write_match(tmp_path, "b", [2])
+    shots_path = tmp_path / "b.json"
+    shots = json.loads(shots_path.read_text())
+    shots[0]["opponentTeam"]["id"] = "t3"
+    shots_path.write_text(json.dumps(shots))
+    out_path = tmp_path / "out.csv"
+    scorer = ShotScorer(DEFAULT_MODEL_PATH)
+    player_map, team_map = MAPS
+
+    # t3 is not mapped yet: match b's shot is skipped and the match still ends "done"
+    assert stream_scores(match_input_files(files), player_map, team_map, scorer, str(out_path)) == 1
+    capsys.readouterr()
+
+    fixed_map = dict(team_map, t3=200)
+    assert stream_scores(match_input_files(files), player_map, fixed_map, scorer, str(out_path), resume=True) == 2
+    assert "already done" not in capsys.readouterr().out
+    assert sorted(pd.read_csv(out_path)["id"].tolist()) == [1, 2]
@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+
+from lib import profiling
+from lib.enrichment import process_all_matches
+from tests.test_enrichment import write_match
+
+
+def test_stage_is_a_no_op_when_profiling_is_off():
+    assert not profiling.enabled()
+    with profiling.stage("features", "m0") as counts:
+        counts["rows"] = 3
+    assert profiling.stage("predict") is profiling.stage("features")
+
+
+def test_profile_report_has_stage_and_match_records(tmp_path):
+    profiler = profiling.start()
+    try:
+        with profiling.stage("discover", matches=2):
+            pass
+        with profiling.stage("features", "m0") as counts:
+            counts["rows"] = 3
+        with profiling.stage("features", "m1") as counts:
+            counts["rows"] = 4
+    finally:
+        profiling.stop()
+    profiler.write(tmp_path / "report.json")
+
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["stages"]["features"]["calls"] == 2
+    assert report["stages"]["features"]["rows"] == 7
+    assert report["stages"]["discover"]["matches"] == 2
+    assert report["matches"]["m1"]["features"]["rows"] == 4
+    assert report["total"]["wall_s"] >= report["stages"]["features"]["wall_s"]
+
+
+def test_pool_workers_send_their_records_back(tmp_path):
+    paths = write_match(tmp_path, "m1", [1, 2]) + write_match(tmp_path, "m2", [3])
+    profiler = profiling.start()
+    try:
+        process_all_matches(paths, {"p1": 1}, {"t1": 100, "t2": 200}, workers=2)
+    finally:
+        profiling.stop()
+
+    report = profiler.report()
+    assert report["stages"]["match"]["calls"] == 2
+    assert report["matches"]["m1"]["features"]["rows"] == 2
+    assert report["matches"]["m2"]["read_tracking"]["frames"] == 1
+    assert report["matches"]["m2"]["match"]["pid"] != os.getpid()
+
+
+def test_cprofile_runs_only_on_the_main_thread():
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+
+    profiler = profiling.start(cprofile=True)
+    enabled_in = []
+    profiler.cprofile.enable = lambda: enabled_in.append(threading.current_thread())
+    profiler.cprofile.disable = lambda: None
+
+    def predict(rows):
+        with profiling.stage("predict", rows=rows):
+            pass
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:  # as in MultiScorer.predict
+            list(pool.map(predict, [1, 2]))
+        predict(3)
+    finally:
+        profiling.stop()
+    assert enabled_in == [threading.main_thread()]
+    assert profiler.report()["stages"]["predict"]["rows"] == 6
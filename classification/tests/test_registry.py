@@ -0,0 +1,78 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import joblib
+import numpy as np
+import pytest
+
+from lib.compiled import NativeModel, export_pipeline
+from lib.model import ShotScorer, compiled_path_for
+from lib.registry import ModelRegistry, resolve_model, DEFAULT_REGISTRY_PATH
+from tests.test_compiled import training_frame, fit_pipeline
+
+
+@pytest.fixture
+def registry(tmp_path):
+    X, y = training_frame()
+    joblib.dump(fit_pipeline(X, y), tmp_path / "a.pkl")
+    joblib.dump(fit_pipeline(X, y * 2), tmp_path / "b.pkl")
+    registry = ModelRegistry(tmp_path / "registry.json")
+    registry.register("a", str(tmp_path / "a.pkl"))
+    registry.register("b", str(tmp_path / "b.pkl"), native=False)
+    return registry
+
+
+def test_native_export_predicts_like_the_pipeline(registry, tmp_path):
+    X, _ = training_frame(seed=1)
+    X.loc[0, 'angle_category'] = 'unseen'
+    native = NativeModel.load(registry.path_for("a"))
+    np.testing.assert_allclose(native.predict(X), joblib.load(tmp_path / "a.pkl").predict(X), rtol=0, atol=1e-12)
+
+
+def test_registry_manifest_round_trip(registry, tmp_path):
+    reopened = ModelRegistry(tmp_path / "registry.json")
+    assert reopened.names() == ["a", "b"]
+    assert reopened.default == "a"
+    assert reopened.path_for("a") == str(tmp_path / "a.lgb")
+    assert reopened.path_for("b") == str(tmp_path / "b.pkl")
+    entry = reopened.entry("a")
+    assert entry["features"] == ['distance_to_goal', 'defenders_in_cone', 'angle_category', 'goalkeeper_in_cone']
+    assert entry["categories"]["angle_category"] == ['medium', 'narrow', 'wide']
+
+    with pytest.raises(ValueError, match="Unknown model 'c'"):
+        reopened.path_for("c")
+    joblib.dump("changed", tmp_path / "b.pkl")
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        reopened.path_for("b")
+
+
+def test_native_model_is_refused_after_its_pickle_changes(registry, tmp_path):
+    X, y = training_frame()
+    joblib.dump(fit_pipeline(X, 1 - y), tmp_path / "a.pkl")  # retrained in place
+    with pytest.raises(ValueError, match="re-register this model"):
+        resolve_model(None, tmp_path / "registry.json")
+    registry.register("a", str(tmp_path / "a.pkl"))
+    assert resolve_model(None, tmp_path / "registry.json") == str(tmp_path / "a.lgb")
+
+
+def test_resolve_model(registry, tmp_path):
+    registry_path = tmp_path / "registry.json"
+    assert resolve_model(str(tmp_path / "b.pkl"), registry_path) == str(tmp_path / "b.pkl")
+    assert resolve_model("b", registry_path) == str(tmp_path / "b.pkl")
+    assert resolve_model(None, registry_path) == str(tmp_path / "a.lgb")
+    assert resolve_model(None, tmp_path / "none.json", fallback="model.pkl") == "model.pkl"
+    with pytest.raises(FileNotFoundError):
+        resolve_model("a", tmp_path / "none.json")
+
+
+def test_scorer_uses_compiled_artifact_of_the_native_models_source(registry, tmp_path):
+    export_pipeline(joblib.load(tmp_path / "a.pkl"), compiled_path_for(tmp_path / "a.lgb"), source_path=tmp_path / "a.pkl")
+    scorer = ShotScorer(registry.path_for("a"))
+    assert isinstance(scorer.model, NativeModel)
+    assert scorer.compiled is not None
+
+
+def test_shipped_registry_is_up_to_date():
+    registry = ModelRegistry(DEFAULT_REGISTRY_PATH)
+    for name in registry.names():
+        registry.path_for(name)
@@ -0,0 +1,128 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import threading
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+from lib.server import ScoringService, make_server
+
+METADATA = {"players_data": {"200": {"10": {"position": "GK"}}}, "teams_data": {}}
+
+def shot_payload(shot_id):
+    return {
+        "shot": {
+            "id": shot_id,
+            "matchPeriod": "1H",
+            "minute": 10,
+            "second": 15,
+            "videoTimestamp": 123.45,
+            "player": {"id": "p1", "position": "Forward"},
+            "team": {"id": "t1"},
+            "opponentTeam": {"id": "t2"},
+            "shot": {"bodyPart": "right_foot", "isGoal": False, "onTarget": True, "xg": 0.1, "xg2": 0.2},
+            "possession": {"duration": 5, "startLocation": {"x": 50, "y": 34}}
+        },
+        "frame": {
+            "frame": 100,
+            "period": 1,
+            "Videotimestamp": 123.44,
+            "data": {
+                "100": [{"id": 1, "x": 88, "y": 30}],
+                "200": [{"id": 10, "x": 103, "y": 34}, {"id": 11, "x": 95, "y": 33}]
+            }
+        },
+        "match_id": "m1",
+    }
+
+@pytest.fixture
+def server():
+    service = ScoringService({"p1": 1}, {"t1": 100, "t2": 200}, max_delay=0.02)
+    httpd = make_server(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", service
+    httpd.shutdown()
+    httpd.server_close()
+    service.close()
+
+def request(url, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_score_shot_over_http(server):
+    url, _ = server
+    assert request(f"{url}/matches/m1", METADATA) == (200, {"status": "registered"})
+
+    status, body = request(f"{url}/score", shot_payload(7))
+    assert status == 200
+    assert body["id"] == 7
+    assert 0 <= body["predictions"] <= 1
+    assert body["features"]["distance_category"] == "medium"
+
+def test_concurrent_requests_are_batched(server):
+    url, service = server
+    request(f"{url}/matches/m1", METADATA)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda i: request(f"{url}/score", shot_payload(i)), range(16)))
+    assert [body["id"] for _, body in responses] == list(range(16))
+    assert len(set(body["predictions"] for _, body in responses)) == 1
+    assert max(service.batcher.batch_sizes) > 1
+
+    status, metrics = request(f"{url}/metrics")
+    assert status == 200
+    assert metrics["requests"] == 16
+    assert set(metrics["latency_ms"]) == {"p50", "p90", "p99", "max"}
+
+def test_unknown_match_is_a_client_error(server):
+    url, _ = server
+    status, body = request(f"{url}/score", shot_payload(1))
+    assert status == 400
+    assert "match_id" in body["error"]
+
+def test_bad_match_metadata_is_a_client_error(server):
+    url, service = server
+    status, body = request(f"{url}/matches/m1", [METADATA])
+    assert status == 400
+    assert "JSON object" in body["error"]
+    assert "m1" not in service.matches
+
+def test_unexpected_errors_are_server_errors(server, monkeypatch):
+    url, service = server
+    request(f"{url}/matches/m1", METADATA)
+
+    def fail(records):
+        raise RuntimeError("model crashed")
+    monkeypatch.setattr(service.scorer, "score_records", fail)
+    status, body = request(f"{url}/score", shot_payload(1))
+    assert status == 500
+    assert "model crashed" in body["error"]
+
+    _, metrics = request(f"{url}/metrics")
+    assert metrics["errors"] == 1
+    assert metrics["server_errors"] == 1
+
+def test_bad_shot_fails_only_its_own_request(server):
+    url, service = server
+    request(f"{url}/matches/m1", METADATA)
+    payloads = [shot_payload(i) for i in range(4)]
+    payloads[2]["shot"]["possession"]["duration"] = "abc"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(lambda payload: request(f"{url}/score", payload), payloads))
+    assert [status for status, _ in responses] == [200, 200, 400, 200]
+    assert "poss_duration" in responses[2][1]["error"]
+
+    # A shot that only fails in the model call still fails alone
+    good = service.enrich(shot_payload(5))
+    futures = [service.batcher.submit(record) for record in (good, dict(good, poss_duration="abc"), good)]
+    assert futures[1].exception() is not None
+    assert futures[0].result() == futures[2].result()
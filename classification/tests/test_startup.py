@@ -0,0 +1,55 @@
+import sys
+import os
+import subprocess
+import time
+
+CLASSIFICATION_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Wall time allowed for --help or a rejected invocation (best of a few runs). Importing
+# pandas alone takes longer than this, sklearn/lightgbm several times more.
+STARTUP_TARGET_S = 0.5
+HEAVY_MODULES = ("pandas", "numpy", "joblib", "sklearn", "lightgbm", "pyarrow")
+
+
+def run_cli(*args):
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "classify_shots.py", *args],
+        cwd=CLASSIFICATION_DIR, capture_output=True, text=True,
+    )
+
+
+def imported_modules(result):
+    """Top-level names of all modules imported by the run (from -X importtime)."""
+    return {line.split("|")[-1].strip().split(".")[0] for line in result.stderr.splitlines() if "|" in line}
+
+
+def best_wall_time(*args, runs=3):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "classify_shots.py", *args], cwd=CLASSIFICATION_DIR, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def test_help_does_not_import_ml_modules():
+    result = run_cli("--help")
+    assert result.returncode == 0
+    assert "usage:" in result.stdout
+    assert not imported_modules(result) & set(HEAVY_MODULES)
+
+
+def test_invalid_inputs_are_rejected_before_ml_imports(tmp_path):
+    (tmp_path / "map.json").write_text("{}")
+    result = run_cli(str(tmp_path / "missing.json"), str(tmp_path / "missing_tracking_data.jsonl"),
+                     "--player-map", str(tmp_path / "map.json"), "--team-map", str(tmp_path / "map.json"),
+                     "--output", str(tmp_path / "out.csv"))
+    assert "Error: Input file not found" in result.stdout
+    assert not (tmp_path / "out.csv").exists()
+    assert not imported_modules(result) & set(HEAVY_MODULES)
+
+
+def test_startup_time_target(tmp_path):
+    assert best_wall_time("--help") < STARTUP_TARGET_S
+    assert best_wall_time(str(tmp_path / "missing.json"), "--player-map", "x.json", "--team-map", "x.json",
+                          "--output", str(tmp_path / "out.csv")) < STARTUP_TARGET_S
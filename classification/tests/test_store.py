@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+
+import numpy as np
+import pandas as pd
+
+from lib.store import convert_tracking, open_store_for, TrackingStore
+from lib.tracking import read_tracking
+from lib.enrichment import process_all_matches
+from tests.test_enrichment import write_match
+
+
+def write_tracking(path):
+    lines = [json.dumps({"players_data": {"200": {"10": {"position": "GK"}}}, "teams_data": {}})]
+    lines.append(json.dumps({"frame": 0, "period": 1, "Videotimestamp": 0.0, "data": {
+        "100": [{"id": 1, "x": 10.5, "y": 20.25}],
+        "200": [{"id": 10, "x": 100, "y": None}, {"id": 11, "x": 90.1, "y": 30.2}],
+    }}))
+    lines.append(json.dumps({"frame": 1, "period": 1, "Videotimestamp": 0.04, "data": {
+        "200": [{"id": 10, "x": 99.5, "y": 34.0}],
+    }}))
+    lines.append(json.dumps({"frame": 2, "period": 2, "Videotimestamp": 0.08, "data": {
+        "100": [], "300": [{"id": 5, "x": 1.0, "y": 2.0}],
+    }}))
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_store_reads_same_frames_as_jsonl(tmp_path):
+    tracking_file = tmp_path / "1_tracking_data.jsonl"
+    write_tracking(tracking_file)
+    store_path = convert_tracking(str(tracking_file))
+    assert store_path == str(tmp_path / "1_tracking_data.trk")
+
+    shot_times = [0.0, 0.05, 0.09, 0.01]
+    expected = read_tracking(tracking_file, shot_times)
+    actual = TrackingStore(store_path).read(shot_times)
+
+    assert actual[0] == expected[0]
+    assert actual[1] == expected[1]
+    np.testing.assert_array_equal(actual[2], expected[2])
+    assert actual[3] == expected[3]
+
+
+def test_store_is_ignored_when_tracking_file_changes(tmp_path):
+    tracking_file = tmp_path / "1_tracking_data.jsonl"
+    write_tracking(tracking_file)
+    convert_tracking(str(tracking_file))
+    assert open_store_for(str(tracking_file)) is not None
+
+    with open(tracking_file, "a") as f:
+        f.write(json.dumps({"frame": 3, "period": 2, "Videotimestamp": 0.12, "data": {}}) + "\n")
+    assert open_store_for(str(tracking_file)) is None
+
+
+def test_enrichment_uses_fresh_store(tmp_path, monkeypatch):
+    files = write_match(tmp_path, "m0", [1, 2])
+    maps = ({"p1": 1}, {"t1": 100, "t2": 200})
+    from_jsonl = process_all_matches(files, *maps, frame_payload="ref")
+
+    convert_tracking(files[1])
+
+    def fail(*args):
+        raise AssertionError("tracking JSONL should not be parsed")
+    monkeypatch.setattr("lib.enrichment.read_tracking", fail)
+    from_store = process_all_matches(files, *maps, frame_payload="ref")
+    # Coordinates come back as floats, even if the JSONL had integers
+    pd.testing.assert_frame_equal(from_jsonl, from_store, check_dtype=False)
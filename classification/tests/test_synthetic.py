@@ -0,0 +1,17 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import generate
+from lib.enrichment import process_all_matches, match_input_files
+from lib.model import prepare_data_for_prediction
+from lib.utils import load_mappings
+
+
+def test_synthetic_matches_enrich_without_missing_features(tmp_path):
+    files, player_map, team_map = generate(tmp_path, 3, minutes=1, n_shots=5, distinct=2)
+    df = process_all_matches(match_input_files(files), load_mappings(player_map), load_mappings(team_map))
+
+    assert len(df) == 15
+    assert df['id'].is_unique
+    assert len(prepare_data_for_prediction(df)) == 15
@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+
+import numpy as np
+
+from lib.tracking import read_tracking, load_frame, frame_snapshot, index_path_for, SNAPSHOT_SLOTS, ROLE_SHOOTER, ROLE_GOALKEEPER
+
+
+def write_tracking(path, timestamps):
+    lines = [json.dumps({"players_data": {"200": {"10": {"position": "GK"}}}, "teams_data": {}})]
+    for i, ts in enumerate(timestamps):
+        lines.append(json.dumps({"frame": i, "period": 1, "Videotimestamp": ts, "data": {}}))
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_read_tracking_returns_metadata_and_closest_frames(tmp_path):
+    tracking_file = tmp_path / "1_tracking_data.jsonl"
+    write_tracking(tracking_file, [0.0, 0.04, 0.08, 0.12, 0.16])
+
+    metadata, frames, _, _ = read_tracking(str(tracking_file), [0.05, 0.13, 10.0])
+    assert "players_data" in metadata
+    assert [f["frame"] for f in frames] == [1, 3, 4]
+
+
+def test_read_tracking_matches_linear_scan(tmp_path):
+    tracking_file = tmp_path / "1_tracking_data.jsonl"
+    # Unsorted timestamps with duplicates and exact ties between neighbours
+    frame_times = [3.0, 1.0, 2.0, 2.0, 5.0, 4.0, 1.0]
+    write_tracking(tracking_file, frame_times)
+    shot_times = [1.5, 2.0, 2.5, 3.5, 0.0, 6.0, 4.5]
+
+    _, frames, _, _ = read_tracking(str(tracking_file), shot_times)
+    expected = [
+        min(range(len(frame_times)), key=lambda i: abs(frame_times[i] - ts))
+        for ts in shot_times
+    ]
+    assert [f["frame"] for f in frames] == expected
+
+
+def test_read_tracking_without_frames(tmp_path):
+    tracking_file = tmp_path / "1_tracking_data.jsonl"
+    write_tracking(tracking_file, [])
+
+    metadata, frames, _, _ = read_tracking(str(tracking_file), [1.0])
+    assert metadata["teams_data"] == {}
+    assert frames == [None]
+
+
+def test_read_tracking_offsets_load_the_same_frame(tmp_path):
+    tracking_file = tmp_path / "1_tracking_data.jsonl"
+    write_tracking(tracking_file, [0.0, 0.04, 0.08])
+
+    _, frames, _, offsets = read_tracking(str(tracking_file), [0.08, 0.0])
+    assert [load_frame(str(tracking_file), o) for o in offsets] == frames
+
+
+def test_read_tracking_reuses_sidecar_index(tmp_path, monkeypatch):
+    tracking_file = tmp_path / "1_tracking_data.jsonl"
+    write_tracking(tracking_file, [0.0, 0.04, 0.08])
+    first = read_tracking(str(tracking_file), [0.05])
+    assert os.path.exists(index_path_for(tracking_file))
+
+    def fail(path):
+        raise AssertionError("index should not be rebuilt")
+    monkeypatch.setattr("lib.tracking.scan_frames", fail)
+    second = read_tracking(str(tracking_file), [0.05])
+    assert second[1] == first[1]
+    assert second[3] == first[3]
+
+
+def test_read_tracking_rebuilds_stale_index(tmp_path):
+    tracking_file = tmp_path / "1_tracking_data.jsonl"
+    write_tracking(tracking_file, [0.0, 0.04, 0.08])
+    read_tracking(str(tracking_file), [1.0])
+
+    write_tracking(tracking_file, [0.0, 0.04, 0.08, 0.12, 1.0])
+    _, frames, _, _ = read_tracking(str(tracking_file), [1.0])
+    assert frames[0]["frame"] == 4
+
+
+def test_frame_snapshot_encodes_positions_team_and_role():
+    frame = {"data": {
+        "100": [{"id": 1, "x": 80.5, "y": 34.0}, {"id": 2, "x": None, "y": 10.0}],
+        "200": [{"id": 10, "x": 100.0, "y": 34.0}],
+    }}
+    players_data = {"200": {"10": {"position": "GK"}}}
+
+    snapshot = frame_snapshot(frame, "100", "200", 1, players_data)
+    assert snapshot.shape == (SNAPSHOT_SLOTS, 4)
+    assert snapshot.dtype == np.float32
+    assert snapshot[0].tolist() == [80.5, 34.0, 0, ROLE_SHOOTER]
+    assert np.isnan(snapshot[1, 0])
+    assert snapshot[2].tolist() == [100.0, 34.0, 1, ROLE_GOALKEEPER]
+    assert np.isnan(snapshot[3:]).all()
@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+from benchmarks.synthetic import generate
+from lib.compiled import file_sha256
+from lib.enrichment import process_all_matches
+from lib.jsonio import load
+from lib.model import ShotScorer, FEATURES
+from lib.training import candidates, train, save_model, DEFAULT_PARAM_GRID
+
+
+def test_candidates_samples_from_the_grid():
+    assert len(candidates()) == 72
+    sampled = candidates(n_iter=5)
+    assert len(sampled) == 5
+    assert all(params['learning_rate'] in DEFAULT_PARAM_GRID['learning_rate'] for params in sampled)
+    assert candidates({'max_depth': [3]}, n_iter=5) == [{'max_depth': 3}]
+
+
+def test_train_writes_a_versioned_model_the_scorer_can_load(tmp_path):
+    files, player_map, team_map = generate(tmp_path / "data", 8, minutes=1, n_shots=25, distinct=2)
+    shots_df = process_all_matches(files, load(player_map), load(team_map))
+    param_sets = [{'learning_rate': 0.1, 'num_leaves': 7}, {'learning_rate': 0.05, 'num_leaves': 15}]
+
+    pipeline, metadata = train(shots_df, param_sets, cv=2, workers=2, early_stopping_rounds=5)
+    model_path, meta_path = save_model(pipeline, metadata, str(tmp_path), version="test")
+
+    assert os.path.basename(model_path) == "best_model_lgbm-test.pkl"
+    with open(meta_path) as f:
+        saved = json.load(f)
+    assert saved['sha256'] == file_sha256(model_path)
+    assert saved['features'] == FEATURES
+    assert len(saved['search']) == 2
+    assert saved['params']['n_estimators'] >= 1
+    assert saved['train_shots'] + saved['test_shots'] + saved['dropped_shots'] == len(shots_df)
+    assert set(saved['categories']) == {'distance_category', 'angle_category', 'goalkeeper_in_shot_path', 'goalkeeper_in_cone'}
+
+    results = ShotScorer(model_path).score(shots_df)
+    assert len(results) == len(shots_df)
+    assert all(-1 < r['predictions'] < 2 for r in results)
@@ -0,0 +1,85 @@
+import warnings
+warnings.filterwarnings("ignore", category=UserWarning)
+warnings.filterwarnings("ignore", category=FutureWarning)
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ImportWarning)
+
+import argparse
+import os
+import shutil
+from lib.utils import load_mappings
+from lib.discovery import discover_matches
+from lib.cache import EnrichmentCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_MB
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the xG model from shots and tracking files.")
+    parser.add_argument("input_files", nargs='*', help="Shots JSON and tracking JSONL files, directories or quoted glob patterns.")
+    parser.add_argument("--input-list", help="Text file listing input files, directories or glob patterns, one per line.")
+    parser.add_argument("--player-map", required=True, help="Path to player mapping JSON.")
+    parser.add_argument("--team-map", required=True, help="Path to team mapping JSON.")
+    parser.add_argument("--model-dir", default="models", help="Directory the versioned model and its metadata are written to.")
+    parser.add_argument("--name", default="best_model_lgbm", help="Model name; files are <name>-<version>.pkl/.json.")
+    parser.add_argument("--version", help="Model version (default: the UTC time).")
+    parser.add_argument("--promote", action="store_true", help="Also copy the model to <model-dir>/<name>.pkl, the path classify_shots.py uses.")
+    parser.add_argument("--register", action="store_true", help="Add the model to the model registry as <name>-<version> (with a native LightGBM export).")
+    parser.add_argument("--param-grid", help="JSON file with the LightGBM parameter grid to search (default: lib.training.DEFAULT_PARAM_GRID).")
+    parser.add_argument("--n-iter", type=int, help="Try this many parameter sets sampled from the grid instead of all of them.")
+    parser.add_argument("--cv", type=int, default=3, help="Cross-validation folds.")
+    parser.add_argument("--early-stopping-rounds", type=int, default=50, help="Stop adding trees after this many rounds without validation improvement.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes used for enrichment and the parameter search.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory of the enriched-match cache (shared with classify_shots.py).")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_CACHE_MAX_MB, help="Size limit of the enriched-match cache in MB.")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-enrich matches, ignoring the cache.")
+    args = parser.parse_args()
+    if not args.input_files and not args.input_list:
+        parser.error("no input files given (pass files, directories or globs, or --input-list)")
+
+    try:
+        if args.workers < 1 or args.cv < 2:
+            raise ValueError("--workers must be at least 1 and --cv at least 2")
+        if not os.path.isdir(args.model_dir):
+            raise FileNotFoundError(f"Model directory does not exist: {args.model_dir}")
+        param_grid = load_mappings(args.param_grid) if args.param_grid else None
+        matched_files = discover_matches(args.input_files, args.input_list)
+        if not matched_files:
+            raise ValueError("No matched (shots + tracking) file pairs found in the inputs.")
+
+        from lib.enrichment import process_all_matches
+        from lib.training import candidates, train, save_model
+
+        cache = None if args.no_cache else EnrichmentCache(args.cache_dir, max_bytes=args.cache_max_mb * 2**20)
+        shots_df = process_all_matches(
+            matched_files, load_mappings(args.player_map), load_mappings(args.team_map),
+            workers=args.workers, cache=cache,
+        )
+        if shots_df.empty:
+            raise ValueError("No valid shots found after enrichment. Cannot train.")
+
+        pipeline, metadata = train(
+            shots_df, candidates(param_grid, args.n_iter), cv=args.cv, workers=args.workers,
+            early_stopping_rounds=args.early_stopping_rounds,
+        )
+        metadata["matches"] = sorted(matched_files)
+        model_path, meta_path = save_model(pipeline, metadata, args.model_dir, args.name, args.version)
+        print(f"Test metrics: {metadata['test_metrics']}")
+        print(f"Model saved to {model_path} (metadata: {meta_path})")
+        if args.promote:
+            promoted = os.path.join(args.model_dir, f"{args.name}.pkl")
+            shutil.copyfile(model_path, promoted + ".tmp")
+            os.replace(promoted + ".tmp", promoted)
+            shutil.copyfile(meta_path, os.path.join(args.model_dir, f"{args.name}.json"))
+            print(f"Promoted to {promoted}")
+        if args.register or args.promote:
+            from lib.registry import ModelRegistry
+            registry = ModelRegistry()
+            if args.promote and args.name in registry.models:
+                registry.register(args.name, promoted)  # refresh its checksum and native export
+            if args.register:
+                registered = os.path.splitext(os.path.basename(model_path))[0]
+                registry.register(registered, model_path)
+                print(f"Registered as {registered} (classify_shots.py --model {registered})")
+    except Exception as e:
+        print(f"Error: {e}")
+
+if __name__ == "__main__":
+    main()